@@ -0,0 +1,75 @@
+"""
+Compare the memory used by embeddings held as Python lists of floats and as float32 NumPy matrices.
+
+Usage (from src/):
+    python -m benchmarks.embedding_memory [--chunks 5000] [--dim 1024] [--batch-size 50] [--queue-size 4]
+
+Two cases are measured with tracemalloc for a large document of `--chunks` chunks:
+  whole document  every embedding of the document held at once
+  pipeline        the batches in flight between the embed and upsert stages
+The time to turn one upsert batch into a JSON request body is measured as well.
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+import numpy as np
+
+def as_lists(count: int, dim: int, rng: random.Random):
+    # what a decoded JSON provider response looks like
+    return [[rng.uniform(-1, 1) for _ in range(dim)] for _ in range(count)]
+
+def as_matrix(count: int, dim: int, rng: np.random.Generator):
+    return rng.random((count, dim), dtype=np.float32)
+
+def measure(build):
+    tracemalloc.start()
+    held = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return current, peak
+
+def report(name: str, count: int, current: int, peak: int):
+    print(f"  {name:<8} held={current / 2**20:>9.1f} MiB  peak={peak / 2**20:>9.1f} MiB  "
+          f"per_vector={current / count / 1024:>7.2f} KiB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--queue-size", type=int, default=4)
+    args = parser.parse_args()
+
+    py_rng = random.Random(7)
+    np_rng = np.random.default_rng(7)
+
+    print(f"whole document: {args.chunks} vectors of {args.dim} dims")
+    report("lists", args.chunks, *measure(lambda: as_lists(args.chunks, args.dim, py_rng)))
+    report("float32", args.chunks, *measure(lambda: as_matrix(args.chunks, args.dim, np_rng)))
+
+    # a full queue on each side of the embed stage plus the batch being upserted
+    in_flight = (2 * args.queue_size + 1) * args.batch_size
+    print(f"pipeline: {in_flight} vectors in flight (batch_size={args.batch_size}, queue_size={args.queue_size})")
+    report("lists", in_flight, *measure(
+        lambda: [as_lists(args.batch_size, args.dim, py_rng) for _ in range(2 * args.queue_size + 1)]))
+    report("float32", in_flight, *measure(
+        lambda: [as_matrix(args.batch_size, args.dim, np_rng) for _ in range(2 * args.queue_size + 1)]))
+
+    lists = as_lists(args.batch_size, args.dim, py_rng)
+    matrix = as_matrix(args.batch_size, args.dim, np_rng)
+    repeat = 20
+    started = time.perf_counter()
+    for _ in range(repeat):
+        json.dumps(lists)
+    lists_ms = (time.perf_counter() - started) / repeat * 1000
+    started = time.perf_counter()
+    for _ in range(repeat):
+        json.dumps(matrix.tolist())
+    matrix_ms = (time.perf_counter() - started) / repeat * 1000
+    print(f"upsert body for one batch: lists={lists_ms:.1f}ms  float32 (tolist + dumps)={matrix_ms:.1f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Compare embedding requests in flight with the old blocking OpenAI client and with
+OpenAIProvider on the async client and shared connection pool.
+
+Usage (from src/):
+    python -m benchmarks.llm_concurrency [--requests 200] [--concurrency 32] [--batch-size 16]
+                                         [--dim 1024] [--latency-ms 100] [--base-url URL]
+
+Without --base-url, requests go to a local OpenAI-compatible stub that answers every
+embeddings request after --latency-ms, so no API key is needed. "peak in flight" is the
+most requests sent at once, "loop lag" the worst delay of a 10ms timer on the event loop
+while the requests run.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from openai import OpenAI
+from stores.LLM import OpenAIProvider, LLMRateLimiter, create_http_client
+import argparse
+import asyncio
+import base64
+import httpx
+import json
+import os
+import threading
+import time
+import numpy as np
+
+def start_stub_server(latency: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        # keep-alive, like the real API
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(latency)
+            dim = request.get("dimensions") or 1024
+            vector = base64.b64encode(np.zeros(dim, dtype="<f4").tobytes()).decode()
+            body = json.dumps({
+                "object": "list",
+                "model": request["model"],
+                "data": [{"object": "embedding", "index": i, "embedding": vector}
+                         for i in range(len(request["input"]))],
+                "usage": {"prompt_tokens": 1, "total_tokens": 1},
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+class InFlight:
+    """Counts HTTP requests between being sent and their response arriving."""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+
+    def sent(self, request):
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+
+    def received(self, response):
+        self.current -= 1
+
+    async def sent_async(self, request):
+        self.sent(request)
+
+    async def received_async(self, response):
+        self.received(response)
+
+async def measure_loop_lag(stop: asyncio.Event) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, time.perf_counter() - started - 0.01)
+    return worst
+
+async def run(mode: str, args, batches):
+    rate_limiter = LLMRateLimiter(max_concurrency=args.concurrency, name=mode)
+    in_flight = InFlight()
+
+    if mode == "sync":
+        # what the providers did before: a blocking SDK call inside a coroutine
+        client = OpenAI(api_key=args.api_key, http_client=httpx.Client(
+            event_hooks={"request": [in_flight.sent], "response": [in_flight.received]}
+        ))
+
+        async def embed(batch):
+            return await rate_limiter.call(
+                lambda: client.embeddings.create(input=batch, model=args.model, dimensions=args.dim,
+                                                 encoding_format="base64")
+            )
+        http_client = None
+    else:
+        # keep a warm connection for every request the limiter lets through
+        http_client = create_http_client(max_keepalive_connections=args.concurrency)
+        http_client.event_hooks = {"request": [in_flight.sent_async], "response": [in_flight.received_async]}
+        provider = OpenAIProvider(api_key=args.api_key, rate_limiter=rate_limiter, http_client=http_client)
+        await provider.set_embedding_model(args.model, args.dim)
+
+        async def embed(batch):
+            return await provider.embed_texts(batch)
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop))
+
+    started = time.perf_counter()
+    await asyncio.gather(*[embed(batch) for batch in batches])
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    loop_lag = await lag_task
+    if http_client is not None:
+        await http_client.aclose()
+
+    print(f"{mode:<6} {len(batches) / elapsed:>8,.1f} requests/s ({elapsed:.2f}s)  "
+          f"peak in flight: {in_flight.peak:>3}  loop lag: {loop_lag * 1000:,.0f}ms")
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32, help="rate limiter concurrency window")
+    parser.add_argument("--batch-size", type=int, default=16, help="texts per embeddings request")
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--latency-ms", type=float, default=100, help="response delay of the local stub")
+    parser.add_argument("--base-url", default=None, help="OpenAI-compatible endpoint instead of the local stub")
+    parser.add_argument("--model", default="text-embedding-3-small")
+    args = parser.parse_args()
+
+    server = None
+    if args.base_url is None:
+        server = start_stub_server(args.latency_ms / 1000)
+        args.base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    # read by both SDK clients on creation
+    os.environ["OPENAI_BASE_URL"] = args.base_url
+    args.api_key = os.environ.get("OPENAI_API_KEY", "benchmark")
+
+    batches = [[f"query {i}-{j}" for j in range(args.batch_size)] for i in range(args.requests)]
+
+    print(f"{args.requests} embeddings requests of {args.batch_size} texts against {args.base_url}, "
+          f"concurrency {args.concurrency}")
+    try:
+        for mode in ("sync", "async"):
+            await run(mode, args, batches)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+if __name__ == "__main__":
+    asyncio.run(main())
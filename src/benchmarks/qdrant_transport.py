@@ -0,0 +1,83 @@
+"""
+Compare upsert and search throughput of QdrantProvider over HTTP and gRPC.
+
+Usage (from src/), against a local Qdrant such as the one in docker-compose:
+    python -m benchmarks.qdrant_transport [--host localhost] [--points 20000] [--dim 1024]
+                                          [--batch-size 100] [--queries 500] [--concurrency 16]
+                                          [--upsert-concurrency 4] [--no-wait]
+
+Each transport writes into its own temporary collection, which is deleted afterwards.
+"""
+from stores.VectorDB.providers import QdrantProvider
+import argparse
+import asyncio
+import time
+import uuid
+import numpy as np
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) * 1000 if values else 0.0
+
+async def run(transport: str, args, vectors: np.ndarray, queries: np.ndarray):
+    provider = QdrantProvider(host=args.host, port=args.port, grpc_port=args.grpc_port,
+                              prefer_grpc=transport == "grpc", upsert_concurrency=args.upsert_concurrency,
+                              upsert_wait=not args.no_wait)
+    await provider.connect()
+    collection_name = f"bench_{transport}_{uuid.uuid4().hex[:8]}"
+
+    try:
+        await provider.create_collection(collection_name, vectors.shape[1])
+        texts = [f"chunk {i}" for i in range(len(vectors))]
+        metadatas = [{"asset_id": "bench", "page": i % 500} for i in range(len(vectors))]
+        record_ids = [str(uuid.uuid4()) for _ in range(len(vectors))]
+
+        started = time.perf_counter()
+        await provider.insert_many(collection_name, vectors, texts, record_ids, metadatas, batch_size=args.batch_size)
+        upsert_seconds = time.perf_counter() - started
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+        latencies = []
+
+        async def search(query):
+            async with semaphore:
+                query_started = time.perf_counter()
+                await provider.search(collection_name, query, top_k=10)
+                latencies.append(time.perf_counter() - query_started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[search(query) for query in queries])
+        search_seconds = time.perf_counter() - started
+
+        print(f"{transport:<5} upsert: {len(vectors) / upsert_seconds:>9,.0f} points/s ({upsert_seconds:.2f}s)  "
+              f"search: {len(queries) / search_seconds:>8,.0f} queries/s  "
+              f"p50={percentile(latencies, 50):.1f}ms p95={percentile(latencies, 95):.1f}ms")
+    finally:
+        await provider.delete_collection(collection_name)
+        await provider.disconnect()
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--grpc-port", type=int, default=6334)
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--upsert-concurrency", type=int, default=4, help="upsert batches in flight at once")
+    parser.add_argument("--no-wait", action="store_true", help="upsert with wait=False and a final barrier")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    vectors = rng.standard_normal((args.points, args.dim), dtype=np.float32)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+
+    print(f"{args.points} points of {args.dim} dims in batches of {args.batch_size}, "
+          f"{args.queries} searches with concurrency {args.concurrency}, "
+          f"{args.upsert_concurrency} upserts in flight{' without wait' if args.no_wait else ''}")
+    for transport in ("http", "grpc"):
+        await run(transport, args, vectors, queries)
+
+if __name__ == "__main__":
+    asyncio.run(main())
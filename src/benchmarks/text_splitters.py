@@ -0,0 +1,71 @@
+"""
+Compare the LangChain recursive splitter with LegalTextSplitter.
+
+Usage (from src/):
+    python -m benchmarks.text_splitters [path/to/file.txt] [--chunk-size 1000] [--chunk-overlap 100]
+
+Without a file a synthetic Arabic legal code is generated.
+"""
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from helpers.legal_text_splitter import LegalTextSplitter
+import argparse
+import random
+import re
+import time
+
+ARTICLE_START = re.compile(r"^[\(\[]?(?:ال)?مادة")
+
+WORDS = ("القانون العقد الطرف يلتزم المحكمة الحكم الدعوى التعويض الضرر المدين "
+         "الدائن الالتزام الملكية الحق الشركة العامل صاحب العمل الأجر المدة").split()
+
+def synthetic_legal_text(articles: int = 3000, seed: int = 7) -> str:
+    rng = random.Random(seed)
+
+    def sentence():
+        words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 24)))
+        return words + rng.choice([".", "،", "؛"])
+
+    lines = []
+    for article in range(1, articles + 1):
+        lines.append(f"مادة ({article})")
+        lines.append(" ".join(sentence() for _ in range(rng.randint(1, 5))))
+        for clause in range(rng.randint(0, 5)):
+            lines.append(f"{clause + 1}- " + " ".join(sentence() for _ in range(rng.randint(1, 4))))
+        lines.append("")
+    return "\n".join(lines)
+
+def run(name: str, splitter, text: str, repeat: int):
+    elapsed = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        chunks = splitter.split_text(text)
+        elapsed.append(time.perf_counter() - started)
+
+    best = min(elapsed)
+    article_aligned = sum(1 for chunk in chunks if ARTICLE_START.match(chunk))
+    print(f"{name:<10} chars/sec={len(text) / best:>14,.0f}  chunks={len(chunks):>6}  "
+          f"avg_len={sum(map(len, chunks)) / max(1, len(chunks)):>7.1f}  "
+          f"article_aligned={article_aligned / max(1, len(chunks)):>6.1%}  best={best * 1000:.1f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", nargs="?")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            text = f.read()
+    else:
+        text = synthetic_legal_text()
+
+    print(f"{len(text):,} characters, chunk_size={args.chunk_size}, chunk_overlap={args.chunk_overlap}")
+    run("recursive", RecursiveCharacterTextSplitter(chunk_size=args.chunk_size,
+                                                    chunk_overlap=args.chunk_overlap,
+                                                    length_function=len), text, args.repeat)
+    run("legal", LegalTextSplitter(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap), text, args.repeat)
+
+if __name__ == "__main__":
+    main()
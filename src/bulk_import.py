@@ -0,0 +1,248 @@
+"""
+Offline bulk import of a directory into the vector DB, without going through HTTP.
+
+Usage (from src/):
+    python bulk_import.py path/to/documents [--workers 4] [--batch-files 50] [--checkpoint FILE]
+
+Files go through the same DataController + VDBController path as uploads. Progress is
+appended to a checkpoint file after every batch, so an interrupted run started again
+with the same arguments skips the files that were already indexed.
+"""
+from stores.LLM import LLMFactory
+from stores.VectorDB import VDBFactory
+from helpers.config import get_settings
+from helpers.embedding_cache import EmbeddingCache
+from helpers.lexical_index import LexicalIndex
+from controllers import BaseController, DataController, VDBController
+from typing import Dict, List
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+settings = get_settings()
+
+import logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# asset ids are derived from the content hash, so a file interrupted mid-run
+# claims the same asset again on resume and its chunks are overwritten in place
+ASSET_NAMESPACE = uuid.UUID("7d0f3c52-8a9e-4d4b-9a55-2f1f7c0e6b1a")
+
+class ImportCheckpoint:
+    """Append-only JSON lines log of imported files; the last line for a path wins."""
+
+    DONE_STATUSES = ("completed", "duplicate")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, dict] = {}
+        self.completed_assets = set()
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # a line cut short by an interrupted write
+                        continue
+                    self.entries[entry["path"]] = entry
+                    if entry["status"] == "completed":
+                        self.completed_assets.add(entry["asset_id"])
+
+    def is_done(self, path: str, stat: os.stat_result) -> bool:
+        entry = self.entries.get(path)
+        return (
+            entry is not None
+            and entry["status"] in self.DONE_STATUSES
+            and entry["size"] == stat.st_size
+            and entry["mtime"] == stat.st_mtime
+        )
+
+    def record(self, entries: List[dict]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in entries:
+                self.entries[entry["path"]] = entry
+                if entry["status"] == "completed":
+                    self.completed_assets.add(entry["asset_id"])
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+def default_checkpoint_path(directory: str) -> str:
+    key = hashlib.sha1(os.path.abspath(directory).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(BaseController().base_dir, "assets", "imports", f"{key}.jsonl")
+
+def walk_files(directory: str, extensions) -> List[str]:
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in extensions:
+                paths.append(os.path.join(root, name))
+    return paths
+
+def hash_file(path: str, chunk_size: int) -> str:
+    file_hash = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+async def import_batch(paths: List[str], directory: str, checkpoint: ImportCheckpoint,
+                       data_controller: DataController, vdb_controller: VDBController, args) -> List[dict]:
+    """Claim, copy and ingest one batch of files. Returns their checkpoint entries."""
+    entries, to_ingest = [], []
+    batch_assets = set()
+
+    for path in paths:
+        stat = os.stat(path)
+        entry = {"path": os.path.relpath(path, directory), "size": stat.st_size, "mtime": stat.st_mtime}
+        entries.append(entry)
+
+        if stat.st_size > settings.MAX_FILE_SIZE:
+            entry.update(status="failed", error="File Size Too Large")
+            continue
+
+        file_hash = await asyncio.to_thread(hash_file, path, settings.PDF_CHUNK_SIZE)
+        asset_id = str(uuid.uuid5(ASSET_NAMESPACE, file_hash))
+        _, file_id = data_controller.get_file_path(filename=os.path.basename(path))
+
+        record = await data_controller.claim_file_hash(file_hash, asset_id=asset_id, file_id=file_id)
+        entry.update(file_hash=file_hash, asset_id=record["asset_id"])
+        # same content as an upload, a file imported earlier or another file of this batch
+        if record["asset_id"] != asset_id or asset_id in checkpoint.completed_assets or asset_id in batch_assets:
+            entry["status"] = "duplicate"
+            continue
+        batch_assets.add(asset_id)
+
+        # the record keeps the file id of an earlier, interrupted attempt
+        entry["file_id"] = record["file_id"]
+        await asyncio.to_thread(shutil.copyfile, path, os.path.join(data_controller.project_path, record["file_id"]))
+        to_ingest.append(entry)
+
+    if to_ingest:
+        result = await vdb_controller.process_and_store_files(
+            files=[{"file_id": entry["file_id"], "asset_id": entry["asset_id"]} for entry in to_ingest],
+            chunk_size=settings.TEXT_CHUNK_SIZE,
+            chunk_overlap=settings.TEXT_CHUNK_OVERLAP,
+            batch_size=args.embedding_batch_size,
+            max_concurrent_files=args.workers
+        )
+        for entry, file_result in zip(to_ingest, result["files"]):
+            entry.update(chunk_count=file_result["chunk_count"], inserted_count=file_result["inserted_count"])
+            if file_result["success"]:
+                entry["status"] = "completed"
+            else:
+                entry.update(status="failed", error=file_result["message"])
+                await data_controller.release_file_hash(entry["file_hash"], entry["asset_id"])
+
+    return entries
+
+async def run(args):
+    directory = os.path.abspath(args.directory)
+    checkpoint_path = args.checkpoint or default_checkpoint_path(directory)
+    os.makedirs(os.path.dirname(checkpoint_path), exist_ok=True)
+    if args.reset and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    checkpoint = ImportCheckpoint(checkpoint_path)
+
+    data_controller = DataController()
+    paths = walk_files(directory, data_controller.supported_extensions)
+    pending = [path for path in paths if not checkpoint.is_done(os.path.relpath(path, directory), os.stat(path))]
+    logger.info(f"{len(paths)} files found, {len(paths) - len(pending)} already imported, "
+                f"checkpoint: {checkpoint_path}")
+
+    vdb_client = VDBFactory().create(settings.VECTOR_DB_BACKEND)
+    await vdb_client.connect()
+
+    llm_http_client = LLMFactory.create_http_client()
+    embedding_client = LLMFactory().create(provider=settings.EMBEDDING_BACKEND, http_client=llm_http_client)
+    await embedding_client.set_embedding_model(embedding_model_id=settings.EMBEDDING_MODEL_ID,
+                                               embedding_size=settings.EMBEDDING_SIZE)
+
+    embedding_cache = None
+    if settings.EMBEDDING_CACHE_ENABLED:
+        embedding_cache = EmbeddingCache(
+            db_path=os.path.join(BaseController().get_vdb_path("embedding_cache"), "embeddings.db"),
+            memory_max_bytes=settings.EMBEDDING_CACHE_MEMORY_MB * 1024 * 1024,
+            disk_max_bytes=settings.EMBEDDING_CACHE_DISK_MB * 1024 * 1024
+        )
+
+    lexical_index = None
+    if settings.HYBRID_SEARCH_ENABLED:
+        lexical_index = LexicalIndex(
+            db_path=os.path.join(BaseController().get_vdb_path("lexical_index"), "chunks.db")
+        )
+
+    vdb_controller = VDBController(vdb_provider=vdb_client, embedding_provider=embedding_client,
+                                   embedding_cache=embedding_cache, lexical_index=lexical_index)
+
+    totals = {"completed": 0, "duplicate": 0, "failed": 0, "chunk_count": 0}
+    started = time.perf_counter()
+    try:
+        for i in range(0, len(pending), args.batch_files):
+            entries = await import_batch(pending[i:i + args.batch_files], directory, checkpoint,
+                                         data_controller, vdb_controller, args)
+            checkpoint.record(entries)
+
+            for entry in entries:
+                totals[entry["status"]] += 1
+                totals["chunk_count"] += entry.get("chunk_count", 0)
+                if entry["status"] == "failed":
+                    logger.warning(f"Failed to import {entry['path']}: {entry['error']}")
+
+            elapsed = time.perf_counter() - started
+            logger.info(f"{min(i + args.batch_files, len(pending))}/{len(pending)} files, "
+                        f"{totals['chunk_count']} chunks, {elapsed:.1f}s")
+    finally:
+        elapsed = time.perf_counter() - started
+        DataController.shutdown_pdf_executor()
+        if embedding_cache:
+            embedding_cache.close()
+        if lexical_index:
+            lexical_index.close()
+        await llm_http_client.aclose()
+        await vdb_client.disconnect()
+
+        processed = totals["completed"] + totals["duplicate"] + totals["failed"]
+        print(f"files: {processed}/{len(pending)} (completed={totals['completed']}, "
+              f"duplicate={totals['duplicate']}, failed={totals['failed']}, "
+              f"skipped from checkpoint={len(paths) - len(pending)})")
+        print(f"chunks: {totals['chunk_count']}")
+        print(f"elapsed: {elapsed:.1f}s")
+        print(f"docs/sec: {processed / elapsed if elapsed else 0.0:.2f}")
+        print(f"chunks/sec: {totals['chunk_count'] / elapsed if elapsed else 0.0:.2f}")
+        print(f"embedding calls: {embedding_client.rate_limiter.request_count}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory")
+    parser.add_argument("--workers", type=int, default=settings.INGESTION_WORKERS,
+                        help="files extracted at once")
+    parser.add_argument("--batch-files", type=int, default=50,
+                        help="files per pipeline run; the checkpoint is written after each")
+    parser.add_argument("--embedding-batch-size", type=int, default=50,
+                        help="chunks per embedding and upsert batch")
+    parser.add_argument("--checkpoint", help="checkpoint file, defaults to one per directory under assets/imports")
+    parser.add_argument("--reset", action="store_true", help="ignore the checkpoint and check every file again")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"not a directory: {args.directory}")
+
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        logger.warning("Interrupted, run again with the same arguments to resume")
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,35 @@
 from .BaseController import BaseController
 from fastapi import UploadFile, File
 from langchain_community.document_loaders import PyMuPDFLoader, TextLoader
+from langchain_core.documents import Document
+from pdf_extraction import count_pdf_pages, extract_pdf_pages
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from collections import deque
+from typing import AsyncIterator, List, Optional, Tuple, Union
+import multiprocessing
 import asyncio
+import hashlib
+import math
+import mmap
+import sqlite3
+import zipfile
 import os, re
 
 import logging
 logger = logging.getLogger(__name__)
 
 class DataController(BaseController):
+
+    # shared by all requests of the process, created on first large PDF
+    _pdf_executor = None
+
+    supported_extensions = ('.txt', '.pdf')
+
     def __init__(self):
         super().__init__()
         self.project_path = self.get_project_path()
+        self.file_index_path = os.path.join(self.base_dir, "assets", "file_index.db")
 
     def validfile(self, file: UploadFile):
         if file.content_type not in self.app_settings.ALLOWED_FILE_TYPES:
@@ -22,6 +41,76 @@ class DataController(BaseController):
         return True, "Valid File"
     
 
+    def validarchive(self, file: UploadFile):
+        if file.content_type not in self.app_settings.ALLOWED_ARCHIVE_TYPES:
+            return False, 'Invalid Archive Type'
+
+        if file.size > self.app_settings.MAX_BATCH_UPLOAD_SIZE:
+            return False, 'Archive Size Too Large'
+
+        return True, "Valid Archive"
+
+    def extract_archive(self, archive_path: str, max_members: int = None):
+        """
+        Save every supported file of a ZIP archive into the project folder, hashing it on the way.
+        Returns one dict per file member with file_name, file_id, file_size, file_hash and error;
+        rejected members have no file_id and carry the reason in error.
+        Raises ValueError if the archive has more than `max_members` (at most MAX_ARCHIVE_MEMBERS) files
+        or would unpack to more than MAX_ARCHIVE_UNCOMPRESSED_SIZE bytes, and zipfile.BadZipFile if it
+        is corrupt. Members already written are removed when extraction fails.
+        """
+        max_members = min(max_members or self.app_settings.MAX_ARCHIVE_MEMBERS, self.app_settings.MAX_ARCHIVE_MEMBERS)
+        max_total_size = self.app_settings.MAX_ARCHIVE_UNCOMPRESSED_SIZE
+
+        files = []
+        try:
+            with zipfile.ZipFile(archive_path) as archive:
+                members = [member for member in archive.infolist() if not member.is_dir()]
+                if len(members) > max_members:
+                    raise ValueError(f"Archive has more than {max_members} files")
+
+                total_size = 0
+                for member in members:
+                    file_name = os.path.basename(member.filename)
+                    entry = {"file_name": file_name, "file_id": None, "file_size": member.file_size,
+                             "file_hash": None, "error": None}
+                    files.append(entry)
+
+                    if os.path.splitext(file_name)[1].lower() not in self.supported_extensions:
+                        entry["error"] = 'Invalid File Type'
+                        continue
+                    if member.file_size > self.app_settings.MAX_FILE_SIZE:
+                        entry["error"] = 'File Size Too Large'
+                        continue
+
+                    total_size += member.file_size
+                    if total_size > max_total_size:
+                        raise ValueError(f"Archive unpacks to more than {max_total_size} bytes")
+
+                    file_path, file_id = self.get_file_path(filename=file_name)
+                    entry["file_id"] = file_id
+                    file_hash = hashlib.sha256()
+                    # zipfile stops reading at the declared size, so file_size bounds what is written
+                    with archive.open(member) as src, open(file_path, "wb") as dst:
+                        while chunk := src.read(self.app_settings.PDF_CHUNK_SIZE):
+                            file_hash.update(chunk)
+                            dst.write(chunk)
+
+                    entry["file_hash"] = file_hash.hexdigest()
+        except BaseException:
+            self.remove_files([entry["file_id"] for entry in files if entry["file_id"]])
+            raise
+
+        return files
+
+    def remove_files(self, file_ids: List[str]):
+        """Delete saved files from the project folder, ignoring the ones that are already gone."""
+        for file_id in file_ids:
+            try:
+                os.remove(os.path.join(self.project_path, file_id))
+            except FileNotFoundError:
+                pass
+
     def _clean_file_name(self, file_name: str):
         # Remove special chars
         clean_filename = re.sub(r"[^\w.]", "", file_name)
@@ -51,6 +140,12 @@ class DataController(BaseController):
                 return await asyncio.to_thread(loader.load)
 
             elif file_ext == '.pdf':
+                workers = self.app_settings.PDF_EXTRACTION_WORKERS
+                if workers > 1:
+                    page_count = await asyncio.to_thread(count_pdf_pages, file_path)
+                    if page_count >= self.app_settings.PDF_PARALLEL_MIN_PAGES:
+                        return await self._load_pdf_parallel(file_path, page_count, workers)
+
                 loader = PyMuPDFLoader(file_path)
                 return await asyncio.to_thread(loader.load)
 
@@ -60,4 +155,249 @@ class DataController(BaseController):
 
         except Exception as e:
             logger.error(f"Error loading file {file_id}: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    async def get_content_from_bytes(self, content: bytes, file_id: str):
+        """
+        Extract the content of an upload held in memory, without writing it to disk.
+        `file_id` gives the file type and names the source in the page metadata.
+        """
+        file_ext = os.path.splitext(file_id)[1]
+
+        try:
+            if file_ext == '.txt':
+                return [Document(page_content=content.decode("utf-8"), metadata={"source": file_id})]
+
+            elif file_ext == '.pdf':
+                page_count = await asyncio.to_thread(count_pdf_pages, file_id, content)
+                workers = self.app_settings.PDF_EXTRACTION_WORKERS
+                if workers > 1 and page_count >= self.app_settings.PDF_PARALLEL_MIN_PAGES:
+                    return await self._load_pdf_parallel(file_id, page_count, workers, stream=content)
+
+                pages = await asyncio.to_thread(extract_pdf_pages, file_id, 0, page_count, content)
+                return [Document(page_content=text, metadata=metadata) for text, metadata in pages]
+
+            else:
+                logger.warning(f"Unsupported file type: {file_ext}")
+                return None
+
+        except Exception as e:
+            logger.error(f"Error loading file {file_id} from memory: {e}")
+            return None
+
+    async def iter_file_content(self, file_id: str, stream: bytes = None, file_path: str = None) -> AsyncIterator[Document]:
+        """
+        Yield the content of a file one piece at a time: a page for PDFs and a bounded,
+        line-aligned window of the memory-mapped file for text files.
+        With `stream` the content is read from memory, and with `file_path` from that path
+        instead of the project folder; `file_id` still gives the file type.
+        Raises if the file is missing or of an unsupported type.
+        """
+        file_ext = os.path.splitext(file_id)[1]
+
+        if stream is None:
+            file_path = file_path or os.path.join(self.project_path, file_id)
+            if not os.path.exists(file_path):
+                raise FileNotFoundError(f"File not found: {file_id}")
+
+        if file_ext == '.txt':
+            if stream is not None:
+                async for document in self._iter_text_buffer(stream, file_id):
+                    yield document
+            else:
+                async for document in self._iter_text_windows(file_path):
+                    yield document
+
+        elif file_ext == '.pdf':
+            async for document in self._iter_pdf_pages(file_path or file_id, stream):
+                yield document
+
+        else:
+            raise ValueError(f"Unsupported file type: {file_ext}")
+
+    async def _iter_pdf_pages(self, file_path: str, stream: bytes = None) -> AsyncIterator[Document]:
+        page_count = await asyncio.to_thread(count_pdf_pages, file_path, stream)
+        workers = self.app_settings.PDF_EXTRACTION_WORKERS
+        # in-memory PDFs stay in this process, every worker slice would need its own copy of the bytes
+        parallel = stream is None and workers > 1 and page_count >= self.app_settings.PDF_PARALLEL_MIN_PAGES
+        step = self.app_settings.PDF_STREAM_SLICE_PAGES
+
+        if not parallel:
+            for start in range(0, page_count, step):
+                pages = await asyncio.to_thread(extract_pdf_pages, file_path, start, min(start + step, page_count), stream)
+                for text, metadata in pages:
+                    yield Document(page_content=text, metadata=metadata)
+            return
+
+        # keep one small slice in flight per worker and yield them in page order
+        executor = self._get_pdf_executor(workers)
+        loop = asyncio.get_running_loop()
+        starts = iter(range(0, page_count, step))
+        in_flight = deque()
+
+        def submit_next():
+            start = next(starts, None)
+            if start is not None:
+                in_flight.append(loop.run_in_executor(
+                    executor, extract_pdf_pages, file_path, start, min(start + step, page_count)
+                ))
+
+        for _ in range(workers):
+            submit_next()
+
+        try:
+            while in_flight:
+                pages = await in_flight.popleft()
+                submit_next()
+                for text, metadata in pages:
+                    yield Document(page_content=text, metadata=metadata)
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    async def _iter_text_windows(self, file_path: str) -> AsyncIterator[Document]:
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                async for document in self._iter_text_buffer(mm, file_path):
+                    yield document
+
+    async def _iter_text_buffer(self, buffer: Union[mmap.mmap, bytes], source: str) -> AsyncIterator[Document]:
+        window_size = self.app_settings.TEXT_STREAM_WINDOW_BYTES
+        offset = 0
+        while offset < len(buffer):
+            text, offset = await asyncio.to_thread(self._read_text_window, buffer, offset, window_size)
+            yield Document(page_content=text, metadata={"source": source})
+
+    @staticmethod
+    def _read_text_window(mm: Union[mmap.mmap, bytes], offset: int, window_size: int) -> Tuple[str, int]:
+        """Decode up to `window_size` bytes from `offset`, ending on a line or at least a UTF-8 character boundary."""
+        end = min(offset + window_size, len(mm))
+
+        if end < len(mm):
+            newline = mm.rfind(b"\n", offset, end)
+            if newline > offset:
+                end = newline + 1
+            else:
+                # no newline in the window: step back over UTF-8 continuation bytes
+                while end > offset + 1 and (mm[end] & 0xC0) == 0x80:
+                    end -= 1
+
+        return mm[offset:end].decode("utf-8", errors="replace"), end
+
+    @classmethod
+    def _get_pdf_executor(cls, workers: int) -> ProcessPoolExecutor:
+        if cls._pdf_executor is None:
+            # spawn: forking a process that runs an event loop and threads is unsafe
+            cls._pdf_executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return cls._pdf_executor
+
+    @classmethod
+    def shutdown_pdf_executor(cls):
+        if cls._pdf_executor is not None:
+            cls._pdf_executor.shutdown(cancel_futures=True)
+            cls._pdf_executor = None
+
+    async def _load_pdf_parallel(self, file_path: str, page_count: int, workers: int, stream: bytes = None):
+        """
+        Extract a PDF across worker processes, each handling a contiguous page range.
+        With `stream` every worker opens the PDF from a copy of the in-memory bytes.
+        """
+        executor = self._get_pdf_executor(workers)
+        loop = asyncio.get_running_loop()
+        step = math.ceil(page_count / min(workers, page_count))
+
+        slices = await asyncio.gather(*[
+            loop.run_in_executor(executor, extract_pdf_pages, file_path, start, min(start + step, page_count), stream)
+            for start in range(0, page_count, step)
+        ])
+
+        logger.info(f"Extracted {page_count} pages from {file_path} across {len(slices)} processes")
+        return [
+            Document(page_content=text, metadata=metadata)
+            for pages in slices
+            for text, metadata in pages
+        ]
+
+    def _open_file_index(self):
+        conn = sqlite3.connect(self.file_index_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS file_hashes (
+                file_hash TEXT NOT NULL,
+                collection_name TEXT NOT NULL,
+                asset_id TEXT NOT NULL,
+                file_id TEXT NOT NULL,
+                job_id TEXT,
+                summary TEXT,
+                PRIMARY KEY (file_hash, collection_name)
+            )
+        """)
+        return conn
+
+    def _run_file_index(self, query: str, params: tuple = (), fetch: bool = False):
+        with closing(self._open_file_index()) as conn, conn:
+            cursor = conn.execute(query, params)
+            if fetch:
+                row = cursor.fetchone()
+                return dict(row) if row else None
+
+    async def claim_file_hash(self, file_hash: str, asset_id: str, file_id: str, job_id: str = None) -> dict:
+        """
+        Register a content hash for a new asset, unless the same content was already uploaded.
+        Returns the record that owns the hash; if its asset_id differs from the given one
+        the file is a duplicate of that asset.
+        """
+        collection_name = self.app_settings.VECTOR_DB_COLLECTION
+
+        def claim():
+            self._run_file_index(
+                "INSERT OR IGNORE INTO file_hashes (file_hash, collection_name, asset_id, file_id, job_id) VALUES (?, ?, ?, ?, ?)",
+                (file_hash, collection_name, asset_id, file_id, job_id)
+            )
+            return self._run_file_index(
+                "SELECT * FROM file_hashes WHERE file_hash = ? AND collection_name = ?",
+                (file_hash, collection_name), fetch=True
+            )
+
+        return await asyncio.to_thread(claim)
+
+    async def release_file_hash(self, file_hash: str, asset_id: str):
+        """Forget a hash claimed by an asset whose ingestion did not succeed."""
+        await asyncio.to_thread(
+            self._run_file_index,
+            "DELETE FROM file_hashes WHERE file_hash = ? AND collection_name = ? AND asset_id = ?",
+            (file_hash, self.app_settings.VECTOR_DB_COLLECTION, asset_id)
+        )
+
+    async def get_asset_file_record(self, asset_id: str) -> Optional[dict]:
+        """The hash record of an asset's upload in the configured collection, or None."""
+        return await asyncio.to_thread(
+            self._run_file_index,
+            "SELECT * FROM file_hashes WHERE asset_id = ? AND collection_name = ?",
+            (asset_id, self.app_settings.VECTOR_DB_COLLECTION), fetch=True
+        )
+
+    async def set_file_summary(self, file_hash: str, summary: str):
+        await asyncio.to_thread(
+            self._run_file_index,
+            "UPDATE file_hashes SET summary = ? WHERE file_hash = ? AND collection_name = ?",
+            (summary, file_hash, self.app_settings.VECTOR_DB_COLLECTION)
+        )
+
+    async def release_asset_hashes(self, asset_id: str = None, collection_name: str = None):
+        """Drop index entries of a deleted asset or of every asset in a deleted collection."""
+        if asset_id is not None:
+            query, params = "DELETE FROM file_hashes WHERE asset_id = ?", (asset_id,)
+        else:
+            query, params = "DELETE FROM file_hashes WHERE collection_name = ?", (collection_name,)
+
+        try:
+            await asyncio.to_thread(self._run_file_index, query, params)
+        except Exception as e:
+            logger.error(f"Error updating file hash index: {e}")
@@ -1,55 +1,185 @@
 from .BaseController import BaseController
-from typing import List, Tuple, Dict
+from stores.LLM import DocumentTypeEnum, missing_embeddings
+from helpers.legal_text_splitter import LegalTextSplitter, TextSplitterEnum
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from typing import AsyncIterator, List, Tuple, Dict, Optional
+import numpy as np
 import asyncio
+import time
 
 import logging
 logger = logging.getLogger(__name__)
 
+class SummaryTooLongError(ValueError):
+    """The text needs more than SUMMARY_MAX_SECTIONS sections to be summarized."""
+
 class LLMController(BaseController):
     def __init__(self, embedding_provider=None,
                 generate_provider=None,
                 summarize_provider=None,
-                template_parser=None):
+                template_parser=None,
+                embedding_cache=None,
+                query_cache=None,
+                answer_cache=None):
         
         super().__init__()
         self.embedding_provider = embedding_provider 
         self.generate_provider = generate_provider
         self.summarize_provider = summarize_provider
         self.template_parser = template_parser
+        self.embedding_cache = embedding_cache
+        self.query_cache = query_cache
+        self.answer_cache = answer_cache
+
+    def _embedding_cache_key(self, text: str, document_type: str) -> str:
+        return self.embedding_cache.make_key(
+            text=text,
+            model_id=self.embedding_provider.embedding_model_id,
+            embedding_size=self.embedding_provider.embedding_size,
+            document_type=document_type
+        )
+
+    async def embed_text(self, text: str, document_type: str) -> Optional[np.ndarray]:
+        """Get embedding for text asynchronously. Queries are looked up in the query cache first."""
+        if self.query_cache is not None and document_type == DocumentTypeEnum.QUERY.value:
+            key = self.query_cache.make_key(
+                query=text,
+                model_id=self.embedding_provider.embedding_model_id,
+                embedding_size=self.embedding_provider.embedding_size
+            )
+            return await self.query_cache.get_or_embed(key, lambda: self._embed_text(text, document_type))
+        return await self._embed_text(text, document_type)
+
+    async def _embed_text(self, text: str, document_type: str) -> Optional[np.ndarray]:
+        if self.embedding_cache is None:
+            return await self.embedding_provider.embed_text(text=text, document_type=document_type)
 
+        key = self._embedding_cache_key(text, document_type)
+        cached = (await self.embedding_cache.get_many([key]))[0]
+        if cached is not None:
+            return cached
 
-    async def embed_text(self, text: str, document_type: str) -> List[float]:
-        """Get embedding for text asynchronously."""
-        return await self.embedding_provider.embed_text(text=text, document_type=document_type)
+        embedding = await self.embedding_provider.embed_text(text=text, document_type=document_type)
+        if embedding is not None:
+            await self.embedding_cache.set_many([key], [embedding])
+        return embedding
 
-    async def embed_text_batch(self, texts: List[str], document_type: str) -> List[List[float]]:
-        """Get embeddings for multiple texts efficiently."""
+    async def embed_text_batch(self, texts: List[str], document_type: str) -> np.ndarray:
+        """
+        Get embeddings for multiple texts efficiently.
+        Returns a float32 matrix with one row per text; rows that failed are NaN.
+        """
         try:
-            results = await asyncio.gather(
-                *[self.embed_text(text, document_type=document_type) for text in texts],
-                return_exceptions=True
+            if self.embedding_cache is None:
+                return await self.embedding_provider.embed_texts(texts=texts, document_type=document_type)
+
+            # Only texts missing from the cache go to the provider
+            keys = [self._embedding_cache_key(text, document_type) for text in texts]
+            cached = await self.embedding_cache.get_many(keys)
+            missing = [i for i, vector in enumerate(cached) if vector is None]
+
+            if not missing:
+                return np.stack(cached)
+
+            embeddings = await self.embedding_provider.embed_texts(
+                texts=[texts[i] for i in missing], document_type=document_type
             )
+            embedded = ~missing_embeddings(embeddings)
+            await self.embedding_cache.set_many([keys[i] for i, ok in zip(missing, embedded) if ok], embeddings[embedded])
+
+            if len(missing) == len(texts):
+                return embeddings
+
+            results = np.empty((len(texts), embeddings.shape[1]), dtype=np.float32)
+            results[missing] = embeddings
+            for i, vector in enumerate(cached):
+                if vector is not None:
+                    results[i] = vector
             return results
         except Exception as e:
             logger.error(f"Error getting batch embeddings: {e}")
             raise
 
-    async def generate_text(self, query: str, chunks_result: List[Dict]) -> str:
-        """Generate text based on query and chat history."""
+    def _rag_prompts(self, query: str, chunks_result: List[Dict]) -> Tuple[str, str]:
+        system_prompt = self.template_parser.get("rag", "system_prompt")
+
+        documents_prompts = "\n".join([
+        self.template_parser.get("rag", "document_prompt", {
+                "doc_num": idx + 1,
+                "chunk_text": doc["text"],
+            })
+            for idx, doc in enumerate(chunks_result)
+        ])
+
+        footer_prompt = self.template_parser.get("rag", "footer_prompt", {"query": query})
+
+        return system_prompt, "\n\n".join([documents_prompts, footer_prompt])
+
+    def _summary_prompts(self, text: str) -> Tuple[str, str]:
+        system_prompt = self.template_parser.get("summarizer", "system_prompt")
+        user_prompt = self.template_parser.get("summarizer", "footer_prompt", {"text": text})
+        return system_prompt, user_prompt
+
+    async def _cached_answer(self, query: str, chunks_result: List[Dict],
+                             cache_epoch: int = None) -> Tuple[Optional[str], Optional[dict]]:
+        """
+        Look the query up in the answer cache. Returns the cached answer, or None and the
+        context needed to store the answer once generated (None without a cache).
+        `cache_epoch` is the cache epoch read before the chunks were retrieved.
+        """
+        if self.answer_cache is None:
+            return None, None
+
+        context = {
+            "epoch": self.answer_cache.epoch if cache_epoch is None else cache_epoch,
+            "chunk_ids": [str(doc["id"]) for doc in chunks_result],
+            "asset_ids": {doc["metadata"].get("asset_id") for doc in chunks_result} - {None},
+            "query_vector": await self.embed_text(text=query, document_type=DocumentTypeEnum.QUERY.value),
+        }
+        if context["query_vector"] is None:
+            return None, None
+
+        answer = self.answer_cache.get(context["query_vector"], context["chunk_ids"])
+        if answer is not None:
+            logger.info(f"Answer cache hit for query '{query}'")
+        return answer, context
+
+    def _cache_answer(self, context: Optional[dict], answer: Optional[str]):
+        if context is not None and answer:
+            self.answer_cache.put(context["query_vector"], context["chunk_ids"], context["asset_ids"],
+                                  answer, epoch=context["epoch"])
+
+    async def _timed_stream(self, stream: AsyncIterator[str], label: str) -> AsyncIterator[str]:
+        """Pass a text stream through, logging time to first token and total streaming time."""
+        started = time.perf_counter()
+        first_token_at = None
+        chunk_count, char_count = 0, 0
         try:
-            system_prompt = self.template_parser.get("rag", "system_prompt")
-
-            documents_prompts = "\n".join([
-            self.template_parser.get("rag", "document_prompt", {
-                    "doc_num": idx + 1,
-                    "chunk_text": doc["text"],
-                })
-                for idx, doc in enumerate(chunks_result)
-            ])
+            async for delta in stream:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter() - started
+                    logger.info(f"{label}: time to first token {first_token_at * 1000:.0f}ms")
+                chunk_count += 1
+                char_count += len(delta)
+                yield delta
+        finally:
+            elapsed = time.perf_counter() - started
+            logger.info(f"{label}: streamed {char_count} characters in {chunk_count} chunks in {elapsed:.2f}s"
+                        + (f", time to first token {first_token_at * 1000:.0f}ms" if first_token_at is not None else ""))
 
-            footer_prompt = self.template_parser.get("rag", "footer_prompt", {"query": query})
+    async def generate_text(self, query: str, chunks_result: List[Dict], cache_epoch: int = None) -> str:
+        """
+        Generate text based on query and chat history.
+        With an answer cache, a paraphrase of an answered query that retrieved the same chunks
+        gets the stored answer instead of a new generation. Pass the `answer_cache.epoch` read
+        before retrieval as `cache_epoch`, so an answer built on chunks invalidated meanwhile is not stored.
+        """
+        try:
+            answer, cache_context = await self._cached_answer(query, chunks_result, cache_epoch)
+            if answer is not None:
+                return answer
 
-            user_prompt = "\n\n".join([documents_prompts, footer_prompt])
+            system_prompt, user_prompt = self._rag_prompts(query, chunks_result)
 
             # Retrieve the Answer
             answer = await self.generate_provider.generate_text(
@@ -59,18 +189,139 @@ class LLMController(BaseController):
                 max_output_tokens=1024
             )
 
+            self._cache_answer(cache_context, answer)
             return answer
 
         except Exception as e:
             logger.error(f"Error generating text: {e}")
             raise
 
+    async def generate_text_stream(self, query: str, chunks_result: List[Dict],
+                                   cache_epoch: int = None) -> AsyncIterator[str]:
+        """Like generate_text, but yield the answer as it is generated. A cached answer is yielded at once."""
+        answer, cache_context = await self._cached_answer(query, chunks_result, cache_epoch)
+        if answer is not None:
+            yield answer
+            return
+
+        system_prompt, user_prompt = self._rag_prompts(query, chunks_result)
+        stream = self.generate_provider.generate_text_stream(
+            user_prompt=user_prompt,
+            system_prompt=system_prompt,
+            temperature=0.7,
+            max_output_tokens=1024
+        )
+
+        parts = []
+        async for delta in self._timed_stream(stream, "RAG answer"):
+            parts.append(delta)
+            yield delta
+
+        self._cache_answer(cache_context, "".join(parts))
+
+    def _summary_section_size(self) -> Optional[int]:
+        """
+        Characters of text per summarization prompt, or None if the provider sends prompts whole.
+        The provider truncates summarization prompts, so a section is what fits next to the footer template.
+        """
+        max_input_characters = getattr(self.summarize_provider, "summary_max_input_characters", None)
+        if max_input_characters is None:
+            return None
+        footer_size = len(self.template_parser.get("summarizer", "footer_prompt", {"text": ""}))
+        return max(1, max_input_characters - footer_size)
+
+    def _split_sections(self, text: str, section_size: int) -> List[str]:
+        if self.app_settings.TEXT_SPLITTER == TextSplitterEnum.LEGAL.value:
+            splitter = LegalTextSplitter(chunk_size=section_size, chunk_overlap=0)
+        else:
+            splitter = RecursiveCharacterTextSplitter(chunk_size=section_size, chunk_overlap=0, length_function=len)
+        return splitter.split_text(text)
+
+    @staticmethod
+    def _group_summaries(summaries: List[str], section_size: int) -> List[str]:
+        """
+        Pack consecutive summaries into sections of at most section_size. A summary that does not
+        fit next to the previous ones starts a new section, so no prompt is truncated.
+        """
+        sections, current = [], []
+        for summary in summaries:
+            if current and len("\n\n".join(current + [summary])) > section_size:
+                sections.append("\n\n".join(current))
+                current = []
+            current.append(summary)
+        sections.append("\n\n".join(current))
+        return sections
+
+    async def _summarize_section(self, section: str, semaphore: asyncio.Semaphore, max_output_tokens: int) -> Optional[str]:
+        system_prompt, user_prompt = self._summary_prompts(section)
+        async with semaphore:
+            return await self.summarize_provider.summarize_text(
+                user_prompt=user_prompt,
+                system_prompt=system_prompt,
+                temperature=0.3,
+                max_output_tokens=max_output_tokens
+            )
+
+    async def _condense_for_summary(self, text: str) -> str:
+        """
+        Reduce a text too long for one prompt to partial summaries that fit in one:
+        its sections are summarized concurrently, then groups of those summaries are
+        summarized again, level by level. Shorter texts, and any text for a provider that
+        does not truncate summarization prompts, are returned unchanged.
+        Raises SummaryTooLongError above SUMMARY_MAX_SECTIONS sections. Partial summaries are
+        capped below half a section, so every level at least halves the sections and the calls
+        stay at about twice as many. Raises RuntimeError if any section could not be summarized,
+        since the summary would silently miss part of the text, or if a level merges nothing.
+        """
+        section_size = self._summary_section_size()
+        if not self.app_settings.SUMMARY_MAP_REDUCE_ENABLED or section_size is None or len(text) <= section_size:
+            return text
+
+        semaphore = asyncio.Semaphore(self.app_settings.SUMMARY_MAP_CONCURRENCY)
+        # under half the characters of a full section even at 6 characters per token,
+        # so two partial summaries always fit in one prompt
+        max_output_tokens = max(64, section_size // 12)
+
+        sections = self._split_sections(text, section_size)
+        max_sections = self.app_settings.SUMMARY_MAX_SECTIONS
+        if len(sections) > max_sections:
+            raise SummaryTooLongError(f"Text too long to summarize: {len(sections)} sections of up to "
+                                      f"{section_size} characters, at most {max_sections} are allowed")
+
+        level = 0
+        while True:
+            level += 1
+            started = time.perf_counter()
+            summaries = await asyncio.gather(*[
+                self._summarize_section(section, semaphore, max_output_tokens) for section in sections
+            ])
+            failed = sum(1 for summary in summaries if not summary)
+            logger.info(f"Summary level {level}: {len(sections)} sections summarized in "
+                        f"{time.perf_counter() - started:.2f}s, {failed} failed")
+
+            if failed:
+                raise RuntimeError(f"{failed} of {len(sections)} sections could not be summarized")
+
+            partial_summaries = "\n\n".join(summaries)
+            if len(summaries) == 1 or len(partial_summaries) <= section_size:
+                return partial_summaries
+
+            grouped = self._group_summaries(summaries, section_size)
+            if len(grouped) == len(summaries):
+                raise RuntimeError("Partial summaries are too long to be merged into one prompt")
+            sections = grouped
+
     async def summarize_text(self, text: str) -> str:
-        """Summarize given text."""
+        """
+        Summarize given text. A text longer than one prompt is summarized section by section
+        first, and the final summary is generated from the partial summaries.
+        """
         try:
-            print(text[:100])
-            system_prompt = self.template_parser.get("summarizer", "system_prompt")
-            user_prompt = self.template_parser.get("summarizer", "footer_prompt", {"text": text})
+            text = await self._condense_for_summary(text)
+            if not text:
+                return None
+
+            system_prompt, user_prompt = self._summary_prompts(text)
 
             return await self.summarize_provider.summarize_text(
                 user_prompt=user_prompt,
@@ -81,4 +332,21 @@ class LLMController(BaseController):
 
         except Exception as e:
             logger.error(f"Error summarizing text: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    async def summarize_text_stream(self, text: str) -> AsyncIterator[str]:
+        """Like summarize_text, but yield the final summary as it is generated."""
+        text = await self._condense_for_summary(text)
+        if not text:
+            return
+
+        system_prompt, user_prompt = self._summary_prompts(text)
+        stream = self.summarize_provider.summarize_text_stream(
+            user_prompt=user_prompt,
+            system_prompt=system_prompt,
+            temperature=0.3,
+            max_output_tokens=3000
+        )
+
+        async for delta in self._timed_stream(stream, "Summary"):
+            yield delta
@@ -3,8 +3,14 @@ from .BaseController import BaseController
 from .DataController import DataController
 from .LLMController import LLMController
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from helpers.legal_text_splitter import LegalTextSplitter, TextSplitterEnum
 from routes.schema import *
-from stores.LLM import DocumentTypeEnum
+from stores.LLM import DocumentTypeEnum, missing_embeddings
+from typing import List
+import asyncio
+import hashlib
+import time
+import uuid
 
 import logging
 logger = logging.getLogger(__name__)
@@ -14,17 +20,26 @@ class VDBController(BaseController):
                  embedding_provider=None,
                  generate_provider=None,
                  summarize_provider=None,
-                 template_parser=None):
+                 template_parser=None,
+                 embedding_cache=None,
+                 lexical_index=None,
+                 query_cache=None,
+                 answer_cache=None):
         
         super().__init__()
         self.project_path = self.get_project_path()
         self.vdb_provider = vdb_provider
+        self.lexical_index = lexical_index
+        self.answer_cache = answer_cache
         self.data_controller = DataController()
         self.llm_controller = LLMController(
             embedding_provider=embedding_provider,
             generate_provider=generate_provider,
             summarize_provider=summarize_provider,
-            template_parser=template_parser
+            template_parser=template_parser,
+            embedding_cache=embedding_cache,
+            query_cache=query_cache,
+            answer_cache=answer_cache
         )
 
     async def get_vdb_health(self) -> HealthResponse:
@@ -39,30 +54,55 @@ class VDBController(BaseController):
             message="Vector DB not initialized"
         )
 
-    async def get_chunks(self, file_id: str, file_content: list = None, chunk_size: int = None, chunk_overlap: int = None):
+    def _get_text_splitter(self, chunk_size: int, chunk_overlap: int):
+        if self.app_settings.TEXT_SPLITTER == TextSplitterEnum.LEGAL.value:
+            return LegalTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+        return RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=len
+        )
+
+    async def _iter_file_content(self, file_id: str, file_content=None):
         """
-        Extract and split file content into chunks.
-        Returns a list of document chunks with text and metadata.
+        Yield already extracted pages (a list or an async iterator of them),
+        or stream them from the file when none are given.
+        """
+        if hasattr(file_content, "__aiter__"):
+            async for page in file_content:
+                yield page
+            return
+
+        if file_content is not None:
+            for page in file_content:
+                yield page
+            return
+
+        logger.info(f"Extracting content for file: {file_id}")
+        async for page in self.data_controller.iter_file_content(file_id):
+            yield page
+
+    async def iter_chunks(self, file_id: str, file_content: list = None, chunk_size: int = None, chunk_overlap: int = None):
+        """
+        Split file content into chunks page by page.
+        Only the current page and its chunks are held in memory.
         """
-        # Use default values if not provided
         chunk_size = self.app_settings.TEXT_CHUNK_SIZE if chunk_size is None else chunk_size
         chunk_overlap = self.app_settings.TEXT_CHUNK_OVERLAP if chunk_overlap is None else chunk_overlap
+        splitter = self._get_text_splitter(chunk_size, chunk_overlap)
 
-        if file_content is None:
-            logger.info(f"Extracting content for file: {file_id}")
-            file_content = await self.data_controller.get_file_content(file_id)
-        
-        try:
-            splitter = RecursiveCharacterTextSplitter(
-                chunk_size=chunk_size, 
-                chunk_overlap=chunk_overlap, 
-                length_function=len
-            )
+        async for page in self._iter_file_content(file_id, file_content):
+            for chunk in splitter.create_documents([page.page_content], metadatas=[page.metadata]):
+                yield chunk
 
-            texts = [doc.page_content for doc in file_content]
-            metadatas = [doc.metadata for doc in file_content]
-
-            chunks = splitter.create_documents(texts, metadatas=metadatas)
+    async def get_chunks(self, file_id: str, file_content: list = None, chunk_size: int = None, chunk_overlap: int = None):
+        """
+        Extract and split file content into chunks.
+        Returns a list of document chunks with text and metadata.
+        """
+        try:
+            chunks = [chunk async for chunk in self.iter_chunks(file_id, file_content, chunk_size, chunk_overlap)]
             
             logger.info(f"Created {len(chunks)} chunks from file {file_id}")
             return chunks
@@ -71,132 +111,489 @@ class VDBController(BaseController):
             logger.error(f"Error creating chunks from file {file_id}: {e}")
             return []
 
-    async def process_and_store_chunks(self, file_id: str, asset_id: str,
-                                       file_content: list = None,
-                                       chunk_size: int = None, chunk_overlap: int = None,
-                                       batch_size: int = 50):
-
-        try:
-            # Extract and chunk content
-            logger.info(f"Processing file {file_id} for asset {asset_id}")
-            chunks = await self.get_chunks(file_id, file_content, chunk_size, chunk_overlap)
-            
-            if not chunks:
-                return {
-                    "success": False,
-                    "message": "No chunks created from file",
-                    "chunk_count": 0,
-                    "embeddings_count": 0,
-                    "inserted_count": 0
-                }
-
-            # Extract text from LangChain Document objects
-            texts = [chunk.page_content for chunk in chunks]
+    async def _extract_stage(self, sources: List[dict], pages_queue: asyncio.Queue, stats: dict,
+                             max_concurrent_files: int):
+        """
+        Feed extracted pages into the pipeline one at a time.
+        Several files are extracted concurrently; a failing file is recorded on its source
+        and does not stop the others.
+        """
+        semaphore = asyncio.Semaphore(max_concurrent_files)
 
-            # Get embeddings in batches to avoid memory issues
-            all_embeddings = []
-            for i in range(0, len(texts), batch_size):
-                batch_texts = texts[i:i + batch_size]
+        async def extract(source_index: int, source: dict):
+            async with semaphore:
+                pages = self._iter_file_content(source["file_id"], source["file_content"])
                 try:
-                    batch_embeddings = await self.llm_controller.embed_text_batch(texts=batch_texts, document_type=DocumentTypeEnum.DOCUMENT.value)
-                    all_embeddings.extend(batch_embeddings)
-                    logger.info(f"Generated embeddings for batch {i//batch_size + 1}")
+                    while True:
+                        started = time.perf_counter()
+                        page = await anext(pages, None)
+                        stats["extract"]["seconds"] += time.perf_counter() - started
+                        if page is None:
+                            break
+
+                        await pages_queue.put((source_index, page))
+                        stats["extract"]["items"] += 1
                 except Exception as e:
-                    logger.error(f"Error generating embeddings for batch {i//batch_size + 1}: {e}")
-                    raise   # Fail fast
+                    logger.error(f"Error extracting content from file {source['file_id']}: {e}")
+                    source["error"] = str(e)
 
-            print(f"Total embeddings generated: {len(all_embeddings)}")
-            print("----------")
-            print(f"Total texts processed: {len(texts)}")
+        await asyncio.gather(*[extract(i, source) for i, source in enumerate(sources)])
+        await pages_queue.put(None)
 
-            if not all_embeddings:
-                logger.error(f"No embeddings generated for file {file_id}")
-                return {
-                    "success": False,
-                    "message": "No embeddings generated",
-                    "chunk_count": len(chunks),
-                    "embeddings_count": 0,
-                    "inserted_count": 0
-                }
-            if len(all_embeddings) != len(texts):
-                return {
-                    "success": False,
-                    "message": "Mismatch between embeddings and texts",
-                    "chunk_count": len(chunks),
-                    "embeddings_count": len(all_embeddings),
-                    "inserted_count": 0
-                }
+    @staticmethod
+    def chunk_record_id(asset_id: str, text: str):
+        """Deterministic point id of a chunk: the same text in the same asset always maps to the same id."""
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{asset_id}:{content_hash}")), content_hash
+
+    async def _chunk_stage(self, sources: List[dict], splitter,
+                           pages_queue: asyncio.Queue, batches_queue: asyncio.Queue,
+                           batch_size: int, stats: dict):
+        """
+        Split pages into chunks and pack them into full embedding batches, across files.
+        Chunks already stored (the source's `existing_record_ids`) or repeated within the
+        file are skipped.
+        """
+        texts, metadatas, record_ids, source_indexes = [], [], [], []
+
+        while (item := await pages_queue.get()) is not None:
+            source_index, page = item
+            source = sources[source_index]
+
+            started = time.perf_counter()
+            chunks = splitter.create_documents([page.page_content], metadatas=[page.metadata])
+            stats["chunk"]["seconds"] += time.perf_counter() - started
+
+            for chunk in chunks:
+                record_id, content_hash = self.chunk_record_id(source["asset_id"], chunk.page_content)
+                chunk_index = source["chunk_count"]
+                source["chunk_count"] += 1
+                if record_id in source["seen_record_ids"] or record_id in source["existing_record_ids"]:
+                    source["seen_record_ids"].add(record_id)
+                    source["unchanged_count"] += 1
+                    stats["chunk"]["skipped"] += 1
+                    continue
+                source["seen_record_ids"].add(record_id)
 
-            collection_name = self.app_settings.VECTOR_DB_COLLECTION
-            
-            # Ensure collection exists
-            if not await self.vdb_provider.is_collection_exist(collection_name):
-                embedding_size = self.app_settings.EMBEDDING_SIZE
-                await self.vdb_provider.create_collection(collection_name, embedding_size)
-
-            # Prepare metadata for each chunk
-            metadatas = []
-            for i, chunk in enumerate(chunks):                
                 metadata = {
-                    "chunk_index": i,
-                    "file_id": file_id,
-                    "asset_id": asset_id,
+                    "chunk_index": chunk_index,
+                    "file_id": source["file_id"],
+                    "asset_id": source["asset_id"],
+                    "content_hash": content_hash,
                 }
-                
+
                 # Add original metadata from document
-                if hasattr(chunk, 'metadata') and chunk.metadata:
+                if chunk.metadata:
                     metadata.update(chunk.metadata)
-                    
+
+                texts.append(chunk.page_content)
                 metadatas.append(metadata)
-            
-            # Store in vector DB
-            record_ids = await self.vdb_provider.insert_many(
+                record_ids.append(record_id)
+                source_indexes.append(source_index)
+
+                if len(texts) == batch_size:
+                    await batches_queue.put((texts, metadatas, record_ids, source_indexes))
+                    texts, metadatas, record_ids, source_indexes = [], [], [], []
+
+            stats["chunk"]["items"] += len(chunks)
+
+        if texts:
+            await batches_queue.put((texts, metadatas, record_ids, source_indexes))
+        await batches_queue.put(None)
+
+    async def _embed_stage(self, sources: List[dict], batches_queue: asyncio.Queue, vectors_queue: asyncio.Queue,
+                           stats: dict, progress_callback=None):
+        """Embed chunk batches as they arrive from the chunk stage."""
+        batch_num = 0
+
+        while (batch := await batches_queue.get()) is not None:
+            texts, metadatas, record_ids, source_indexes = batch
+            batch_num += 1
+
+            started = time.perf_counter()
+            embeddings = await self.llm_controller.embed_text_batch(texts=texts, document_type=DocumentTypeEnum.DOCUMENT.value)
+            stats["embed"]["seconds"] += time.perf_counter() - started
+
+            failed = int(missing_embeddings(embeddings).sum())
+            if failed or len(embeddings) != len(texts):
+                raise RuntimeError(f"Failed to embed {failed or len(texts)} of {len(texts)} chunks in batch {batch_num}")
+
+            stats["embed"]["items"] += len(embeddings)
+            for source_index in source_indexes:
+                sources[source_index]["embeddings_count"] += 1
+            logger.info(f"Generated embeddings for batch {batch_num}")
+            self._report_progress(progress_callback, stats)
+            await vectors_queue.put((texts, metadatas, record_ids, source_indexes, embeddings))
+
+        await vectors_queue.put(None)
+
+    async def _upsert_stage(self, sources: List[dict], collection_name: str, vectors_queue: asyncio.Queue,
+                            stats: dict, progress_callback=None):
+        """Upsert embedded batches into the vector DB while later batches are still embedding."""
+        while (batch := await vectors_queue.get()) is not None:
+            texts, metadatas, record_ids, source_indexes, embeddings = batch
+
+            started = time.perf_counter()
+            inserted_ids = await self.vdb_provider.insert_many(
                 collection_name=collection_name,
-                vectors=all_embeddings,
+                vectors=embeddings,
                 texts=texts,
+                record_ids=record_ids,
                 metadatas=metadatas,
-                batch_size=batch_size
+                batch_size=len(texts)
             )
-            
-            inserted_count = len(record_ids) if record_ids else 0
-            success = inserted_count > 0
+            if self.lexical_index:
+                await self.lexical_index.add_many(collection_name, record_ids, texts,
+                                                  [metadata["asset_id"] for metadata in metadatas])
+            stats["upsert"]["seconds"] += time.perf_counter() - started
+            inserted_count = len(inserted_ids) if inserted_ids else 0
+            stats["upsert"]["items"] += inserted_count
+            for source_index in source_indexes[:inserted_count]:
+                sources[source_index]["inserted_count"] += 1
+            self._report_progress(progress_callback, stats)
 
-            return {
-                "success": success,
-                "message": "File processed and stored successfully" if success else "Failed to store chunks",
-                "chunk_count": len(chunks),
-                "embeddings_count": len(all_embeddings),
-                "inserted_count": inserted_count
+    def _report_progress(self, progress_callback, stats: dict):
+        if progress_callback is None:
+            return
+        try:
+            progress_callback({
+                "chunk_count": stats["chunk"]["items"],
+                "embeddings_count": stats["embed"]["items"],
+                "inserted_count": stats["upsert"]["items"],
+            })
+        except Exception as e:
+            logger.warning(f"Ingestion progress callback failed: {e}")
+
+    def _stage_throughput(self, stats: dict) -> dict:
+        return {
+            stage: {
+                "items": stage_stats["items"],
+                "seconds": round(stage_stats["seconds"], 3),
+                "items_per_second": round(stage_stats["items"] / stage_stats["seconds"], 2) if stage_stats["seconds"] else 0.0,
             }
+            for stage, stage_stats in stats.items()
+        }
+
+    def _source_result(self, source: dict) -> dict:
+        """Outcome of one file of a pipeline run, in the result dict format."""
+        if source["error"]:
+            success, message = False, source["error"]
+        elif source["chunk_count"] == 0:
+            success, message = False, "No chunks created from file"
+        elif source["inserted_count"] + source["unchanged_count"] == source["chunk_count"]:
+            success, message = True, "File processed and stored successfully"
+        else:
+            success, message = False, "Failed to store chunks"
+
+        return {
+            "success": success,
+            "message": message,
+            "file_id": source["file_id"],
+            "asset_id": source["asset_id"],
+            "chunk_count": source["chunk_count"],
+            "embeddings_count": source["embeddings_count"],
+            "inserted_count": source["inserted_count"],
+            "unchanged_count": source["unchanged_count"],
+            "deleted_count": source["deleted_count"],
+        }
+
+    @staticmethod
+    def _new_source(file_id: str, asset_id: str, file_content: list = None, existing_record_ids: set = None) -> dict:
+        """Per-file state and counters of a pipeline run."""
+        return {
+            "file_id": file_id,
+            "asset_id": asset_id,
+            "file_content": file_content,
+            "existing_record_ids": existing_record_ids or set(),
+            "seen_record_ids": set(),
+            "error": None,
+            "chunk_count": 0,
+            "embeddings_count": 0,
+            "inserted_count": 0,
+            "unchanged_count": 0,
+            "deleted_count": 0,
+        }
 
+    @staticmethod
+    def _new_pipeline_stats() -> dict:
+        stats = {stage: {"items": 0, "seconds": 0.0} for stage in ("extract", "chunk", "embed", "upsert")}
+        stats["chunk"]["skipped"] = 0
+        return stats
+
+    async def _run_pipeline(self, sources: List[dict], stats: dict, chunk_size: int = None, chunk_overlap: int = None,
+                            batch_size: int = 50, progress_callback=None, max_concurrent_files: int = None):
+        """
+        Run the extract -> chunk -> embed -> upsert pipeline over one or more files.
+        Stages are connected by bounded queues, so upserts of early batches overlap
+        with embedding of later ones and only a few batches are held in memory.
+        Raises if embedding or storing fails; per-file counts and extraction errors
+        are kept on `sources` and stage timings on `stats`.
+        """
+        chunk_size = self.app_settings.TEXT_CHUNK_SIZE if chunk_size is None else chunk_size
+        chunk_overlap = self.app_settings.TEXT_CHUNK_OVERLAP if chunk_overlap is None else chunk_overlap
+        queue_size = self.app_settings.INGESTION_QUEUE_SIZE
+        max_concurrent_files = max_concurrent_files or self.app_settings.INGESTION_WORKERS
+
+        collection_name = self.app_settings.VECTOR_DB_COLLECTION
+
+        # Ensure collection exists
+        if not await self.vdb_provider.is_collection_exist(collection_name):
+            embedding_size = self.app_settings.EMBEDDING_SIZE
+            await self.vdb_provider.create_collection(collection_name, embedding_size)
+
+        pages_queue = asyncio.Queue(maxsize=queue_size)
+        batches_queue = asyncio.Queue(maxsize=queue_size)
+        vectors_queue = asyncio.Queue(maxsize=queue_size)
+
+        tasks = [
+            asyncio.create_task(self._extract_stage(sources, pages_queue, stats, max_concurrent_files)),
+            asyncio.create_task(self._chunk_stage(sources, self._get_text_splitter(chunk_size, chunk_overlap),
+                                                  pages_queue, batches_queue, batch_size, stats)),
+            asyncio.create_task(self._embed_stage(sources, batches_queue, vectors_queue, stats, progress_callback)),
+            asyncio.create_task(self._upsert_stage(sources, collection_name, vectors_queue, stats, progress_callback)),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Fail fast: stop the other stages so none of them blocks on a full queue
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        # Drop stored chunks that are not part of the new content
+        for source in sources:
+            stale_record_ids = source["existing_record_ids"] - source["seen_record_ids"]
+            if stale_record_ids and self._source_result(source)["success"]:
+                await self.vdb_provider.delete_records(collection_name, list(stale_record_ids))
+                if self.lexical_index:
+                    await self.lexical_index.delete_records(collection_name, list(stale_record_ids))
+                source["deleted_count"] = len(stale_record_ids)
+
+    async def process_and_store_chunks(self, file_id: str, asset_id: str,
+                                       file_content: list = None,
+                                       chunk_size: int = None, chunk_overlap: int = None,
+                                       batch_size: int = 50,
+                                       progress_callback=None,
+                                       existing_record_ids: set = None):
+        """
+        Extract, chunk, embed and store a file through the ingestion pipeline.
+        `file_content` holds the file's pages as a list or an async iterator; without it
+        the file is streamed from the project folder.
+        `progress_callback`, if given, is called with the running chunk/embedding/insert
+        counts after every embedded and every stored batch.
+        When `existing_record_ids` (the asset's stored point ids) is given, chunks that are
+        already stored are not embedded again, and stored chunks that no longer appear in
+        the file are deleted once the new ones are in.
+        """
+        logger.info(f"Processing file {file_id} for asset {asset_id}")
+        source = self._new_source(file_id, asset_id, file_content, existing_record_ids)
+        stats = self._new_pipeline_stats()
+        started = time.perf_counter()
+
+        try:
+            await self._run_pipeline([source], stats, chunk_size, chunk_overlap, batch_size, progress_callback)
+            result = self._source_result(source)
         except Exception as e:
             logger.error(f"Error in process_and_store_chunks: {e}")
-            return {
-                "success": False,
-                "message": str(e),
-                "chunk_count": 0,
-                "embeddings_count": 0,
-                "inserted_count": 0
+            result = {**self._source_result(source), "success": False, "message": str(e)}
+
+        del result["file_id"], result["asset_id"]
+        result["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+        result["stage_throughput"] = self._stage_throughput(stats)
+
+        logger.info(f"Created {result['chunk_count']} chunks from file {file_id}")
+        if result["success"]:
+            logger.info(f"Ingestion of {file_id} finished in {result['elapsed_seconds']}s: {result['stage_throughput']}")
+        return result
+
+    async def process_and_store_files(self, files: List[dict], chunk_size: int = None, chunk_overlap: int = None,
+                                      batch_size: int = 50, max_concurrent_files: int = None,
+                                      progress_callback=None):
+        """
+        Ingest many files through one shared pipeline.
+        `files` holds dicts with `file_id` and `asset_id`. Up to `max_concurrent_files`
+        (default INGESTION_WORKERS) files are extracted at once and chunks from different files share embedding and upsert batches.
+        `progress_callback` receives the running counts of the whole batch.
+        Returns per-file results and overall throughput.
+        """
+        sources = [self._new_source(f["file_id"], f["asset_id"]) for f in files]
+        stats = self._new_pipeline_stats()
+        started = time.perf_counter()
+        logger.info(f"Processing batch of {len(sources)} files")
+
+        try:
+            await self._run_pipeline(sources, stats, chunk_size, chunk_overlap, batch_size,
+                                     progress_callback=progress_callback,
+                                     max_concurrent_files=max_concurrent_files)
+            error = None
+        except Exception as e:
+            logger.error(f"Error in process_and_store_files: {e}")
+            error = str(e)
+
+        results = []
+        for source in sources:
+            result = self._source_result(source)
+            if error:
+                result.update(success=False, message=error)
+            results.append(result)
+
+        elapsed = time.perf_counter() - started
+        chunk_count = sum(result["chunk_count"] for result in results)
+        succeeded = sum(1 for result in results if result["success"])
+
+        logger.info(f"Batch of {len(results)} files finished in {elapsed:.2f}s, {succeeded} succeeded")
+        return {
+            "success": error is None and succeeded == len(results),
+            "message": error or f"{succeeded} of {len(results)} files processed and stored successfully",
+            "files": results,
+            "file_count": len(results),
+            "chunk_count": chunk_count,
+            "embeddings_count": sum(result["embeddings_count"] for result in results),
+            "inserted_count": sum(result["inserted_count"] for result in results),
+            "elapsed_seconds": round(elapsed, 3),
+            "files_per_second": round(len(results) / elapsed, 2) if elapsed else 0.0,
+            "chunks_per_second": round(chunk_count / elapsed, 2) if elapsed else 0.0,
+            "stage_throughput": self._stage_throughput(stats),
+        }
+
+    async def asset_exists(self, asset_id: str) -> bool:
+        """Whether an asset has a registered upload or stored chunks in the configured collection."""
+        if await self.data_controller.get_asset_file_record(asset_id):
+            return True
+
+        collection_name = self.app_settings.VECTOR_DB_COLLECTION
+        if not await self.vdb_provider.is_collection_exist(collection_name):
+            return False
+        return bool(await self.vdb_provider.get_asset_record_ids(collection_name, asset_id))
+
+    async def reindex_asset(self, file_id: str, asset_id: str, file_content: list = None,
+                            chunk_size: int = None, chunk_overlap: int = None,
+                            batch_size: int = 50, progress_callback=None):
+        """
+        Re-index an existing asset from a new version of its file.
+        Only new or changed chunks are embedded and stored; chunks that disappeared are deleted.
+        """
+        collection_name = self.app_settings.VECTOR_DB_COLLECTION
+
+        existing_record_ids = set()
+        if await self.vdb_provider.is_collection_exist(collection_name):
+            existing_record_ids = set(await self.vdb_provider.get_asset_record_ids(collection_name, asset_id))
+        logger.info(f"Re-indexing asset {asset_id} from {file_id}: {len(existing_record_ids)} chunks stored")
+
+        result = await self.process_and_store_chunks(
+            file_id=file_id,
+            asset_id=asset_id,
+            file_content=file_content,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            batch_size=batch_size,
+            progress_callback=progress_callback,
+            existing_record_ids=existing_record_ids
+        )
+
+        # unchanged chunks keep their payload, point it at the new file
+        if result["success"] and result["unchanged_count"]:
+            await self.vdb_provider.set_asset_payload(collection_name, asset_id, {"file_id": file_id})
+
+        # answers cached while the old version was indexed may cite removed chunks
+        if self.answer_cache:
+            self.answer_cache.invalidate_assets([asset_id])
+
+        return result
+
+    async def _dense_search(self, collection_name: str, query: str, top_k: int, similarity_threshold: float = None,
+                            hnsw_ef: int = None, exact: bool = False) -> List[dict]:
+        """Nearest chunks to the query, only those scoring at least `similarity_threshold` if it is given."""
+        # Generate query embedding
+        query_vector = await self.llm_controller.embed_text(text=query, document_type=DocumentTypeEnum.QUERY.value)
+
+        # Search in vector DB
+        results = await self.vdb_provider.search(
+            collection_name=collection_name,
+            query_vector=query_vector,
+            top_k=top_k,
+            hnsw_ef=hnsw_ef,
+            exact=exact,
+        )
+
+        # Filter results by similarity threshold
+        return [
+            {
+                "id": str(result.id),
+                "text": result.payload.get("text", ""),
+                "score": result.score,
+                "metadata": result.payload,
             }
+            for result in results or []
+            if similarity_threshold is None or result.score >= similarity_threshold
+        ]
+
+    async def _lexical_search(self, collection_name: str, query: str, top_k: int) -> List[dict]:
+        try:
+            results = await self.lexical_index.search(collection_name, query, top_k)
+        except Exception as e:
+            # keyword matches only refine the ranking, dense results are still usable
+            logger.warning(f"Lexical search failed, using dense results only: {e}")
+            return []
+
+        return [
+            {"id": record_id, "text": payload["text"], "score": score, "metadata": payload}
+            for record_id, score, payload in results
+        ]
+
+    def _fuse_results(self, dense_results: List[dict], lexical_results: List[dict], top_k: int) -> List[dict]:
+        """
+        Reciprocal rank fusion: each list adds 1 / (RRF_K + rank) to a chunk's score, so chunks
+        ranked well by both retrievers come first without comparing cosine and BM25 scores.
+        """
+        rrf_k = self.app_settings.HYBRID_RRF_K
+        fused = {}
+        for key, results in (("dense_score", dense_results), ("lexical_score", lexical_results)):
+            for rank, result in enumerate(results, start=1):
+                entry = fused.setdefault(result["id"], {
+                    **result, "score": 0.0, "dense_score": None, "lexical_score": None
+                })
+                entry["score"] += 1 / (rrf_k + rank)
+                entry[key] = result["score"]
+                # dense hits carry the full payload
+                if key == "dense_score":
+                    entry["metadata"] = result["metadata"]
+
+        return sorted(fused.values(), key=lambda entry: entry["score"], reverse=True)[:top_k]
 
-    async def search_chunks(self, query: str, top_k: int = 10, similarity_threshold: float = 0.7):
+    async def search_chunks(self, query: str, top_k: int = 10, similarity_threshold: float = 0.7,
+                            hnsw_ef: int = None, exact: bool = False):
         """
-        Search for similar chunks using vector similarity.
+        Search for relevant chunks.
+        Dense vector search and, when a lexical index is configured, BM25 keyword search run
+        concurrently and are merged by reciprocal rank fusion. `similarity_threshold` applies
+        to the dense hits. Keyword matches are only used when at least one dense hit passed it,
+        and only those the dense search also ranks among its candidates.
+        `hnsw_ef` and `exact` trade search latency for recall on this request only.
         Returns structured search results with metadata.
         """
         try:
             collection_name = self.app_settings.VECTOR_DB_COLLECTION
 
-            # Generate query embedding
-            query_vector = await self.llm_controller.embed_text(text=query, document_type=DocumentTypeEnum.QUERY.value)
+            if self.lexical_index:
+                candidates = max(top_k, self.app_settings.HYBRID_CANDIDATES)
+                dense_candidates, lexical_results = await asyncio.gather(
+                    self._dense_search(collection_name, query, candidates, hnsw_ef=hnsw_ef, exact=exact),
+                    self._lexical_search(collection_name, query, candidates)
+                )
+                dense_results = [result for result in dense_candidates if result["score"] >= similarity_threshold]
+                # keyword matches alone are no evidence that a chunk answers the query
+                dense_ids = {result["id"] for result in dense_candidates}
+                lexical_results = [result for result in lexical_results if result["id"] in dense_ids]
+                filtered_results = self._fuse_results(dense_results, lexical_results, top_k) if dense_results else []
+                logger.info(f"Hybrid search for '{query}': {len(dense_results)} dense and "
+                            f"{len(lexical_results)} lexical candidates")
+            else:
+                filtered_results = await self._dense_search(collection_name, query, top_k,
+                                                            similarity_threshold, hnsw_ef, exact)
 
-            # Search in vector DB
-            results = await self.vdb_provider.search(
-                collection_name=collection_name,
-                query_vector=query_vector,
-                top_k=top_k,
-            )
-            if not results:
+            if not filtered_results:
                 logger.info(f"No similar chunks found for query '{query}'")
                 return {
                     "success": True,
@@ -204,18 +601,6 @@ class VDBController(BaseController):
                     "results": [],
                     "count": 0
                 }
-            
-            # Filter results by similarity threshold
-            filtered_results = [
-                {
-                    "id": result.id,
-                    "text": result.payload.get("text", ""),
-                    "score": result.score,
-                    "metadata": result.payload,
-                }
-                for result in results
-                if result.score >= similarity_threshold
-            ]
 
             logger.info(f"Found {len(filtered_results)} similar chunks for query '{query}'")
 
@@ -237,15 +622,40 @@ class VDBController(BaseController):
     async def delete_asset_chunks(self, collection_name: str, asset_id: str) -> DeleteAssetResponse:
 
         result = await self.vdb_provider.delete_asset_chunks(collection_name, asset_id)
+        if result['success']:
+            await self.data_controller.release_asset_hashes(asset_id=asset_id)
+            if self.lexical_index:
+                await self.lexical_index.delete_asset(collection_name, asset_id)
+            if self.answer_cache:
+                self.answer_cache.invalidate_assets([asset_id])
         return DeleteAssetResponse(
             success= result['success'],
             message= result['message'],
             asset_id= asset_id
         )
 
+    async def discard_failed_asset(self, file_hash: str, asset_id: str, delete_chunks: bool = True):
+        """
+        Release the hash claimed by an asset whose ingestion failed, after deleting the chunks it
+        may already have stored. If they cannot be deleted the claim is kept, so uploading the same
+        content again returns this asset instead of indexing a second copy.
+        """
+        if delete_chunks:
+            result = await self.delete_asset_chunks(self.app_settings.VECTOR_DB_COLLECTION, asset_id)
+            if not result.success:
+                logger.error(f"Keeping the hash of failed asset {asset_id}, its chunks were not deleted: {result.message}")
+                return
+        await self.data_controller.release_file_hash(file_hash, asset_id)
+
     async def delete_collection(self, collection_name: str) -> DeleteCollectionResponse:
 
         result = await self.vdb_provider.delete_collection(collection_name)
+        if result['success']:
+            await self.data_controller.release_asset_hashes(collection_name=collection_name)
+            if self.lexical_index:
+                await self.lexical_index.delete_collection(collection_name)
+            if self.answer_cache:
+                self.answer_cache.clear()
         return DeleteCollectionResponse(
             success= result['success'],
             message= result['message'],
@@ -273,6 +683,24 @@ class VDBController(BaseController):
                 count=0
             )
 
+    async def update_collection_profile(self, collection_name: str) -> CollectionProfileResponse:
+        """Apply the configured HNSW, storage and optimizer profile to an existing collection."""
+        try:
+            profile = await self.vdb_provider.update_collection_profile(collection_name)
+            return CollectionProfileResponse(
+                success=True,
+                message="Collection profile updated, optimizations run in the background",
+                collection_name=collection_name,
+                profile=profile
+            )
+        except Exception as e:
+            logger.error(f"Error updating collection profile for {collection_name}: {e}")
+            return CollectionProfileResponse(
+                success=False,
+                message=str(e),
+                collection_name=collection_name
+            )
+
     async def get_collection_info(self, collection_name: str) -> CollectionInfoResponse:
         """
         Get detailed info about a specific collection.
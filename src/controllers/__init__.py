@@ -1,4 +1,4 @@
 from .DataController import DataController
 from .VDBController import VDBController
 from .BaseController import BaseController
-from .LLMController import LLMController
\ No newline at end of file
+from .LLMController import LLMController, SummaryTooLongError
\ No newline at end of file
@@ -1 +1,3 @@
-from helpers.config import get_settings
\ No newline at end of file
+from helpers.config import get_settings
+from helpers.jobs import IngestionJobManager, JobStatusEnum
+from helpers.embedding_cache import EmbeddingCache
\ No newline at end of file
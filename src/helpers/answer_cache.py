@@ -0,0 +1,129 @@
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import time
+
+import logging
+logger = logging.getLogger(__name__)
+
+class SemanticAnswerCache:
+    """
+    In-memory cache of RAG answers looked up by meaning rather than by exact text.
+    An entry stores the query embedding, the ids of the chunks the answer was generated from
+    and the answer. A new query hits when its embedding is at least `similarity_threshold`
+    (cosine) from a cached one and retrieval returned exactly the same chunks, so a paraphrase
+    only reuses an answer built from the same evidence. Entries are dropped when any of
+    their assets is deleted or re-indexed.
+
+    Embeddings live in one preallocated matrix, so a lookup is a single matrix-vector product.
+    """
+
+    def __init__(self, max_entries: int, similarity_threshold: float, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+
+        self.vectors: Optional[np.ndarray] = None
+        self.used = np.zeros(max_entries, dtype=bool)
+        # slot -> entry, least recently used first
+        self.entries: "OrderedDict[int, dict]" = OrderedDict()
+        self.asset_slots: Dict[str, set] = {}
+
+        # bumped on every invalidation, so an answer generated meanwhile is not stored
+        self.epoch = 0
+
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    @staticmethod
+    def _normalize(vector: np.ndarray) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, query_vector: np.ndarray, chunk_ids: Iterable[str]) -> Optional[str]:
+        if self.vectors is None or not self.entries or len(query_vector) != self.vectors.shape[1]:
+            self.counters["misses"] += 1
+            return None
+
+        chunk_ids = frozenset(chunk_ids)
+        scores = self.vectors @ self._normalize(query_vector)
+        scores[~self.used] = -np.inf
+        now = time.monotonic()
+
+        candidates = np.flatnonzero(scores >= self.similarity_threshold)
+        for slot in candidates[np.argsort(-scores[candidates])].tolist():
+            entry = self.entries[slot]
+            if entry["expires_at"] < now:
+                self._remove(slot)
+                continue
+            if entry["chunk_ids"] == chunk_ids:
+                self.entries.move_to_end(slot)
+                self.counters["hits"] += 1
+                return entry["answer"]
+
+        self.counters["misses"] += 1
+        return None
+
+    def put(self, query_vector: np.ndarray, chunk_ids: Iterable[str], asset_ids: Iterable[str], answer: str,
+            epoch: int = None):
+        """Store an answer; pass the `epoch` read before retrieval to skip answers invalidated since."""
+        if epoch is not None and epoch != self.epoch:
+            return
+
+        if self.vectors is None or len(query_vector) != self.vectors.shape[1]:
+            # first entry, or the embedding model changed
+            self.clear()
+            self.vectors = np.zeros((self.max_entries, len(query_vector)), dtype=np.float32)
+
+        if self.used.all():
+            self._remove(next(iter(self.entries)))
+            self.counters["evictions"] += 1
+
+        slot = int(np.flatnonzero(~self.used)[0])
+        asset_ids = set(asset_ids)
+        self.vectors[slot] = self._normalize(query_vector)
+        self.used[slot] = True
+        self.entries[slot] = {
+            "chunk_ids": frozenset(chunk_ids),
+            "asset_ids": asset_ids,
+            "answer": answer,
+            "expires_at": time.monotonic() + self.ttl_seconds,
+        }
+        for asset_id in asset_ids:
+            self.asset_slots.setdefault(asset_id, set()).add(slot)
+
+    def invalidate_assets(self, asset_ids: List[str]):
+        """Drop every answer generated from chunks of the given assets."""
+        self.epoch += 1
+        slots = set()
+        for asset_id in asset_ids:
+            slots |= self.asset_slots.get(asset_id, set())
+        for slot in slots:
+            self._remove(slot)
+        self.counters["invalidations"] += len(slots)
+        if slots:
+            logger.info(f"Invalidated {len(slots)} cached answers of assets {asset_ids}")
+
+    def clear(self):
+        self.epoch += 1
+        self.entries.clear()
+        self.asset_slots.clear()
+        self.used[:] = False
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "hit_rate": round(self.counters["hits"] / lookups, 4) if lookups else 0.0,
+            "entries": len(self.entries),
+        }
+
+    def _remove(self, slot: int):
+        entry = self.entries.pop(slot)
+        self.used[slot] = False
+        for asset_id in entry["asset_ids"]:
+            slots = self.asset_slots.get(asset_id)
+            if slots is not None:
+                slots.discard(slot)
+                if not slots:
+                    del self.asset_slots[asset_id]
@@ -10,10 +10,27 @@ class settings(BaseSettings):
     ALLOWED_FILE_TYPES: list
     MAX_FILE_SIZE: int
     PDF_CHUNK_SIZE: int
+    PERSIST_UPLOADS: bool = True
+    ALLOWED_ARCHIVE_TYPES: list = ["application/zip", "application/x-zip-compressed"]
+    MAX_BATCH_UPLOAD_SIZE: int = 104857600
+    MAX_ARCHIVE_UNCOMPRESSED_SIZE: int = 524288000
+    MAX_ARCHIVE_MEMBERS: int = 1000
+    MAX_BATCH_FILES: int = 100
+    PDF_EXTRACTION_WORKERS: int = 4
+    PDF_PARALLEL_MIN_PAGES: int = 50
+    PDF_STREAM_SLICE_PAGES: int = 8
+    TEXT_STREAM_WINDOW_BYTES: int = 1048576
 
     # Chunking settings
     TEXT_CHUNK_SIZE: int
     TEXT_CHUNK_OVERLAP: int
+    TEXT_SPLITTER: str = "recursive"
+
+    # Ingestion settings
+    INGESTION_QUEUE_SIZE: int = 4
+    INGESTION_WORKERS: int = 2
+    INGESTION_MAX_QUEUED_JOBS: int = 100
+    INGESTION_MAX_HELD_MB: int = 64
 
     # LLM settings
     GENERATION_BACKEND: str
@@ -33,6 +50,49 @@ class settings(BaseSettings):
     DEFAULT_MAX_OUTPUT_TOKENS: int = 200
     DEFAULT_TEMPERATURE: float = 0.1
 
+    # LLM rate limit settings (0 = unlimited)
+    LLM_REQUESTS_PER_MINUTE: int = 0
+    LLM_TOKENS_PER_MINUTE: int = 0
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_MIN_CONCURRENCY: int = 1
+    LLM_MAX_RETRIES: int = 5
+
+    # LLM HTTP connection pool, shared by the OpenAI and Cohere clients
+    LLM_HTTP_MAX_CONNECTIONS: int = 100
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_HTTP_KEEPALIVE_SECONDS: float = 30.0
+    LLM_HTTP2: bool = True
+    LLM_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    LLM_READ_TIMEOUT_SECONDS: float = 60.0
+
+    # Embedding cache settings
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MEMORY_MB: int = 64
+    EMBEDDING_CACHE_DISK_MB: int = 1024
+
+    # Retrieval settings
+    HYBRID_SEARCH_ENABLED: bool = True
+    HYBRID_CANDIDATES: int = 20
+    HYBRID_RRF_K: int = 60
+    RAG_TOP_K: int = 5
+
+    # Query embedding cache settings
+    QUERY_CACHE_ENABLED: bool = True
+    QUERY_CACHE_MEMORY_MB: int = 32
+    QUERY_CACHE_TTL_SECONDS: int = 86400
+
+    # Semantic answer cache settings
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_MAX_ENTRIES: int = 5000
+    ANSWER_CACHE_SIMILARITY: float = 0.95
+    ANSWER_CACHE_TTL_SECONDS: int = 86400
+
+    # Summarization settings
+    SUMMARY_MAP_REDUCE_ENABLED: bool = True
+    SUMMARY_MAP_CONCURRENCY: int = 8
+    SUMMARY_SECTION_CHARACTERS: int = 24000
+    SUMMARY_MAX_SECTIONS: int = 32
+
     # Template settings
     DEFAULT_LANGUAGE: str = "ar"
     PRIMARY_LANGUAGE: str = "ar"
@@ -42,8 +102,27 @@ class settings(BaseSettings):
     VECTOR_DB_HOST: str = "localhost"
     VECTOR_DB_PORT: int = 6333
     VECTOR_DB_GRPC_PORT: int = 6334
+    VECTOR_DB_PREFER_GRPC: bool = False
+    VECTOR_DB_PROBE_INTERVAL_SECONDS: float = 15.0
+    VECTOR_DB_FAILURE_THRESHOLD: int = 3
+    VECTOR_DB_CIRCUIT_RESET_SECONDS: float = 30.0
+    VECTOR_DB_UPSERT_CONCURRENCY: int = 4
+    VECTOR_DB_UPSERT_BATCH_KB: int = 4096
+    VECTOR_DB_UPSERT_WAIT: bool = True
     VECTOR_DB_DISTANCE_METHOD: str
     VECTOR_DB_COLLECTION: str = "sanadapp"
+    VECTOR_DB_ALLOW_EXACT_SEARCH: bool = False
+
+    # Vector DB collection profile (0 = Qdrant default)
+    VECTOR_DB_HNSW_M: int = 16
+    VECTOR_DB_HNSW_EF_CONSTRUCT: int = 100
+    VECTOR_DB_HNSW_EF: int = 0
+    VECTOR_DB_VECTORS_ON_DISK: bool = True
+    VECTOR_DB_PAYLOAD_ON_DISK: bool = False
+    VECTOR_DB_SEGMENT_NUMBER: int = 0
+    VECTOR_DB_INDEXING_THRESHOLD_KB: int = 0
+    VECTOR_DB_MEMMAP_THRESHOLD_KB: int = 0
+    VECTOR_DB_MAX_SEGMENT_SIZE_KB: int = 0
 
     class Config:
         env_file = "src/.env"
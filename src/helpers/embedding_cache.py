@@ -0,0 +1,182 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import numpy as np
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+
+import logging
+logger = logging.getLogger(__name__)
+
+class EmbeddingCache:
+    """
+    Two-tier cache for embeddings: an in-memory LRU in front of a sqlite store on disk.
+    Vectors are kept as float32 in both tiers and both tiers evict by size.
+    """
+
+    # approximate per-entry overhead of the key and bookkeeping in memory
+    ENTRY_OVERHEAD_BYTES = 200
+
+    def __init__(self, db_path: str, memory_max_bytes: int, disk_max_bytes: int):
+        self.db_path = db_path
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+
+        self.memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.memory_bytes = 0
+
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "memory_evictions": 0, "disk_evictions": 0}
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_access ON embeddings (last_access)")
+        self.conn.commit()
+        self.disk_bytes = self.conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+
+    @staticmethod
+    def make_key(text: str, model_id: str, embedding_size: int, document_type: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model_id, str(embedding_size), document_type, text):
+            digest.update(str(part).encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    async def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        """Look up float32 embeddings, memory first then disk. Missing keys map to None."""
+        results = [None] * len(keys)
+        disk_keys = []
+
+        for i, key in enumerate(keys):
+            vector = self.memory.get(key)
+            if vector is not None:
+                self.memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                results[i] = vector
+            else:
+                disk_keys.append(i)
+
+        if disk_keys:
+            found = await asyncio.to_thread(self._disk_get, [keys[i] for i in disk_keys])
+            for i in disk_keys:
+                vector = found.get(keys[i])
+                if vector is None:
+                    self.counters["misses"] += 1
+                    continue
+                self.counters["disk_hits"] += 1
+                self._memory_put(keys[i], vector)
+                results[i] = vector
+
+        return results
+
+    async def set_many(self, keys: List[str], vectors):
+        """Store embeddings given as rows of a float32 matrix or as separate vectors."""
+        entries = {}
+        for key, vector in zip(keys, vectors):
+            if vector is None or isinstance(vector, BaseException) or not len(vector):
+                continue
+            # copy: a row view would keep its whole batch matrix alive in the cache
+            vector = np.array(vector, dtype=np.float32)
+            if np.isnan(vector).any():
+                continue
+            entries[key] = vector
+            self._memory_put(key, vector)
+
+        if entries:
+            await asyncio.to_thread(self._disk_put, entries)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.counters["memory_hits"] + self.counters["disk_hits"] + self.counters["misses"]
+        hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+        return {
+            **self.counters,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "memory_bytes": self.memory_bytes,
+            "disk_bytes": self.disk_bytes,
+        }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def _entry_size(self, vector: np.ndarray) -> int:
+        return vector.nbytes + self.ENTRY_OVERHEAD_BYTES
+
+    def _memory_put(self, key: str, vector: np.ndarray):
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return
+
+        self.memory[key] = vector
+        self.memory_bytes += self._entry_size(vector)
+
+        while self.memory_bytes > self.memory_max_bytes and self.memory:
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_bytes -= self._entry_size(evicted)
+            self.counters["memory_evictions"] += 1
+
+    def _disk_get(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self.lock:
+            # stay well below sqlite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                rows = self.conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+
+            if found:
+                now = time.time()
+                self.conn.executemany("UPDATE embeddings SET last_access = ? WHERE key = ?",
+                                      [(now, key) for key in found])
+                self.conn.commit()
+        return found
+
+    def _disk_put(self, entries: Dict[str, np.ndarray]):
+        now = time.time()
+        with self.lock:
+            for key, vector in entries.items():
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO embeddings (key, vector, last_access) VALUES (?, ?, ?)",
+                    (key, vector.tobytes(), now)
+                )
+                if cursor.rowcount:
+                    self.disk_bytes += vector.nbytes
+            self.conn.commit()
+
+            if self.disk_bytes > self.disk_max_bytes:
+                self._disk_evict()
+
+    def _disk_evict(self):
+        # evict least recently used rows down to 90% of the budget to avoid evicting on every insert
+        target = int(self.disk_max_bytes * 0.9)
+        while self.disk_bytes > target:
+            rows = self.conn.execute(
+                "SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_access LIMIT 1000"
+            ).fetchall()
+            if not rows:
+                self.disk_bytes = 0
+                break
+
+            evicted = []
+            for key, size in rows:
+                if self.disk_bytes <= target:
+                    break
+                evicted.append((key,))
+                self.disk_bytes -= size
+
+            self.conn.executemany("DELETE FROM embeddings WHERE key = ?", evicted)
+            self.counters["disk_evictions"] += len(evicted)
+        self.conn.commit()
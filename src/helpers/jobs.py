@@ -0,0 +1,166 @@
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+import asyncio
+import time
+import uuid
+
+import logging
+logger = logging.getLogger(__name__)
+
+class JobStatusEnum(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class IngestionJob:
+    def __init__(self, job_id: str, run: Callable[[Callable[[dict], None]], Awaitable[dict]], info: dict):
+        self.job_id = job_id
+        self.run = run
+        self.info = info
+        self.status = JobStatusEnum.QUEUED
+        self.message = "Job queued"
+        self.progress = {"chunk_count": 0, "embeddings_count": 0, "inserted_count": 0}
+        self.result = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+        # replaced with a fresh event on every update so watchers wake up once per change
+        self.changed = asyncio.Event()
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JobStatusEnum.COMPLETED, JobStatusEnum.FAILED)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status.value,
+            "message": self.message,
+            **self.info,
+            **self.progress,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+        }
+
+class IngestionJobManager:
+    """
+    Runs ingestion jobs on a bounded pool of background workers and keeps
+    their status and progress so clients can poll or stream it.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queued_jobs: int = 100, max_finished_jobs: int = 1000,
+                 max_held_bytes: int = 0):
+        self.max_workers = max_workers
+        self.max_finished_jobs = max_finished_jobs
+
+        # upload bytes that jobs may keep in memory until they run
+        self.max_held_bytes = max_held_bytes
+        self.held_bytes = 0
+
+        self.queue = asyncio.Queue(maxsize=max_queued_jobs)
+        self.jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self.workers = []
+
+    async def start(self):
+        for i in range(self.max_workers):
+            self.workers.append(asyncio.create_task(self._worker(i)))
+        logger.info(f"Ingestion job pool started with {self.max_workers} workers")
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        logger.info("Ingestion job pool stopped")
+
+    def submit(self, run: Callable[[Callable[[dict], None]], Awaitable[dict]],
+               job_id: str = None, **info) -> Optional[IngestionJob]:
+        """
+        Queue `run(progress_callback)` for background execution.
+        Returns None when the queue is full.
+        """
+        job = IngestionJob(job_id=job_id or str(uuid.uuid4()), run=run, info=info)
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            logger.warning("Ingestion job queue is full, rejecting job")
+            return None
+
+        self.jobs[job.job_id] = job
+        self._prune_finished_jobs()
+        return job
+
+    def reserve_bytes(self, size: int) -> bool:
+        """
+        Account for `size` bytes of upload content held in memory by a job.
+        Returns False when that would exceed `max_held_bytes`; the caller should spill the content to disk.
+        """
+        if self.held_bytes + size > self.max_held_bytes:
+            return False
+        self.held_bytes += size
+        return True
+
+    def release_bytes(self, size: int):
+        self.held_bytes = max(0, self.held_bytes - size)
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        return self.jobs.get(job_id)
+
+    async def watch(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield a snapshot of the job on every change until it finishes."""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return
+
+        while True:
+            changed = job.changed
+            yield job.snapshot()
+            if job.is_finished:
+                return
+            await changed.wait()
+
+    def _update(self, job: IngestionJob, **fields):
+        for key, value in fields.items():
+            setattr(job, key, value)
+        changed, job.changed = job.changed, asyncio.Event()
+        changed.set()
+
+    async def _worker(self, worker_id: int):
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._run_job(job)
+            finally:
+                self.queue.task_done()
+
+    async def _run_job(self, job: IngestionJob):
+        self._update(job, status=JobStatusEnum.RUNNING, message="Job running", started_at=time.time())
+
+        def progress_callback(progress: dict):
+            self._update(job, progress={**job.progress, **progress})
+
+        try:
+            result = await job.run(progress_callback)
+        except Exception as e:
+            logger.error(f"Ingestion job {job.job_id} failed: {e}")
+            self._update(job, status=JobStatusEnum.FAILED, message=str(e), finished_at=time.time())
+            return
+        finally:
+            # finished jobs are kept for status queries, drop what the closure holds
+            job.run = None
+
+        progress = {key: result.get(key, value) for key, value in job.progress.items()}
+        status = JobStatusEnum.COMPLETED if result.get("success") else JobStatusEnum.FAILED
+        self._update(job, status=status, progress=progress, message=result.get("message", ""),
+                    result=result, finished_at=time.time())
+        logger.info(f"Ingestion job {job.job_id} {status.value}: {result.get('message', '')}")
+
+    def _prune_finished_jobs(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.is_finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[job_id]
@@ -0,0 +1,113 @@
+from bisect import bisect_left, bisect_right
+from enum import Enum
+from typing import Dict, List, Optional
+from langchain_core.documents import Document
+import copy
+import re
+
+class TextSplitterEnum(Enum):
+    RECURSIVE = "recursive"
+    LEGAL = "legal"
+
+_DIGITS = "0-9٠-٩۰-۹"
+_ORDINAL_CLAUSES = "أولا|ثانيا|ثالثا|رابعا|خامسا|سادسا|سابعا|ثامنا|تاسعا|عاشرا"
+
+# Boundary patterns from strongest to weakest. A chunk is cut at the strongest
+# boundary that fits, so articles and clauses are kept whole whenever possible.
+_BOUNDARY_PATTERNS = [
+    # article / chapter / section headings at the start of a line
+    (re.compile(
+        rf"^[ \t]*[\(\[]?(?:(?:ال)?(?:مادة|باب|فصل|فرع|قسم)|Article|Chapter|Section)(?=[\s\(\[:\-–{_DIGITS}])",
+        re.MULTILINE), "start"),
+    # numbered or lettered clauses at the start of a line: "1-", "(2)", "أ)", "أولاً:", "البند"
+    (re.compile(
+        rf"^[ \t]*(?:\(?[{_DIGITS}]{{1,3}}[\)\-–.:/]|\([أ-ي]\)|[أ-ي][\)\-–]|(?:{_ORDINAL_CLAUSES})ً?[ \t]*[:\-–]|البند)",
+        re.MULTILINE), "start"),
+    # paragraph breaks
+    (re.compile(r"\n[ \t]*\n\s*"), "end"),
+    # sentence ends (Arabic and Latin punctuation) and line breaks
+    (re.compile(r"[.!?؟؛…]+[\"'»)\]]*\s+|\n"), "end"),
+    # clause separators and plain whitespace
+    (re.compile(r"[،,:]?\s+"), "end"),
+]
+
+class LegalTextSplitter:
+    """
+    Chunker for Arabic legal text that prefers to cut before article (مادة) and clause
+    headings, then at paragraph, sentence and word boundaries.
+    Every boundary is found with one regex pass per level, and each chunk is placed with
+    a binary search over those positions, so splitting is linear in the text length.
+
+    `chunk_size` is the maximum chunk length in characters. `chunk_overlap` is the
+    maximum number of characters repeated from the previous chunk; it is applied only
+    when a chunk had to be cut inside an article or clause.
+    """
+
+    # cuts must leave at least this fraction of chunk_size in the chunk
+    MIN_FILL = 0.3
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 100):
+        if chunk_overlap >= chunk_size:
+            raise ValueError(f"chunk_overlap ({chunk_overlap}) must be smaller than chunk_size ({chunk_size})")
+
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.min_chunk_size = int(chunk_size * self.MIN_FILL)
+
+    def _boundaries(self, text: str) -> List[List[int]]:
+        return [
+            [match.start() if anchor == "start" else match.end() for match in pattern.finditer(text)]
+            for pattern, anchor in _BOUNDARY_PATTERNS
+        ]
+
+    def split_text(self, text: str) -> List[str]:
+        boundaries = self._boundaries(text)
+        structural_levels = 2
+        word_boundaries = boundaries[-1]
+
+        chunks = []
+        length = len(text)
+        start = 0
+
+        while start < length:
+            while start < length and text[start].isspace():
+                start += 1
+            if start >= length:
+                break
+
+            limit = start + self.chunk_size
+            if limit >= length:
+                end, level = length, 0
+            else:
+                end, level = limit, len(boundaries)
+                lowest = start + self.min_chunk_size
+                for candidate_level, positions in enumerate(boundaries):
+                    i = bisect_right(positions, limit) - 1
+                    if i >= 0 and positions[i] > lowest:
+                        end, level = positions[i], candidate_level
+                        break
+
+            chunk = text[start:end].strip()
+            if chunk:
+                chunks.append(chunk)
+            if end >= length:
+                break
+
+            # overlap only when the cut fell inside an article or clause, aligned to a word start
+            next_start = end
+            if level >= structural_levels and self.chunk_overlap:
+                i = bisect_left(word_boundaries, max(start + 1, end - self.chunk_overlap))
+                if i < len(word_boundaries) and word_boundaries[i] < end:
+                    next_start = word_boundaries[i]
+            start = next_start
+
+        return chunks
+
+    def create_documents(self, texts: List[str], metadatas: Optional[List[Dict]] = None) -> List[Document]:
+        """Split texts into Documents, copying each text's metadata to its chunks."""
+        metadatas = metadatas or [{}] * len(texts)
+        return [
+            Document(page_content=chunk, metadata=copy.deepcopy(metadata))
+            for text, metadata in zip(texts, metadatas)
+            for chunk in self.split_text(text)
+        ]
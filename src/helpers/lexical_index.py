@@ -0,0 +1,115 @@
+from typing import List, Tuple
+import asyncio
+import re
+import sqlite3
+import threading
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Arabic harakat, superscript alef and tatweel. unicode61 splits words at these marks instead of
+# folding them, so they are stripped from chunks and queries before they reach FTS5.
+ARABIC_MARKS = re.compile("[\u064B-\u065F\u0670\u0640]")
+
+# function words that would match nearly every chunk
+STOPWORDS = frozenset("""
+    في من على إلى الى عن مع أن ان إن أو او ما لا لم لن هل هو هي هم هذا هذه ذلك تلك التي الذي الذين
+    كان كانت قد كل بعد قبل عند بين حتى إذا اذا ثم أي اي ماذا كيف متى أين اين لماذا
+    a an and are as at be by for from how in is it of on or the to what when where which who why with
+""".split())
+
+def fold_text(text: str) -> str:
+    return ARABIC_MARKS.sub("", text)
+
+class LexicalIndex:
+    """
+    BM25 keyword index over chunk text, kept in a sqlite FTS5 table next to the vector DB.
+    Chunks are added and removed as they are upserted and deleted, so it never needs a full rebuild.
+    Exact tokens such as article numbers match here even when embeddings rank them poorly.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # chunks holds the folded text that is matched, records the original text that is returned
+        self.conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(
+                text, tokenize = 'unicode61 remove_diacritics 2'
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS records (
+                rowid INTEGER PRIMARY KEY,
+                collection TEXT NOT NULL,
+                record_id TEXT NOT NULL,
+                asset_id TEXT,
+                text TEXT,
+                UNIQUE (collection, record_id)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS records_asset ON records (collection, asset_id)")
+        self.conn.commit()
+
+    @staticmethod
+    def _match_query(query: str) -> str:
+        # quote every term so punctuation and FTS5 operators in user input are taken literally
+        terms = [term for term in re.findall(r"\w+", fold_text(query)) if term.lower() not in STOPWORDS]
+        return " OR ".join(f'"{term}"' for term in dict.fromkeys(terms))
+
+    async def add_many(self, collection_name: str, record_ids: List[str], texts: List[str], asset_ids: List[str]):
+        await asyncio.to_thread(self._add_many, collection_name, record_ids, texts, asset_ids)
+
+    async def delete_records(self, collection_name: str, record_ids: List[str]):
+        await asyncio.to_thread(self._delete, "collection = ? AND record_id = ?",
+                                [(collection_name, record_id) for record_id in record_ids])
+
+    async def delete_asset(self, collection_name: str, asset_id: str):
+        await asyncio.to_thread(self._delete, "collection = ? AND asset_id = ?", [(collection_name, asset_id)])
+
+    async def delete_collection(self, collection_name: str):
+        await asyncio.to_thread(self._delete, "collection = ?", [(collection_name,)])
+
+    async def search(self, collection_name: str, query: str, top_k: int) -> List[Tuple[str, float, dict]]:
+        """Best matches as (record_id, bm25 score, payload), highest score first."""
+        match_query = self._match_query(query)
+        if not match_query:
+            return []
+        return await asyncio.to_thread(self._search, collection_name, match_query, top_k)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def _add_many(self, collection_name: str, record_ids: List[str], texts: List[str], asset_ids: List[str]):
+        with self.lock, self.conn:
+            for record_id, text, asset_id in zip(record_ids, texts, asset_ids):
+                row = self.conn.execute("SELECT rowid FROM records WHERE collection = ? AND record_id = ?",
+                                        (collection_name, record_id)).fetchone()
+                if row:
+                    # record ids are derived from the chunk text, so a stored chunk is unchanged
+                    continue
+                rowid = self.conn.execute("INSERT INTO records (collection, record_id, asset_id, text) VALUES (?, ?, ?, ?)",
+                                          (collection_name, record_id, asset_id, text)).lastrowid
+                self.conn.execute("INSERT INTO chunks (rowid, text) VALUES (?, ?)", (rowid, fold_text(text)))
+
+    def _delete(self, where: str, params: List[tuple]):
+        with self.lock, self.conn:
+            for param in params:
+                rowids = [(rowid,) for (rowid,) in
+                          self.conn.execute(f"SELECT rowid FROM records WHERE {where}", param)]
+                self.conn.executemany("DELETE FROM chunks WHERE rowid = ?", rowids)
+                self.conn.executemany("DELETE FROM records WHERE rowid = ?", rowids)
+
+    def _search(self, collection_name: str, match_query: str, top_k: int) -> List[Tuple[str, float, dict]]:
+        with self.lock:
+            rows = self.conn.execute("""
+                SELECT records.record_id, bm25(chunks), records.text, records.asset_id
+                FROM chunks JOIN records ON records.rowid = chunks.rowid
+                WHERE chunks MATCH ? AND records.collection = ?
+                ORDER BY bm25(chunks)
+                LIMIT ?
+            """, (match_query, collection_name, top_k)).fetchall()
+        # FTS5 bm25() is negated so that better matches sort first
+        return [(record_id, -score, {"text": text, "asset_id": asset_id}) for record_id, score, text, asset_id in rows]
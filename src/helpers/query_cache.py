@@ -0,0 +1,115 @@
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+import numpy as np
+import asyncio
+import re
+import time
+import unicodedata
+
+import logging
+logger = logging.getLogger(__name__)
+
+class QueryEmbeddingCache:
+    """
+    In-memory LRU cache of query embeddings with a time to live, for the chat path.
+    Queries are normalized before lookup, so recurring questions that differ only in case,
+    spacing or Unicode form share one entry. Concurrent misses on the same query share one
+    embedding call. Kept apart from EmbeddingCache so document ingestion never evicts queries.
+    """
+
+    # approximate per-entry overhead of the key and bookkeeping in memory
+    ENTRY_OVERHEAD_BYTES = 300
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.bytes = 0
+        self.pending: Dict[str, asyncio.Future] = {}
+
+        self.counters = {"hits": 0, "misses": 0, "coalesced": 0, "expired": 0, "evictions": 0}
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", query)).strip().casefold()
+
+    @classmethod
+    def make_key(cls, query: str, model_id: str, embedding_size: int) -> str:
+        return f"{model_id}\x00{embedding_size}\x00{cls.normalize(query)}"
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        vector, expires_at = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.counters["expired"] += 1
+            return None
+
+        self.entries.move_to_end(key)
+        return vector
+
+    def put(self, key: str, vector: np.ndarray):
+        # copy: callers may keep modifying the array they passed in
+        vector = np.array(vector, dtype=np.float32)
+        if key in self.entries:
+            self._remove(key)
+
+        self.entries[key] = (vector, time.monotonic() + self.ttl_seconds)
+        self.bytes += self._entry_size(vector)
+
+        while self.bytes > self.max_bytes and self.entries:
+            evicted_key = next(iter(self.entries))
+            self._remove(evicted_key)
+            self.counters["evictions"] += 1
+
+    async def get_or_embed(self, key: str, embed: Callable[[], Awaitable[Optional[np.ndarray]]]) -> Optional[np.ndarray]:
+        """Return the cached embedding, or call `embed` once for all concurrent requests of the key."""
+        vector = self.get(key)
+        if vector is not None:
+            self.counters["hits"] += 1
+            return vector
+
+        pending = self.pending.get(key)
+        if pending is not None:
+            self.counters["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        self.counters["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self.pending[key] = future
+        try:
+            vector = await embed()
+            if vector is not None and not np.isnan(vector).any():
+                self.put(key, vector)
+            future.set_result(vector)
+            return vector
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # the waiters re-raise it; mark it retrieved so an unwaited failure is not logged
+            future.exception()
+            raise
+        finally:
+            del self.pending[key]
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.counters["hits"] + self.counters["misses"] + self.counters["coalesced"]
+        return {
+            **self.counters,
+            "hit_rate": round((self.counters["hits"] + self.counters["coalesced"]) / lookups, 4) if lookups else 0.0,
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+        }
+
+    def _entry_size(self, vector: np.ndarray) -> int:
+        return vector.nbytes + self.ENTRY_OVERHEAD_BYTES
+
+    def _remove(self, key: str):
+        vector, _ = self.entries.pop(key)
+        self.bytes -= self._entry_size(vector)
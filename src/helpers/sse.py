@@ -0,0 +1,33 @@
+from typing import AsyncIterator, Awaitable, Callable, Optional
+import json
+
+import logging
+logger = logging.getLogger(__name__)
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def text_event_stream(stream: AsyncIterator[str], empty_message: str,
+                            on_complete: Optional[Callable[[str], Awaitable[None]]] = None) -> AsyncIterator[str]:
+    """
+    Forward a stream of text deltas as server-sent events: one `token` event per delta,
+    then a single `done` event, or an `error` event if the stream failed or produced nothing.
+    `on_complete`, if given, is awaited with the full text before `done` is sent.
+    """
+    parts = []
+    try:
+        async for delta in stream:
+            parts.append(delta)
+            yield sse_event("token", {"text": delta})
+
+        if not parts:
+            yield sse_event("error", {"message": empty_message})
+            return
+
+        if on_complete is not None:
+            await on_complete("".join(parts))
+        yield sse_event("done", {"success": True})
+
+    except Exception as e:
+        logger.error(f"Error while streaming: {e}")
+        yield sse_event("error", {"message": str(e)})
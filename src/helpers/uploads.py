@@ -0,0 +1,41 @@
+from contextvars import ContextVar
+from typing import Callable
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from starlette.formparsers import MultiPartParser
+import starlette.requests
+from helpers.config import get_settings
+
+# set while an InMemoryUploadRoute parses its request body
+_in_memory_uploads = ContextVar("in_memory_uploads", default=False)
+
+class _UploadParser(MultiPartParser):
+    """Starlette's multipart parser, keeping the upload of an InMemoryUploadRoute in memory."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if _in_memory_uploads.get():
+            self.spool_max_size = get_settings().MAX_FILE_SIZE
+            # one upload per request, so a request holds at most MAX_FILE_SIZE
+            self.max_files = 1
+
+starlette.requests.MultiPartParser = _UploadParser
+
+class InMemoryUploadRoute(APIRoute):
+    """
+    Route whose upload, up to MAX_FILE_SIZE, stays in memory instead of being spooled to a
+    temporary file. Requests carrying more than one file are rejected with 400.
+    Other routes keep Starlette's default spooling.
+    """
+
+    def get_route_handler(self) -> Callable:
+        route_handler = super().get_route_handler()
+
+        async def in_memory_upload_handler(request: Request) -> Response:
+            token = _in_memory_uploads.set(True)
+            try:
+                return await route_handler(request)
+            finally:
+                _in_memory_uploads.reset(token)
+
+        return in_memory_upload_handler
@@ -5,6 +5,13 @@ from stores.LLM import LLMFactory
 from stores.VectorDB import VDBFactory
 from stores.LLM.templates import TemplateParser
 from helpers.config import get_settings
+from helpers.jobs import IngestionJobManager
+from helpers.embedding_cache import EmbeddingCache
+from helpers.lexical_index import LexicalIndex
+from helpers.query_cache import QueryEmbeddingCache
+from helpers.answer_cache import SemanticAnswerCache
+from controllers import BaseController, DataController
+import os
 settings = get_settings()
 
 import logging
@@ -33,23 +40,68 @@ async def startup_db():
         else:
             logger.warning("⚠️ Vector DB connection established but health check failed")
 
-        # generation client
+        # one keep-alive connection pool for all LLM provider clients
         llm_provider_factory = LLMFactory()
-        app.generation_client = llm_provider_factory.create(provider=settings.GENERATION_BACKEND)
+        app.llm_http_client = llm_provider_factory.create_http_client()
+
+        # generation client
+        app.generation_client = llm_provider_factory.create(provider=settings.GENERATION_BACKEND,
+                                                            http_client=app.llm_http_client)
         await app.generation_client.set_generation_model(generation_model_id=settings.GENERATION_MODEL_ID)
 
         # embedding client
-        app.embedding_client = llm_provider_factory.create(provider=settings.EMBEDDING_BACKEND)
+        app.embedding_client = llm_provider_factory.create(provider=settings.EMBEDDING_BACKEND,
+                                                           http_client=app.llm_http_client)
         await app.embedding_client.set_embedding_model(embedding_model_id=settings.EMBEDDING_MODEL_ID,
                                                        embedding_size=settings.EMBEDDING_SIZE)
 
+        # embedding cache
+        app.embedding_cache = None
+        if settings.EMBEDDING_CACHE_ENABLED:
+            app.embedding_cache = EmbeddingCache(
+                db_path=os.path.join(BaseController().get_vdb_path("embedding_cache"), "embeddings.db"),
+                memory_max_bytes=settings.EMBEDDING_CACHE_MEMORY_MB * 1024 * 1024,
+                disk_max_bytes=settings.EMBEDDING_CACHE_DISK_MB * 1024 * 1024
+            )
+
+        # query embedding cache for the chat path
+        app.query_cache = None
+        if settings.QUERY_CACHE_ENABLED:
+            app.query_cache = QueryEmbeddingCache(
+                max_bytes=settings.QUERY_CACHE_MEMORY_MB * 1024 * 1024,
+                ttl_seconds=settings.QUERY_CACHE_TTL_SECONDS
+            )
+
+        # semantic answer cache for the chat path
+        app.answer_cache = None
+        if settings.ANSWER_CACHE_ENABLED:
+            app.answer_cache = SemanticAnswerCache(
+                max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+                similarity_threshold=settings.ANSWER_CACHE_SIMILARITY,
+                ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS
+            )
+
+        # lexical index for hybrid search
+        app.lexical_index = None
+        if settings.HYBRID_SEARCH_ENABLED:
+            app.lexical_index = LexicalIndex(
+                db_path=os.path.join(BaseController().get_vdb_path("lexical_index"), "chunks.db")
+            )
+
         # summarization client
-        app.summarization_client = llm_provider_factory.create(provider=settings.SUMMARIZATION_BACKEND)
+        app.summarization_client = llm_provider_factory.create(provider=settings.SUMMARIZATION_BACKEND,
+                                                               http_client=app.llm_http_client)
         await app.summarization_client.set_summarization_model(summarization_model_id=settings.SUMMARIZATION_MODEL_ID)
 
         # template parser
         app.template_parser = TemplateParser(lang=settings.PRIMARY_LANGUAGE,
                                             default_lang=settings.DEFAULT_LANGUAGE)
+
+        # background ingestion jobs
+        app.ingestion_jobs = IngestionJobManager(max_workers=settings.INGESTION_WORKERS,
+                                                 max_queued_jobs=settings.INGESTION_MAX_QUEUED_JOBS,
+                                                 max_held_bytes=settings.INGESTION_MAX_HELD_MB * 1024 * 1024)
+        await app.ingestion_jobs.start()
         
         logger.info("Application startup completed")
 
@@ -60,6 +112,18 @@ async def startup_db():
 @app.on_event("shutdown")
 async def shutdown_db():
     try:
+        await app.ingestion_jobs.stop()
+        DataController.shutdown_pdf_executor()
+        if app.embedding_cache:
+            logger.info(f"Embedding cache stats: {app.embedding_cache.stats()}")
+            app.embedding_cache.close()
+        if app.lexical_index:
+            app.lexical_index.close()
+        if app.query_cache:
+            logger.info(f"Query cache stats: {app.query_cache.stats()}")
+        if app.answer_cache:
+            logger.info(f"Answer cache stats: {app.answer_cache.stats()}")
+        await app.llm_http_client.aclose()
         await app.vdb_client.disconnect()
         logger.info("🛑 Vector DB connection closed successfully")
     except Exception as e:
@@ -72,7 +136,15 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "SanadApp API",
-        "version": "0.1.0"
+        "version": "0.1.0",
+        "vector_db": app.vdb_client.connection_stats(),
+        "query_cache": app.query_cache.stats() if app.query_cache else None,
+        "answer_cache": app.answer_cache.stats() if app.answer_cache else None,
+        "rate_limits": {
+            "generation": app.generation_client.rate_limiter.stats(),
+            "embedding": app.embedding_client.rate_limiter.stats(),
+            "summarization": app.summarization_client.rate_limiter.stats(),
+        }
     }
 
 # Include routers
@@ -0,0 +1,39 @@
+from typing import Dict, List, Tuple
+import fitz
+
+# These functions run inside spawned worker processes. The module lives outside the
+# `helpers` package so that importing it there does not run `helpers/__init__.py`
+# and load the application settings and caches into every worker.
+
+def open_pdf(file_path: str, stream: bytes = None) -> fitz.Document:
+    """Open a PDF from disk, or from memory when `stream` is given."""
+    if stream is not None:
+        return fitz.open(stream=stream, filetype="pdf")
+    return fitz.open(file_path)
+
+def count_pdf_pages(file_path: str, stream: bytes = None) -> int:
+    with open_pdf(file_path, stream) as doc:
+        return len(doc)
+
+def extract_pdf_pages(file_path: str, start: int, end: int, stream: bytes = None) -> List[Tuple[str, Dict]]:
+    """
+    Extract pages [start, end) of a PDF as (text, metadata) pairs.
+    Metadata matches what PyMuPDFLoader attaches to each page. With `stream` the PDF
+    is read from memory and `file_path` only names the source in the metadata.
+    """
+    pages = []
+    with open_pdf(file_path, stream) as doc:
+        doc_metadata = {k: v for k, v in doc.metadata.items() if type(v) in [str, int]}
+        for page_number in range(start, end):
+            page = doc[page_number]
+            metadata = dict(
+                {
+                    "source": file_path,
+                    "file_path": file_path,
+                    "page": page.number,
+                    "total_pages": len(doc),
+                },
+                **doc_metadata,
+            )
+            pages.append((page.get_text(), metadata))
+    return pages
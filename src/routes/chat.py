@@ -1,13 +1,19 @@
 from fastapi import APIRouter, HTTPException, Depends,status, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from controllers import VDBController, LLMController
 from helpers.config import get_settings, settings
+from helpers.sse import text_event_stream
 from .schema import *
 import logging
 logger = logging.getLogger(__name__)
 
 chat_router = APIRouter(prefix="/chat", tags=["Chat"])
 
+def _check_search_options(chat_request: ChatRequest, app_settings: settings):
+    # an exact search scans the whole collection, so public callers cannot ask for it unless allowed
+    if chat_request.exact and not app_settings.VECTOR_DB_ALLOW_EXACT_SEARCH:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Exact search is disabled")
+
 @chat_router.get("/health", response_model= HealthResponse)
 async def get_vdb_health(request: Request):
         
@@ -16,7 +22,11 @@ async def get_vdb_health(request: Request):
             embedding_provider=request.app.embedding_client,
             generate_provider=request.app.generation_client,
             summarize_provider=request.app.summarization_client,
-            template_parser=request.app.template_parser
+            template_parser=request.app.template_parser,
+            embedding_cache=request.app.embedding_cache,
+            lexical_index=request.app.lexical_index,
+            query_cache=request.app.query_cache,
+            answer_cache=request.app.answer_cache
         )
         result = await vdb_controller.get_vdb_health()
 
@@ -28,18 +38,28 @@ async def generate_answer(request: Request, chat_request: ChatRequest, app_setti
     """
     Generate text based on the provided prompt and chat history.
     """
+    _check_search_options(chat_request, app_settings)
+
     try:
         vdb_controller = VDBController(
             vdb_provider=request.app.vdb_client,
             embedding_provider=request.app.embedding_client,
             generate_provider=request.app.generation_client,
             summarize_provider=request.app.summarization_client,
-            template_parser=request.app.template_parser
+            template_parser=request.app.template_parser,
+            embedding_cache=request.app.embedding_cache,
+            lexical_index=request.app.lexical_index,
+            query_cache=request.app.query_cache,
+            answer_cache=request.app.answer_cache
         )
+        # read before retrieval, so an invalidation during retrieval or generation is not missed
+        cache_epoch = request.app.answer_cache.epoch if request.app.answer_cache else None
         result = await vdb_controller.search_chunks(
             query=chat_request.query,
-            top_k=10,
-            similarity_threshold=0.7
+            top_k=app_settings.RAG_TOP_K,
+            similarity_threshold=0.7,
+            hnsw_ef=chat_request.hnsw_ef,
+            exact=chat_request.exact
         )
 
         if not result.get("success", False):
@@ -57,11 +77,15 @@ async def generate_answer(request: Request, chat_request: ChatRequest, app_setti
             embedding_provider=request.app.embedding_client,
             generate_provider=request.app.generation_client,
             summarize_provider=request.app.summarization_client,
-            template_parser=request.app.template_parser
+            template_parser=request.app.template_parser,
+            embedding_cache=request.app.embedding_cache,
+            query_cache=request.app.query_cache,
+            answer_cache=request.app.answer_cache
         )
         answer = await llm_controller.generate_text(
             query=chat_request.query,
-            chunks_result=result.get("results", [])
+            chunks_result=result.get("results", []),
+            cache_epoch=cache_epoch
         )
 
         if not answer:
@@ -81,4 +105,71 @@ async def generate_answer(request: Request, chat_request: ChatRequest, app_setti
         raise
     except Exception as e:
         logger.error(f"Error generating text: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@chat_router.post("/stream")
+async def stream_answer(request: Request, chat_request: ChatRequest, app_settings: settings = Depends(get_settings)):
+    """
+    Generate the RAG answer and stream it as server-sent events while it is generated:
+    `token` events carry text deltas, followed by one `done` or `error` event.
+    """
+    _check_search_options(chat_request, app_settings)
+
+    try:
+        vdb_controller = VDBController(
+            vdb_provider=request.app.vdb_client,
+            embedding_provider=request.app.embedding_client,
+            generate_provider=request.app.generation_client,
+            summarize_provider=request.app.summarization_client,
+            template_parser=request.app.template_parser,
+            embedding_cache=request.app.embedding_cache,
+            lexical_index=request.app.lexical_index,
+            query_cache=request.app.query_cache,
+            answer_cache=request.app.answer_cache
+        )
+        # read before retrieval, so an invalidation during retrieval or generation is not missed
+        cache_epoch = request.app.answer_cache.epoch if request.app.answer_cache else None
+        result = await vdb_controller.search_chunks(
+            query=chat_request.query,
+            top_k=app_settings.RAG_TOP_K,
+            similarity_threshold=0.7,
+            hnsw_ef=chat_request.hnsw_ef,
+            exact=chat_request.exact
+        )
+
+        if not result.get("success", False):
+            return JSONResponse(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                content={
+                    "signal": "VDB search error",
+                    "message": result.get("message", "Unknown error"),
+                    "results": result.get("results", []),
+                    "count": result.get("count", 0)
+                }
+            )
+
+        llm_controller = LLMController(
+            embedding_provider=request.app.embedding_client,
+            generate_provider=request.app.generation_client,
+            summarize_provider=request.app.summarization_client,
+            template_parser=request.app.template_parser,
+            embedding_cache=request.app.embedding_cache,
+            query_cache=request.app.query_cache,
+            answer_cache=request.app.answer_cache
+        )
+        stream = llm_controller.generate_text_stream(
+            query=chat_request.query,
+            chunks_result=result.get("results", []),
+            cache_epoch=cache_epoch
+        )
+
+        return StreamingResponse(
+            text_event_stream(stream, empty_message="No answer generated from RAG process."),
+            media_type="text/event-stream"
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error streaming answer: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,20 +1,52 @@
 from fastapi import APIRouter, Depends, UploadFile, status, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List
 import aiofiles
+import asyncio
 from helpers.config import get_settings, settings
+from helpers.jobs import JobStatusEnum
 from controllers import DataController, VDBController
 from .schema import *
 import os
+import json
+import hashlib
+import tempfile
 import uuid
+import zipfile
 
 import logging
 logger = logging.getLogger(__name__)
 
 data_router = APIRouter(prefix="/data", tags=["Data"])
 
-@data_router.post("/upload/", response_model=UploadResponse)
+async def _hold_upload(ingestion_jobs, content: bytes, file_id: str):
+    """
+    Keep an upload that is parsed from memory for its queued job, or spill it to a temporary
+    file once the bytes held by queued jobs reach INGESTION_MAX_HELD_MB.
+    Returns (content, None) or (None, spill_path).
+    """
+    if ingestion_jobs.reserve_bytes(len(content)):
+        return content, None
+
+    fd, spill_path = tempfile.mkstemp(suffix=os.path.splitext(file_id)[1])
+    os.close(fd)
+    async with aiofiles.open(spill_path, "wb") as f:
+        await f.write(content)
+    return None, spill_path
+
+def _drop_upload(ingestion_jobs, content: bytes = None, spill_path: str = None):
+    """Give back what `_hold_upload` took."""
+    if content is not None:
+        ingestion_jobs.release_bytes(len(content))
+    if spill_path is not None:
+        try:
+            os.remove(spill_path)
+        except FileNotFoundError:
+            pass
+
+@data_router.post("/upload/", response_model=UploadJobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def upload_file(file: UploadFile, request: Request, app_settings: settings = Depends(get_settings)):
-    """Upload a file and return file information for processing."""
+    """Upload a file and queue it for background ingestion."""
     
     data_controller = DataController()
     is_valid, message = data_controller.validfile(file=file)
@@ -26,49 +58,450 @@ async def upload_file(file: UploadFile, request: Request, app_settings: settings
         )
     
     file_path, file_id = data_controller.get_file_path(filename=file.filename)
+    claimed_hash = None
+    held_content, spill_path = None, None
+    job = None
 
     try:
-        # Save the uploaded file
-        async with aiofiles.open(file_path, "wb") as f:
-            while chunk := await file.read(app_settings.PDF_CHUNK_SIZE):
-                await f.write(chunk)
+        if app_settings.PERSIST_UPLOADS:
+            # Save the uploaded file, hashing its content on the way
+            content = None
+            file_hash = hashlib.sha256()
+            async with aiofiles.open(file_path, "wb") as f:
+                while chunk := await file.read(app_settings.PDF_CHUNK_SIZE):
+                    file_hash.update(chunk)
+                    await f.write(chunk)
+            file_hash = file_hash.hexdigest()
+            file_size = os.path.getsize(file_path)
+        else:
+            # Keep the upload in memory, the ingestion job streams it from bytes
+            content = await file.read()
+            file_hash = hashlib.sha256(content).hexdigest()
+            file_size = len(content)
                 
         # Generate a unique asset ID
         asset_id = str(uuid.uuid4())
+        job_id = str(uuid.uuid4())
+
+        # Identical content was already uploaded: return the existing asset
+        record = await data_controller.claim_file_hash(file_hash, asset_id=asset_id, file_id=file_id, job_id=job_id)
+        if record["asset_id"] != asset_id:
+            if content is None:
+                os.remove(file_path)
+            existing_job = request.app.ingestion_jobs.get(record["job_id"]) if record["job_id"] else None
+            logger.info(f"Duplicate upload of {file.filename}, existing asset_id: {record['asset_id']}")
+            return JSONResponse(
+                status_code=status.HTTP_200_OK,
+                content=UploadJobResponse(
+                    success=True,
+                    message="File already uploaded",
+                    file_name=file.filename,
+                    asset_id=record["asset_id"],
+                    file_size=file_size,
+                    job_id=record["job_id"],
+                    status=existing_job.status.value if existing_job else JobStatusEnum.COMPLETED.value,
+                    duplicate=True
+                ).dict()
+            )
+        claimed_hash = file_hash
+        if content is not None:
+            held_content, spill_path = await _hold_upload(request.app.ingestion_jobs, content, file_id)
+            content = None
 
         vdb_controller = VDBController(
             vdb_provider=request.app.vdb_client,
             embedding_provider=request.app.embedding_client,
             generate_provider=request.app.generation_client,
             summarize_provider=request.app.summarization_client,
-            template_parser=request.app.template_parser
+            template_parser=request.app.template_parser,
+            embedding_cache=request.app.embedding_cache,
+            lexical_index=request.app.lexical_index,
+            query_cache=request.app.query_cache,
+            answer_cache=request.app.answer_cache
         )
-        result = await vdb_controller.process_and_store_chunks(
-            file_id=file_id,
+
+        async def run_ingestion(progress_callback):
+            file_content = None
+            if held_content is not None or spill_path is not None:
+                file_content = data_controller.iter_file_content(file_id, stream=held_content, file_path=spill_path)
+
+            try:
+                result = await vdb_controller.process_and_store_chunks(
+                    file_id=file_id,
+                    asset_id=asset_id,
+                    file_content=file_content,
+                    chunk_size=app_settings.TEXT_CHUNK_SIZE,
+                    chunk_overlap=app_settings.TEXT_CHUNK_OVERLAP,
+                    progress_callback=progress_callback
+                )
+            finally:
+                _drop_upload(request.app.ingestion_jobs, held_content, spill_path)
+            if not result['success']:
+                # a failed embedding or upsert batch can leave part of the file's chunks stored
+                await vdb_controller.discard_failed_asset(file_hash, asset_id,
+                                                          delete_chunks=result['embeddings_count'] > 0)
+            return result
+
+        job = request.app.ingestion_jobs.submit(run_ingestion, job_id=job_id, file_name=file.filename, asset_id=asset_id)
+        if job is None:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                detail="Too many ingestion jobs queued, try again later")
+
+        logger.info(f"File uploaded successfully: {file.filename}, asset_id: {asset_id}, job_id: {job.job_id}")
+        return UploadJobResponse(
+            success=True,
+            message="File uploaded successfully, ingestion queued",
+            file_name=file.filename,
             asset_id=asset_id,
-            chunk_size=app_settings.TEXT_CHUNK_SIZE,
-            chunk_overlap=app_settings.TEXT_CHUNK_OVERLAP
+            file_size=file_size,
+            job_id=job.job_id,
+            status=job.status.value
         )
         
-        if not result['success']:
-            raise HTTPException(status_code=500, detail=result['message'])
+    except Exception as e:
+        # the job was never queued, so nothing else will release the claim or the held upload
+        if job is None:
+            if claimed_hash is not None:
+                await data_controller.release_file_hash(claimed_hash, asset_id)
+            _drop_upload(request.app.ingestion_jobs, held_content, spill_path)
+        if isinstance(e, HTTPException):
+            raise
+        logger.error(f"Error uploading file: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _discard_batch_files(data_controller: DataController, entries: List[dict], vdb_controller: VDBController = None):
+    """
+    Release the hash claims and delete the saved files of batch entries that were not ingested.
+    With `vdb_controller`, the chunks those entries may already have stored are deleted first.
+    """
+    for entry in entries:
+        if entry.get("asset_id") and not entry.get("duplicate"):
+            if vdb_controller is None:
+                await data_controller.release_file_hash(entry["file_hash"], entry["asset_id"])
+                continue
+            # without a result the job was cancelled mid-run and any file may have stored chunks
+            await vdb_controller.discard_failed_asset(entry["file_hash"], entry["asset_id"],
+                                                      delete_chunks=entry.get("result") is None or entry["result"].embeddings_count > 0)
+    data_controller.remove_files([entry["file_id"] for entry in entries
+                                  if entry.get("file_id") and not entry.get("duplicate")])
+
+@data_router.post("/upload/batch/", response_model=BatchUploadJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def upload_batch(files: List[UploadFile], request: Request, app_settings: settings = Depends(get_settings)):
+    """
+    Upload many files or ZIP archives and queue them for ingestion as one background job.
+    All files go through one pipeline, so chunks of different files share embedding and upsert batches.
+    The per-file results are in the job result once it finishes.
+    """
+
+    if len(files) > app_settings.MAX_BATCH_FILES:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"message": f"Too many files, a batch holds at most {app_settings.MAX_BATCH_FILES}"}
+        )
+
+    data_controller = DataController()
+    entries = []
+    job = None
+
+    try:
+        # Save uploads and archive members to disk, hashing their content on the way
+        for file in files:
+            # archive members count towards MAX_BATCH_FILES too
+            remaining = app_settings.MAX_BATCH_FILES - sum(1 for entry in entries if entry.get("file_id"))
+            is_archive, message = data_controller.validarchive(file=file)
+            if file.content_type in app_settings.ALLOWED_ARCHIVE_TYPES:
+                if is_archive and remaining <= 0:
+                    is_archive, message = False, f"Batch file limit of {app_settings.MAX_BATCH_FILES} reached"
+                if not is_archive:
+                    entries.append({"file_name": file.filename, "file_size": file.size, "error": message})
+                    continue
+
+                archive_path, _ = data_controller.get_file_path(filename=file.filename)
+                try:
+                    async with aiofiles.open(archive_path, "wb") as f:
+                        while chunk := await file.read(app_settings.PDF_CHUNK_SIZE):
+                            await f.write(chunk)
+
+                    # the extraction thread outlives a cancelled request, so its files are dropped when it ends
+                    extraction = asyncio.ensure_future(asyncio.to_thread(data_controller.extract_archive,
+                                                                         archive_path, remaining))
+
+                    def remove_extracted(done):
+                        if not done.exception():
+                            data_controller.remove_files([entry["file_id"] for entry in done.result() if entry["file_id"]])
+
+                    try:
+                        entries.extend(await asyncio.shield(extraction))
+                    except asyncio.CancelledError:
+                        extraction.add_done_callback(remove_extracted)
+                        raise
+                except zipfile.BadZipFile:
+                    entries.append({"file_name": file.filename, "file_size": file.size, "error": "Invalid ZIP archive"})
+                except ValueError as e:
+                    entries.append({"file_name": file.filename, "file_size": file.size, "error": str(e)})
+                finally:
+                    os.remove(archive_path)
+                continue
+
+            is_valid, message = data_controller.validfile(file=file)
+            if is_valid and remaining <= 0:
+                is_valid, message = False, f"Batch file limit of {app_settings.MAX_BATCH_FILES} reached"
+            if not is_valid:
+                entries.append({"file_name": file.filename, "file_size": file.size, "error": message})
+                continue
+
+            file_path, file_id = data_controller.get_file_path(filename=file.filename)
+            entry = {"file_name": file.filename, "file_id": file_id, "error": None}
+            entries.append(entry)
+            file_hash = hashlib.sha256()
+            async with aiofiles.open(file_path, "wb") as f:
+                while chunk := await file.read(app_settings.PDF_CHUNK_SIZE):
+                    file_hash.update(chunk)
+                    await f.write(chunk)
+            entry.update(file_size=os.path.getsize(file_path), file_hash=file_hash.hexdigest())
+
+        # Skip content that was already uploaded, including repeats within this batch
+        to_ingest = []
+        for entry in entries:
+            if entry.get("error"):
+                continue
+
+            asset_id = str(uuid.uuid4())
+            record = await data_controller.claim_file_hash(entry["file_hash"], asset_id=asset_id, file_id=entry["file_id"])
+            if record["asset_id"] != asset_id:
+                data_controller.remove_files([entry["file_id"]])
+                entry.update(asset_id=record["asset_id"], duplicate=True)
+                continue
+
+            entry["asset_id"] = asset_id
+            to_ingest.append(entry)
+
+        file_results = []
+        for entry in entries:
+            if entry.get("error"):
+                file_results.append(BatchFileResult(file_name=entry["file_name"], file_size=entry.get("file_size"),
+                                                    success=False, message=entry["error"]))
+            elif entry.get("duplicate"):
+                file_results.append(BatchFileResult(file_name=entry["file_name"], asset_id=entry["asset_id"],
+                                                    file_size=entry["file_size"], success=True,
+                                                    message="File already uploaded", duplicate=True))
+            else:
+                file_results.append(BatchFileResult(file_name=entry["file_name"], asset_id=entry["asset_id"],
+                                                    file_size=entry["file_size"], success=True,
+                                                    message="File queued for ingestion"))
+
+        if not to_ingest:
+            return JSONResponse(
+                status_code=status.HTTP_200_OK,
+                content=BatchUploadJobResponse(
+                    success=all(file_result.success for file_result in file_results),
+                    message="No new files to ingest",
+                    status=JobStatusEnum.COMPLETED.value,
+                    files=file_results,
+                    file_count=len(file_results)
+                ).dict()
+            )
+
+        vdb_controller = VDBController(
+            vdb_provider=request.app.vdb_client,
+            embedding_provider=request.app.embedding_client,
+            generate_provider=request.app.generation_client,
+            summarize_provider=request.app.summarization_client,
+            template_parser=request.app.template_parser,
+            embedding_cache=request.app.embedding_cache,
+            lexical_index=request.app.lexical_index,
+            query_cache=request.app.query_cache,
+            answer_cache=request.app.answer_cache
+        )
+
+        async def run_batch_ingestion(progress_callback):
+            ingested = {}
+            try:
+                result = await vdb_controller.process_and_store_files(
+                    files=[{"file_id": entry["file_id"], "asset_id": entry["asset_id"]} for entry in to_ingest],
+                    chunk_size=app_settings.TEXT_CHUNK_SIZE,
+                    chunk_overlap=app_settings.TEXT_CHUNK_OVERLAP,
+                    progress_callback=progress_callback
+                )
+                for entry, file_result in zip(to_ingest, result["files"]):
+                    if file_result["success"]:
+                        ingested[entry["file_id"]] = entry
+                    entry["result"] = BatchFileResult(
+                        file_name=entry["file_name"],
+                        asset_id=entry["asset_id"],
+                        file_size=entry["file_size"],
+                        success=file_result["success"],
+                        message=file_result["message"],
+                        chunk_count=file_result["chunk_count"],
+                        embeddings_count=file_result["embeddings_count"],
+                        inserted_count=file_result["inserted_count"]
+                    )
+            finally:
+                # failed or cancelled files do not stay claimed or on disk, ingested ones only with PERSIST_UPLOADS
+                await _discard_batch_files(data_controller,
+                                           [entry for entry in to_ingest if entry["file_id"] not in ingested],
+                                           vdb_controller)
+                if not app_settings.PERSIST_UPLOADS:
+                    data_controller.remove_files(list(ingested))
+
+            batch_results = [entry.get("result", file_result) for entry, file_result in zip(entries, file_results)]
+            succeeded = sum(1 for file_result in batch_results if file_result.success)
+            logger.info(f"Batch upload finished: {succeeded} of {len(batch_results)} files, "
+                        f"{result['chunks_per_second']} chunks/s")
+            return BatchUploadResponse(
+                **{**result,
+                   "success": succeeded == len(batch_results),
+                   "message": f"{succeeded} of {len(batch_results)} files uploaded successfully",
+                   "files": batch_results,
+                   "file_count": len(batch_results)}
+            ).dict()
+
+        job = request.app.ingestion_jobs.submit(run_batch_ingestion, file_name=f"{len(to_ingest)} files")
+        if job is None:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                detail="Too many ingestion jobs queued, try again later")
+
+        logger.info(f"Batch upload of {len(to_ingest)} files queued, job_id: {job.job_id}")
+        return BatchUploadJobResponse(
+            success=True,
+            message=f"{len(to_ingest)} files queued for ingestion",
+            job_id=job.job_id,
+            status=job.status.value,
+            files=file_results,
+            file_count=len(file_results)
+        )
+
+    except BaseException as e:
+        # nothing was queued: also covers a client disconnect (CancelledError)
+        if job is None:
+            await _discard_batch_files(data_controller, [entry for entry in entries if not entry.get("error")])
+        if not isinstance(e, Exception) or isinstance(e, HTTPException):
+            raise
+        logger.error(f"Error in batch upload: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@data_router.post("/reindex/{asset_id}", response_model=UploadJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def reindex_asset(asset_id: str, file: UploadFile, request: Request, app_settings: settings = Depends(get_settings)):
+    """Upload a new version of an asset's file and queue an incremental re-index of its chunks."""
 
-        logger.info(f"File uploaded successfully: {file.filename}, asset_id: {asset_id}")
-        return UploadResponse(
+    data_controller = DataController()
+    is_valid, message = data_controller.validfile(file=file)
+
+    if not is_valid:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"message": message}
+        )
+
+    vdb_controller = VDBController(
+        vdb_provider=request.app.vdb_client,
+        embedding_provider=request.app.embedding_client,
+        generate_provider=request.app.generation_client,
+        summarize_provider=request.app.summarization_client,
+        template_parser=request.app.template_parser,
+        embedding_cache=request.app.embedding_cache,
+        lexical_index=request.app.lexical_index,
+        query_cache=request.app.query_cache,
+        answer_cache=request.app.answer_cache
+    )
+    # an unknown id would otherwise be indexed as a new asset
+    if not await vdb_controller.asset_exists(asset_id):
+        raise HTTPException(status_code=404, detail=f"Asset '{asset_id}' not found")
+
+    file_path, file_id = data_controller.get_file_path(filename=file.filename)
+    held_content, spill_path = None, None
+    job = None
+
+    try:
+        if app_settings.PERSIST_UPLOADS:
+            content = None
+            file_hash = hashlib.sha256()
+            async with aiofiles.open(file_path, "wb") as f:
+                while chunk := await file.read(app_settings.PDF_CHUNK_SIZE):
+                    file_hash.update(chunk)
+                    await f.write(chunk)
+            file_hash = file_hash.hexdigest()
+            file_size = os.path.getsize(file_path)
+        else:
+            content = await file.read()
+            file_hash = hashlib.sha256(content).hexdigest()
+            file_size = len(content)
+            held_content, spill_path = await _hold_upload(request.app.ingestion_jobs, content, file_id)
+            content = None
+
+        job_id = str(uuid.uuid4())
+
+        async def run_reindex(progress_callback):
+            file_content = None
+            if held_content is not None or spill_path is not None:
+                file_content = data_controller.iter_file_content(file_id, stream=held_content, file_path=spill_path)
+
+            try:
+                result = await vdb_controller.reindex_asset(
+                    file_id=file_id,
+                    asset_id=asset_id,
+                    file_content=file_content,
+                    chunk_size=app_settings.TEXT_CHUNK_SIZE,
+                    chunk_overlap=app_settings.TEXT_CHUNK_OVERLAP,
+                    progress_callback=progress_callback
+                )
+            finally:
+                _drop_upload(request.app.ingestion_jobs, held_content, spill_path)
+            # the asset now holds the new content
+            if result['success']:
+                await data_controller.release_asset_hashes(asset_id=asset_id)
+                await data_controller.claim_file_hash(file_hash, asset_id=asset_id, file_id=file_id, job_id=job_id)
+            return result
+
+        job = request.app.ingestion_jobs.submit(run_reindex, job_id=job_id, file_name=file.filename, asset_id=asset_id)
+        if job is None:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                detail="Too many ingestion jobs queued, try again later")
+
+        logger.info(f"Re-index of asset {asset_id} queued from {file.filename}, job_id: {job.job_id}")
+        return UploadJobResponse(
             success=True,
-            message="File uploaded successfully",
+            message="File uploaded successfully, re-index queued",
             file_name=file.filename,
             asset_id=asset_id,
-            file_size=os.path.getsize(file_path),
-            chunk_count=result['chunk_count'],
-            embeddings_count=result['embeddings_count'],
-            inserted_count=result['inserted_count']
+            file_size=file_size,
+            job_id=job.job_id,
+            status=job.status.value
         )
-        
+
     except Exception as e:
-        logger.error(f"Error uploading file: {e}")
+        if job is None:
+            _drop_upload(request.app.ingestion_jobs, held_content, spill_path)
+        if isinstance(e, HTTPException):
+            raise
+        logger.error(f"Error re-indexing asset {asset_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@data_router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(request: Request, job_id: str):
+    """Get the status and progress of an ingestion job."""
+
+    job = request.app.ingestion_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+
+    return JobStatusResponse(**job.snapshot())
+
+@data_router.get("/jobs/{job_id}/events")
+async def stream_job_progress(request: Request, job_id: str):
+    """Stream ingestion progress of a job as server-sent events until it finishes."""
+
+    if request.app.ingestion_jobs.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+
+    async def event_stream():
+        async for snapshot in request.app.ingestion_jobs.watch(job_id):
+            if await request.is_disconnected():
+                break
+            yield f"event: {snapshot['status']}\ndata: {json.dumps(snapshot)}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 @data_router.delete("collections/{collection_name}/asset/{asset_id}", response_model=DeleteAssetResponse)
 async def delete_asset_chunks(request: Request, collection_name: str, asset_id: str):
     """Delete all chunks associated with an asset from collection."""
@@ -78,7 +511,11 @@ async def delete_asset_chunks(request: Request, collection_name: str, asset_id:
         embedding_provider=request.app.embedding_client,
         generate_provider=request.app.generation_client,
         summarize_provider=request.app.summarization_client,
-        template_parser=request.app.template_parser
+        template_parser=request.app.template_parser,
+        embedding_cache=request.app.embedding_cache,
+        lexical_index=request.app.lexical_index,
+        query_cache=request.app.query_cache,
+        answer_cache=request.app.answer_cache
     )
     result = await vdb_controller.delete_asset_chunks(collection_name, asset_id)
 
@@ -96,7 +533,11 @@ async def delete_collection(request: Request, collection_name: str):
         embedding_provider=request.app.embedding_client,
         generate_provider=request.app.generation_client,
         summarize_provider=request.app.summarization_client,
-        template_parser=request.app.template_parser
+        template_parser=request.app.template_parser,
+        embedding_cache=request.app.embedding_cache,
+        lexical_index=request.app.lexical_index,
+        query_cache=request.app.query_cache,
+        answer_cache=request.app.answer_cache
     )
     result = await vdb_controller.delete_collection(collection_name)
 
@@ -105,6 +546,15 @@ async def delete_collection(request: Request, collection_name: str):
 
     return result
 
+@data_router.get("/cache/embeddings")
+async def get_embedding_cache_stats(request: Request):
+    """Hit/miss counters and size of the embedding cache."""
+
+    if request.app.embedding_cache is None:
+        return {"enabled": False}
+
+    return {"enabled": True, **request.app.embedding_cache.stats()}
+
 @data_router.get("/collections", response_model=CollectionsResponse)
 async def list_collections(request: Request):
     vdb_controller = VDBController(
@@ -112,7 +562,11 @@ async def list_collections(request: Request):
         embedding_provider=request.app.embedding_client,
         generate_provider=request.app.generation_client,
         summarize_provider=request.app.summarization_client,
-        template_parser=request.app.template_parser
+        template_parser=request.app.template_parser,
+        embedding_cache=request.app.embedding_cache,
+        lexical_index=request.app.lexical_index,
+        query_cache=request.app.query_cache,
+        answer_cache=request.app.answer_cache
     )
     result = await vdb_controller.get_all_collections()
 
@@ -121,6 +575,28 @@ async def list_collections(request: Request):
 
     return result
 
+@data_router.put("/collections/{collection_name}/profile", response_model=CollectionProfileResponse)
+async def update_collection_profile(request: Request, collection_name: str):
+    """Apply the configured collection profile (HNSW, on-disk storage, optimizers) to an existing collection."""
+
+    vdb_controller = VDBController(
+        vdb_provider=request.app.vdb_client,
+        embedding_provider=request.app.embedding_client,
+        generate_provider=request.app.generation_client,
+        summarize_provider=request.app.summarization_client,
+        template_parser=request.app.template_parser,
+        embedding_cache=request.app.embedding_cache,
+        lexical_index=request.app.lexical_index,
+        query_cache=request.app.query_cache,
+        answer_cache=request.app.answer_cache
+    )
+    result = await vdb_controller.update_collection_profile(collection_name)
+
+    if not result.success:
+        raise HTTPException(status_code=500, detail=result.message)
+
+    return result
+
 @data_router.get("/collections/{collection_name}", response_model=CollectionInfoResponse)
 async def get_collection_info(request: Request, collection_name: str):
 
@@ -129,7 +605,11 @@ async def get_collection_info(request: Request, collection_name: str):
         embedding_provider=request.app.embedding_client,
         generate_provider=request.app.generation_client,
         summarize_provider=request.app.summarization_client,
-        template_parser=request.app.template_parser
+        template_parser=request.app.template_parser,
+        embedding_cache=request.app.embedding_cache,
+        lexical_index=request.app.lexical_index,
+        query_cache=request.app.query_cache,
+        answer_cache=request.app.answer_cache
     )
     result = await vdb_controller.get_collection_info(collection_name)
 
@@ -1,15 +1,15 @@
 from .chat_requests import ChatRequest
 from .chat_responses import ChatResponse, HealthResponse
-from .data_responses import (UploadResponse, CollectionsResponse,
-                              CollectionInfoResponse, DeleteAssetResponse,
+from .data_responses import (UploadResponse, UploadJobResponse, BatchFileResult, BatchUploadResponse, BatchUploadJobResponse, JobStatusResponse, CollectionsResponse,
+                              CollectionInfoResponse, CollectionProfileResponse, DeleteAssetResponse,
                                 DeleteCollectionResponse)
 from .summary_requests import SummarizeTextRequest
 from .summary_responses import SummaryResponse
 
 __all__ = [
     "ChatRequest","ChatResponse", "HealthResponse",
-    "UploadResponse", "CollectionsResponse",
-    "CollectionInfoResponse", "DeleteAssetResponse",
+    "UploadResponse", "UploadJobResponse", "BatchFileResult", "BatchUploadResponse", "BatchUploadJobResponse", "JobStatusResponse", "CollectionsResponse",
+    "CollectionInfoResponse", "CollectionProfileResponse", "DeleteAssetResponse",
     "DeleteCollectionResponse",
     "SummarizeTextRequest",
     "SummaryResponse"
@@ -4,3 +4,5 @@ from typing import Optional
 
 class ChatRequest(BaseModel):
     query: str = Field(..., description="Search query text")
+    hnsw_ef: Optional[int] = Field(None, gt=0, le=512, description="Search beam width, higher is more accurate and slower")
+    exact: bool = Field(False, description="Exact search without the HNSW index, only if VECTOR_DB_ALLOW_EXACT_SEARCH is set")
@@ -11,6 +11,62 @@ class UploadResponse(BaseModel):
     embeddings_count: int
     inserted_count: int
 
+class UploadJobResponse(BaseModel):
+    success: bool
+    message: str
+    file_name: str
+    asset_id: str
+    file_size: int
+    job_id: Optional[str] = None
+    status: str
+    duplicate: bool = False
+
+class BatchFileResult(BaseModel):
+    file_name: str
+    asset_id: Optional[str] = None
+    file_size: Optional[int] = None
+    success: bool
+    message: str
+    chunk_count: int = 0
+    embeddings_count: int = 0
+    inserted_count: int = 0
+    duplicate: bool = False
+
+class BatchUploadResponse(BaseModel):
+    success: bool
+    message: str
+    files: List[BatchFileResult]
+    file_count: int
+    chunk_count: int
+    embeddings_count: int
+    inserted_count: int
+    elapsed_seconds: float
+    files_per_second: float
+    chunks_per_second: float
+    stage_throughput: Dict[str, Any] = {}
+
+class BatchUploadJobResponse(BaseModel):
+    success: bool
+    message: str
+    job_id: Optional[str] = None
+    status: str
+    files: List[BatchFileResult]
+    file_count: int
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    message: str
+    file_name: Optional[str] = None
+    asset_id: Optional[str] = None
+    chunk_count: int
+    embeddings_count: int
+    inserted_count: int
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+
 class CollectionsResponse(BaseModel):
     success: bool
     message: str
@@ -27,6 +83,12 @@ class CollectionInfoResponse(BaseModel):
     points_count: Optional[int] = None
     payload_schema: Optional[Dict[str, Any]] = None
 
+class CollectionProfileResponse(BaseModel):
+    success: bool
+    message: str
+    collection_name: str
+    profile: Optional[Dict[str, Any]] = None
+
 class DeleteAssetResponse(BaseModel):
     success: bool
     message: str
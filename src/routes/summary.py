@@ -1,15 +1,19 @@
 from fastapi import APIRouter, Depends, UploadFile, status, HTTPException, Request
-from fastapi.responses import JSONResponse
-import aiofiles
+from fastapi.responses import JSONResponse, StreamingResponse
 from helpers.config import get_settings, settings
-from controllers import DataController, LLMController, VDBController
+from helpers.sse import text_event_stream
+from helpers.uploads import InMemoryUploadRoute
+from controllers import DataController, LLMController, VDBController, SummaryTooLongError
 from .schema import *
+from typing import AsyncIterator
+import hashlib
 import uuid
 
 import logging
 logger = logging.getLogger(__name__)
 
-summary_router = APIRouter(prefix="/summary", tags=["Summary"])
+# summary uploads are only needed for the request and never touch the disk
+summary_router = APIRouter(prefix="/summary", tags=["Summary"], route_class=InMemoryUploadRoute)
 
 @summary_router.post("/text", response_model=SummaryResponse)
 async def summarize_text(
@@ -22,7 +26,10 @@ async def summarize_text(
             embedding_provider=request.app.embedding_client,
             generate_provider=request.app.generation_client,
             summarize_provider=request.app.summarization_client,
-            template_parser=request.app.template_parser
+            template_parser=request.app.template_parser,
+            embedding_cache=request.app.embedding_cache,
+            query_cache=request.app.query_cache,
+            answer_cache=request.app.answer_cache
         )
         
         # Generate summary
@@ -35,10 +42,100 @@ async def summarize_text(
             summary=summary,
         )
         
+    except SummaryTooLongError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
     except Exception as e:
         logger.error(f"Error summarizing text: {e}")
         raise HTTPException(status_code=500, detail=f"Error summarizing text: {str(e)}")
 
+@summary_router.post("/text/stream")
+async def summarize_text_stream(
+    summary_request: SummarizeTextRequest,
+    request: Request
+):
+    """Stream the summary as server-sent events: `token` deltas, then one `done` or `error` event."""
+    llm_controller = LLMController(
+        embedding_provider=request.app.embedding_client,
+        generate_provider=request.app.generation_client,
+        summarize_provider=request.app.summarization_client,
+        template_parser=request.app.template_parser,
+        embedding_cache=request.app.embedding_cache,
+        query_cache=request.app.query_cache,
+        answer_cache=request.app.answer_cache
+    )
+    stream = llm_controller.summarize_text_stream(summary_request.text)
+    return StreamingResponse(
+        text_event_stream(stream, empty_message="No summary generated."),
+        media_type="text/event-stream"
+    )
+
+async def _prepare_uploaded_file(file: UploadFile, request: Request, app_settings: settings,
+                                 data_controller: DataController) -> dict:
+    """
+    Validate an uploaded file, then either find the summary of identical content or extract
+    its text and store its chunks in the vector DB, ready to be summarized.
+    """
+    vdb_controller = VDBController(
+        vdb_provider=request.app.vdb_client,
+        embedding_provider=request.app.embedding_client,
+        generate_provider=request.app.generation_client,
+        summarize_provider=request.app.summarization_client,
+        template_parser=request.app.template_parser,
+        embedding_cache=request.app.embedding_cache,
+        lexical_index=request.app.lexical_index,
+        query_cache=request.app.query_cache,
+        answer_cache=request.app.answer_cache
+    )
+
+    # Validate file
+    is_valid, message = data_controller.validfile(file=file)
+    if not is_valid:
+        return {
+            "response": JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"message": message}
+            )
+        }
+
+    # The upload is only needed for this request: keep it in memory, never on disk
+    _, file_id = data_controller.get_file_path(filename=file.filename)
+    content = await file.read()
+    file_hash = hashlib.sha256(content).hexdigest()
+
+    asset_id = str(uuid.uuid4())
+    record = await data_controller.claim_file_hash(file_hash, asset_id=asset_id, file_id=file_id)
+    is_duplicate = record["asset_id"] != asset_id
+
+    # Identical content was already summarized: no extraction, embedding or generation
+    if is_duplicate and record["summary"]:
+        logger.info(f"Returning cached summary for duplicate file: {file.filename}")
+        return {"file_hash": file_hash, "summary": record["summary"]}
+
+    # Extract text content
+    file_content = await data_controller.get_content_from_bytes(content, file_id)
+    del content
+    if not file_content:
+        if not is_duplicate:
+            await data_controller.release_file_hash(file_hash, asset_id)
+        raise HTTPException(status_code=400, detail="Could not extract text from file")
+
+    full_text = "\n\n".join([doc.page_content for doc in file_content])
+
+    # Store content in vector DB, unless it is already stored under the existing asset
+    if not is_duplicate:
+        result = await vdb_controller.process_and_store_chunks(
+            file_id=file_id,
+            asset_id=asset_id,
+            file_content=file_content,
+            chunk_size=app_settings.TEXT_CHUNK_SIZE,
+            chunk_overlap=app_settings.TEXT_CHUNK_OVERLAP
+        )
+        if not result['success']:
+            await vdb_controller.discard_failed_asset(file_hash, asset_id,
+                                                      delete_chunks=result['embeddings_count'] > 0)
+
+    return {"file_hash": file_hash, "text": full_text}
+
 @summary_router.post("/file/", response_model=SummaryResponse)
 async def summarize_uploaded_file(
     file: UploadFile,
@@ -47,59 +144,32 @@ async def summarize_uploaded_file(
 ):
     
     try:
-        # Initialize controllers
         data_controller = DataController()
-        vdb_controller = VDBController(
-            vdb_provider=request.app.vdb_client,
-            embedding_provider=request.app.embedding_client,
-            generate_provider=request.app.generation_client,
-            summarize_provider=request.app.summarization_client,
-            template_parser=request.app.template_parser
-        )        
         llm_controller = LLMController(
             embedding_provider=request.app.embedding_client,
             generate_provider=request.app.generation_client,
             summarize_provider=request.app.summarization_client,
-            template_parser=request.app.template_parser
+            template_parser=request.app.template_parser,
+            embedding_cache=request.app.embedding_cache,
+            query_cache=request.app.query_cache,
+            answer_cache=request.app.answer_cache
         )
-        
-        # Validate file
-        is_valid, message = data_controller.validfile(file=file)
-        if not is_valid:
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST, 
-                content={"message": message}
+
+        prepared = await _prepare_uploaded_file(file, request, app_settings, data_controller)
+        if "response" in prepared:
+            return prepared["response"]
+
+        if "summary" in prepared:
+            return SummaryResponse(
+                success=True,
+                message="File summarized successfully",
+                summary=prepared["summary"]
             )
-        
-        # Save file temporarily
-        file_path, file_id = data_controller.get_file_path(filename=file.filename)
-        
-        async with aiofiles.open(file_path, "wb") as f:
-            while True:
-                chunk = await file.read(app_settings.PDF_CHUNK_SIZE)
-                if not chunk:
-                    break
-                await f.write(chunk)
-        
-        # Extract text content
-        file_content = await data_controller.get_file_content(file_id)
-        if not file_content:
-            raise HTTPException(status_code=400, detail="Could not extract text from file")
-        
-        full_text = "\n\n".join([doc.page_content for doc in file_content])
 
-        # Store content in vector DB
-        asset_id = str(uuid.uuid4())
-        _ = await vdb_controller.process_and_store_chunks(
-            file_id=file_id,
-            asset_id=asset_id,
-            file_content=file_content,
-            chunk_size=app_settings.TEXT_CHUNK_SIZE,
-            chunk_overlap=app_settings.TEXT_CHUNK_OVERLAP
-        )
-    
         # Generate summary
-        summary = await llm_controller.summarize_text(full_text)
+        summary = await llm_controller.summarize_text(prepared["text"])
+        if summary:
+            await data_controller.set_file_summary(prepared["file_hash"], summary)
         
         logger.info(f"File summarized successfully: {file.filename}")
         return SummaryResponse(
@@ -108,6 +178,60 @@ async def summarize_uploaded_file(
             summary=summary
         )
         
+    except HTTPException:
+        raise
+    except SummaryTooLongError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error summarizing file: {e}")
+        raise HTTPException(status_code=500, detail=f"Error summarizing file: {str(e)}")
+
+async def _single_delta(text: str) -> AsyncIterator[str]:
+    yield text
+
+@summary_router.post("/file/stream")
+async def summarize_uploaded_file_stream(
+    file: UploadFile,
+    request: Request,
+    app_settings: settings = Depends(get_settings)
+):
+    """Like /file/, but stream the summary as server-sent events while it is generated."""
+    try:
+        data_controller = DataController()
+        llm_controller = LLMController(
+            embedding_provider=request.app.embedding_client,
+            generate_provider=request.app.generation_client,
+            summarize_provider=request.app.summarization_client,
+            template_parser=request.app.template_parser,
+            embedding_cache=request.app.embedding_cache,
+            query_cache=request.app.query_cache,
+            answer_cache=request.app.answer_cache
+        )
+
+        # Validation, extraction and storage finish before the stream starts,
+        # so their errors still come back as regular HTTP responses
+        prepared = await _prepare_uploaded_file(file, request, app_settings, data_controller)
+        if "response" in prepared:
+            return prepared["response"]
+
+        if "summary" in prepared:
+            stream = _single_delta(prepared["summary"])
+            on_complete = None
+        else:
+            file_hash = prepared["file_hash"]
+            stream = llm_controller.summarize_text_stream(prepared["text"])
+
+            async def on_complete(summary: str):
+                await data_controller.set_file_summary(file_hash, summary)
+                logger.info(f"File summarized successfully: {file.filename}")
+
+        return StreamingResponse(
+            text_event_stream(stream, empty_message="No summary generated.", on_complete=on_complete),
+            media_type="text/event-stream"
+        )
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error summarizing file: {e}")
-        raise HTTPException(status_code=500, detail=f"Error summarizing file: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error summarizing file: {str(e)}")
@@ -0,0 +1,13 @@
+import numpy as np
+
+# Embeddings travel as one contiguous (texts, embedding_size) float32 matrix.
+# Rows that could not be embedded are filled with NaN.
+
+def empty_embeddings(count: int, embedding_size: int) -> np.ndarray:
+    return np.full((count, embedding_size or 0), np.nan, dtype=np.float32)
+
+def missing_embeddings(embeddings: np.ndarray) -> np.ndarray:
+    """Boolean mask of the rows that hold no embedding."""
+    if embeddings.shape[1] == 0:
+        return np.ones(len(embeddings), dtype=bool)
+    return np.isnan(embeddings).any(axis=1)
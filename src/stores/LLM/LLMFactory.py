@@ -1,20 +1,51 @@
 from .LLMEnums import OpenAIEnums, CoHereEnums, GeminiEnums, LLMModel, DocumentTypeEnum
 from .providers import OpenAIProvider, CoHereProvider, GeminiProvider
+from .LLMRateLimiter import LLMRateLimiter
+from .LLMHttpClient import create_http_client
+import httpx
 
 class LLMFactory:
 
     @classmethod
-    def create(cls, provider: str):
+    def create_http_client(cls) -> httpx.AsyncClient:
+        """Connection pool to share between the providers created at startup."""
+        from helpers.config import get_settings
+        settings = get_settings()
+
+        return create_http_client(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_SECONDS,
+            connect_timeout=settings.LLM_CONNECT_TIMEOUT_SECONDS,
+            read_timeout=settings.LLM_READ_TIMEOUT_SECONDS,
+            http2=settings.LLM_HTTP2
+        )
+
+    @classmethod
+    def create(cls, provider: str, http_client: httpx.AsyncClient = None):
 
         from helpers.config import get_settings
         settings = get_settings()
+
+        # one limiter per provider instance, shared by all of its requests
+        rate_limiter = LLMRateLimiter(
+            requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+            tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            min_concurrency=settings.LLM_MIN_CONCURRENCY,
+            max_retries=settings.LLM_MAX_RETRIES,
+            name=provider
+        )
         
         if provider == LLMModel.OPENAI.value:
             return OpenAIProvider(
                 api_key = settings.OPENAI_API_KEY,
                 default_max_input_characters=settings.DEFAULT_MAX_INPUT_CHARACTERS,
                 default_max_output_tokens=settings.DEFAULT_MAX_OUTPUT_TOKENS,
-                default_temperature=settings.DEFAULT_TEMPERATURE
+                default_temperature=settings.DEFAULT_TEMPERATURE,
+                rate_limiter=rate_limiter,
+                http_client=http_client,
+                summary_max_input_characters=settings.SUMMARY_SECTION_CHARACTERS
             )
 
         if provider == LLMModel.COHERE.value:
@@ -22,7 +53,10 @@ class LLMFactory:
                 api_key = settings.COHERE_API_KEY,
                 default_max_input_characters=settings.DEFAULT_MAX_INPUT_CHARACTERS,
                 default_max_output_tokens=settings.DEFAULT_MAX_OUTPUT_TOKENS,
-                default_temperature=settings.DEFAULT_TEMPERATURE
+                default_temperature=settings.DEFAULT_TEMPERATURE,
+                rate_limiter=rate_limiter,
+                http_client=http_client,
+                summary_max_input_characters=settings.SUMMARY_SECTION_CHARACTERS
             )
 
         if provider == LLMModel.GEMINI.value:
@@ -30,7 +64,8 @@ class LLMFactory:
                 api_key = settings.GEMINI_API_KEY,
                 default_max_input_characters=settings.DEFAULT_MAX_INPUT_CHARACTERS,
                 default_max_output_tokens=settings.DEFAULT_MAX_OUTPUT_TOKENS,
-                default_temperature=settings.DEFAULT_TEMPERATURE
+                default_temperature=settings.DEFAULT_TEMPERATURE,
+                rate_limiter=rate_limiter
             )
 
         return None
\ No newline at end of file
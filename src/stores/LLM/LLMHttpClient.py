@@ -0,0 +1,30 @@
+import httpx
+
+import logging
+logger = logging.getLogger(__name__)
+
+def create_http_client(max_connections: int = 100, max_keepalive_connections: int = 20,
+                       keepalive_expiry: float = 30.0, connect_timeout: float = 5.0,
+                       read_timeout: float = 60.0, http2: bool = True) -> httpx.AsyncClient:
+    """
+    One keep-alive connection pool shared by the async provider clients, so concurrent
+    requests reuse warm TLS connections, multiplexed over HTTP/2 when available,
+    instead of each SDK client opening its own.
+    """
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("HTTP/2 needs the 'h2' package (httpx[http2]), using HTTP/1.1")
+            http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        # read_timeout also bounds writes and waiting for a free pooled connection
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+    )
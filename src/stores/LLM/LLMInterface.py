@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, List, Optional
+import numpy as np
 
 class LLMInterface(ABC):
 
@@ -15,7 +17,8 @@ class LLMInterface(ABC):
         pass
 
     @abstractmethod
-    async def process_text(self, text: str):
+    async def process_text(self, text: str, max_characters: int = None):
+        """Trim a prompt to `max_characters`, by default to the provider's default_max_input_characters."""
         pass
 
     @abstractmethod
@@ -23,13 +26,33 @@ class LLMInterface(ABC):
         pass
 
     @abstractmethod
-    async def embed_text(self, text: str, document_type: str = None):
+    def generate_text_stream(self, user_prompt: str, system_prompt: str = "", temperature: float = None,
+                             max_output_tokens: int = None) -> AsyncIterator[str]:
+        """Like generate_text, but yield the completion as text deltas as the provider sends them."""
+        pass
+
+    @abstractmethod
+    async def embed_text(self, text: str, document_type: str = None) -> Optional[np.ndarray]:
+        pass
+
+    @abstractmethod
+    async def embed_texts(self, texts: List[str], document_type: str = None) -> np.ndarray:
+        """
+        Embed many texts with as few provider requests as possible, keeping input order.
+        Returns a float32 matrix with one row per text; rows that failed are NaN.
+        """
         pass
 
     @abstractmethod
     async def summarize_text(self, user_prompt: str, system_prompt: str = "", temperature: float = None, max_output_tokens: int = None):
         pass
 
+    @abstractmethod
+    def summarize_text_stream(self, user_prompt: str, system_prompt: str = "", temperature: float = None,
+                              max_output_tokens: int = None) -> AsyncIterator[str]:
+        """Like summarize_text, but yield the summary as text deltas as the provider sends them."""
+        pass
+
     @abstractmethod
     async def construct_prompt(self, prompt: str, role: str):
         pass
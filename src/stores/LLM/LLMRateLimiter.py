@@ -0,0 +1,199 @@
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+import asyncio
+import httpx
+import inspect
+import openai
+import random
+import time
+
+import logging
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """Per-minute budget refilled continuously. A capacity of 0 means unlimited."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = per_minute
+        self.available = float(per_minute)
+        self.refill_rate = per_minute / 60.0
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available, 0 if it is available now."""
+        if not self.capacity:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.refill_rate
+
+    def take(self, amount: float):
+        if self.capacity:
+            self.available -= min(amount, self.capacity)
+
+class LLMRateLimiter:
+    """
+    Shared limiter for all requests of one provider instance.
+    Combines request and token buckets with an AIMD concurrency window that
+    halves on 429/5xx responses and grows back on success, and retries
+    throttled requests with jittered backoff that honours Retry-After.
+    """
+
+    RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504, 529}
+    # timeouts and dropped connections, raised without a status code
+    RETRYABLE_ERRORS = (TimeoutError, ConnectionError, httpx.TransportError,
+                        openai.APITimeoutError, openai.APIConnectionError)
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0,
+                 max_concurrency: int = 16, min_concurrency: int = 1,
+                 max_retries: int = 5, base_backoff: float = 1.0, max_backoff: float = 60.0,
+                 name: str = "llm"):
+        self.name = name
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.window = float(max_concurrency)
+
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.request_count = 0
+        self.throttled_count = 0
+        self.last_decrease_at = 0.0
+        self._condition = None
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        # created lazily so the limiter can be built outside the event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window": round(self.window, 2),
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "request_count": self.request_count,
+            "throttled_count": self.throttled_count,
+            "requests_available": None if not self.request_bucket.capacity else int(self.request_bucket.available),
+            "tokens_available": None if not self.token_bucket.capacity else int(self.token_bucket.available),
+        }
+
+    async def call(self, func: Callable[[], Union[Awaitable[Any], Any]], tokens: int = 1):
+        """
+        Run `func` under the limiter, retrying throttled and transient failures.
+        `tokens` is the estimated token cost of the request.
+        """
+        attempt = 0
+        while True:
+            await self._acquire(tokens)
+            try:
+                result = func()
+                if inspect.isawaitable(result):
+                    result = await result
+            except Exception as e:
+                status_code = self._status_code(e)
+                retryable = status_code in self.RETRYABLE_STATUS_CODES or isinstance(e, self.RETRYABLE_ERRORS)
+                await self._release(success=False, throttled=retryable)
+
+                if not retryable or attempt >= self.max_retries:
+                    raise
+
+                delay = self._retry_delay(e, attempt)
+                attempt += 1
+                logger.warning(f"[{self.name}] request throttled (status={status_code}), "
+                               f"retry {attempt}/{self.max_retries} in {delay:.2f}s, stats={self.stats()}")
+                await asyncio.sleep(delay)
+                continue
+
+            await self._release(success=True)
+            return result
+
+    async def _acquire(self, tokens: int):
+        async with self.condition:
+            self.waiting += 1
+            try:
+                while True:
+                    if self.in_flight < max(self.min_concurrency, int(self.window)):
+                        delay = max(self.request_bucket.wait_time(1), self.token_bucket.wait_time(tokens))
+                        if delay == 0:
+                            break
+                    else:
+                        delay = None
+
+                    try:
+                        # woken early by a release, otherwise when the buckets have refilled
+                        await asyncio.wait_for(self.condition.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+
+                self.request_bucket.take(1)
+                self.token_bucket.take(tokens)
+                self.in_flight += 1
+            finally:
+                self.waiting -= 1
+
+    async def _release(self, success: bool, throttled: bool = False):
+        async with self.condition:
+            self.in_flight -= 1
+            if success:
+                self.request_count += 1
+                # additive increase: about +1 per window of successful requests
+                self.window = min(self.max_concurrency, self.window + 1.0 / self.window)
+            elif throttled:
+                self.throttled_count += 1
+                # multiplicative decrease, once per burst of concurrent failures
+                now = time.monotonic()
+                if now - self.last_decrease_at > 1.0:
+                    self.window = max(self.min_concurrency, self.window / 2)
+                    self.last_decrease_at = now
+            self.condition.notify_all()
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        retry_after = self._retry_after(error)
+        if retry_after is not None:
+            return min(self.max_backoff, retry_after) + random.uniform(0, self.base_backoff)
+        backoff = min(self.max_backoff, self.base_backoff * (2 ** attempt))
+        return random.uniform(backoff / 2, backoff)
+
+    @staticmethod
+    def _status_code(error: Exception) -> Optional[int]:
+        for attr in ("status_code", "code", "status"):
+            value = getattr(error, attr, None)
+            if isinstance(value, int):
+                return value
+        response = getattr(error, "response", None)
+        value = getattr(response, "status_code", None)
+        return value if isinstance(value, int) else None
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        headers = getattr(error, "headers", None) or getattr(getattr(error, "response", None), "headers", None)
+        if not headers:
+            return None
+
+        try:
+            if headers.get("retry-after-ms"):
+                return float(headers["retry-after-ms"]) / 1000
+            value = headers.get("retry-after")
+            if not value:
+                return None
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except Exception:
+            return None
@@ -1,4 +1,7 @@
 from .LLMInterface import LLMInterface
 from .LLMEnums import LLMModel, OpenAIEnums, CoHereEnums, DocumentTypeEnum, GeminiEnums
 from .providers import OpenAIProvider, CoHereProvider
+from .LLMRateLimiter import LLMRateLimiter
+from .LLMEmbeddings import empty_embeddings, missing_embeddings
+from .LLMHttpClient import create_http_client
 from .LLMFactory import LLMFactory
\ No newline at end of file
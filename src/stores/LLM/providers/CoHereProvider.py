@@ -1,17 +1,31 @@
 from ..LLMInterface import LLMInterface
+from ..LLMRateLimiter import LLMRateLimiter
+from ..LLMEmbeddings import empty_embeddings, missing_embeddings
 from ..LLMEnums import CoHereEnums, DocumentTypeEnum
+from ..LLMHttpClient import create_http_client
+from typing import AsyncIterator, List
+import numpy as np
 import cohere
+import httpx
 import logging
 
 class CoHereProvider(LLMInterface):
 
+    # Cohere embed accepts at most 96 texts per request
+    max_embedding_batch_size = 96
+
     def __init__(self, api_key: str,
                 default_max_input_characters: int=1000,
                 default_max_output_tokens: int=1000,
-                default_temperature: float=0.1):
+                default_temperature: float=0.1,
+                rate_limiter: LLMRateLimiter=None,
+                http_client: httpx.AsyncClient=None,
+                summary_max_input_characters: int=24000):
         
         self.api_key = api_key
         self.default_max_input_characters = default_max_input_characters
+        # summarization prompts carry a whole document section, so they get their own limit
+        self.summary_max_input_characters = summary_max_input_characters
         self.default_max_output_tokens = default_max_output_tokens
         self.default_temperature = default_temperature
 
@@ -21,8 +35,12 @@ class CoHereProvider(LLMInterface):
         self.embedding_size = None
 
         self.enums = CoHereEnums
+        self.rate_limiter = rate_limiter or LLMRateLimiter(name="cohere")
 
-        self.client = cohere.Client(api_key=self.api_key)
+        # the pool is usually shared and closed by its owner; its timeouts apply to every request
+        http_client = http_client or create_http_client()
+        self.client = cohere.AsyncClient(api_key=self.api_key, httpx_client=http_client,
+                                         timeout=http_client.timeout)
 
         self.logger = logging.getLogger(__name__)
 
@@ -36,12 +54,12 @@ class CoHereProvider(LLMInterface):
         self.embedding_model_id = embedding_model_id
         self.embedding_size = embedding_size
 
-    async def process_text(self, text: str):
-        return text[:self.default_max_input_characters].strip()
+    async def process_text(self, text: str, max_characters: int = None):
+        return text[:max_characters or self.default_max_input_characters].strip()
 
     async def _chat_completion(self, user_prompt: str, system_prompt: str, model_id: str,
                                temperature: float = None, max_output_tokens: int = None,
-                               ):
+                               max_input_characters: int = None):
         """Common method for chat completion used by both generate_text and summarize_text"""
         if not self.client:
             self.logger.error("CoHere client was not set")
@@ -56,12 +74,17 @@ class CoHereProvider(LLMInterface):
                 prompt=system_prompt,
                 role=self.enums.SYSTEM.value
             )]
-            response = self.client.chat(
-                model=model_id,
-                chat_history=chat_history,
-                message=await self.process_text(user_prompt),
-                temperature=temperature or self.default_temperature,
-                max_tokens=max_output_tokens or self.default_max_output_tokens,
+            message = await self.process_text(user_prompt, max_input_characters)
+            max_tokens = max_output_tokens or self.default_max_output_tokens
+            response = await self.rate_limiter.call(
+                lambda: self.client.chat(
+                    model=model_id,
+                    chat_history=chat_history,
+                    message=message,
+                    temperature=temperature or self.default_temperature,
+                    max_tokens=max_tokens,
+                ),
+                tokens=(len(message) + len(system_prompt)) // 4 + max_tokens
             )
 
             if not response or not response.text:
@@ -73,6 +96,54 @@ class CoHereProvider(LLMInterface):
             self.logger.error(f"Error in chat completion with CoHere: {str(e)}")
             return None
 
+    async def _chat_completion_stream(self, user_prompt: str, system_prompt: str, model_id: str,
+                                      temperature: float = None, max_output_tokens: int = None,
+                                      max_input_characters: int = None) -> AsyncIterator[str]:
+        """Streaming counterpart of _chat_completion, yields the text-generation events"""
+        if not self.client:
+            self.logger.error("CoHere client was not set")
+            return
+
+        if not model_id:
+            self.logger.error("No model provided for chat completion")
+            return
+
+        try:
+            chat_history = [await self.construct_prompt(
+                prompt=system_prompt,
+                role=self.enums.SYSTEM.value
+            )]
+            message = await self.process_text(user_prompt, max_input_characters)
+            max_tokens = max_output_tokens or self.default_max_output_tokens
+
+            async def open_stream():
+                stream = self.client.chat_stream(
+                    model=model_id,
+                    chat_history=chat_history,
+                    message=message,
+                    temperature=temperature or self.default_temperature,
+                    max_tokens=max_tokens,
+                )
+                # the request is only sent on the first read, so read it under the limiter
+                return stream, await anext(stream, None)
+
+            stream, event = await self.rate_limiter.call(
+                open_stream,
+                tokens=(len(message) + len(system_prompt)) // 4 + max_tokens
+            )
+
+            try:
+                while event is not None:
+                    if event.event_type == "text-generation" and event.text:
+                        yield event.text
+                    event = await anext(stream, None)
+            finally:
+                # return the connection to the pool when the client stops reading early
+                await stream.aclose()
+        except Exception as e:
+            self.logger.error(f"Error in streaming chat completion with CoHere: {str(e)}")
+            raise
+
     async def generate_text(self, user_prompt: str, system_prompt: str, temperature: float = None, max_output_tokens: int = None):
         if not self.generation_model_id:
             self.logger.error("Generation model for CoHere was not set")
@@ -86,32 +157,63 @@ class CoHereProvider(LLMInterface):
             max_output_tokens=max_output_tokens
         )
 
+    async def generate_text_stream(self, user_prompt: str, system_prompt: str, temperature: float = None,
+                                   max_output_tokens: int = None) -> AsyncIterator[str]:
+        if not self.generation_model_id:
+            self.logger.error("Generation model for CoHere was not set")
+            return
+
+        async for delta in self._chat_completion_stream(
+            user_prompt=user_prompt,
+            system_prompt=system_prompt,
+            model_id=self.generation_model_id,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens
+        ):
+            yield delta
+
     async def embed_text(self, text: str, document_type: str = None):
+        embeddings = await self.embed_texts([text], document_type=document_type)
+        return None if missing_embeddings(embeddings)[0] else embeddings[0]
+
+    async def embed_texts(self, texts: List[str], document_type: str = None) -> np.ndarray:
 
         if not self.client:
             self.logger.error("CoHere client was not set")
-            return None
+            return empty_embeddings(len(texts), self.embedding_size)
         
         if not self.embedding_model_id:
             self.logger.error("Embedding model for CoHere was not set")
-            return None
-
-        input_type = self.enums.DOCUMENT
-        if document_type == DocumentTypeEnum.QUERY:
-            input_type = self.enums.QUERY
-
-        response = self.client.embed(
-            model = self.embedding_model_id,
-            texts = text,
-            input_type = input_type,
-            embedding_types=['float'],
-        )
-
-        if not response or not response.embeddings or not response.embeddings.float:
-            self.logger.error("Error while embedding text with CoHere")
-            return None
+            return empty_embeddings(len(texts), self.embedding_size)
+
+        input_type = self.enums.DOCUMENT.value
+        if document_type == DocumentTypeEnum.QUERY.value:
+            input_type = self.enums.QUERY.value
+
+        embeddings = empty_embeddings(len(texts), self.embedding_size)
+        for i in range(0, len(texts), self.max_embedding_batch_size):
+            batch = texts[i:i + self.max_embedding_batch_size]
+            try:
+                response = await self.rate_limiter.call(
+                    lambda: self.client.embed(
+                        model = self.embedding_model_id,
+                        texts = batch,
+                        input_type = input_type,
+                        embedding_types=['float'],
+                    ),
+                    tokens=sum(len(text) for text in batch) // 4 + 1
+                )
+            except Exception as e:
+                self.logger.error(f"Error embedding texts with CoHere: {str(e)}")
+                response = None
+
+            if not response or not response.embeddings or not response.embeddings.float:
+                self.logger.error("Error while embedding text with CoHere")
+                continue
+
+            embeddings[i:i + len(batch)] = response.embeddings.float
         
-        return response.embeddings.float[0]
+        return embeddings
 
     async def summarize_text(self, user_prompt: str, system_prompt: str, temperature: float = None, max_output_tokens: int = None):
 
@@ -124,8 +226,25 @@ class CoHereProvider(LLMInterface):
             system_prompt=system_prompt,
             model_id=self.summarization_model_id,
             temperature=temperature,
-            max_output_tokens=max_output_tokens
+            max_output_tokens=max_output_tokens,
+            max_input_characters=self.summary_max_input_characters
         )
+
+    async def summarize_text_stream(self, user_prompt: str, system_prompt: str, temperature: float = None,
+                                    max_output_tokens: int = None) -> AsyncIterator[str]:
+        if not self.summarization_model_id:
+            self.logger.error("No model set for summarization with CoHere")
+            return
+
+        async for delta in self._chat_completion_stream(
+            user_prompt=user_prompt,
+            system_prompt=system_prompt,
+            model_id=self.summarization_model_id,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+            max_input_characters=self.summary_max_input_characters
+        ):
+            yield delta
     
     async def construct_prompt(self, prompt: str, role: str):
         return {
@@ -1,15 +1,27 @@
 from ..LLMInterface import LLMInterface
+from ..LLMRateLimiter import LLMRateLimiter
+from ..LLMEmbeddings import empty_embeddings, missing_embeddings
 from ..LLMEnums import GeminiEnums, DocumentTypeEnum
 from google import genai
 from google.genai.types import EmbedContentConfig, GenerateContentConfig, GenerationConfig, Content, Part
+from typing import AsyncIterator, List
+import numpy as np
 import logging
 
 
 class GeminiProvider(LLMInterface):
+
+    # Gemini batch embedding accepts at most 100 contents per request
+    max_embedding_batch_size = 100
+
+    # summarization prompts are sent whole, Gemini's context holds a full document
+    summary_max_input_characters = None
+
     def __init__(self, api_key: str,
                 default_max_input_characters: int = 1000,
                 default_max_output_tokens: int = 1000,
-                default_temperature: float = 0.7):
+                default_temperature: float = 0.7,
+                rate_limiter: LLMRateLimiter = None):
 
         self.api_key = api_key
         self.default_max_input_characters = default_max_input_characters
@@ -22,6 +34,7 @@ class GeminiProvider(LLMInterface):
         self.embedding_size = None
 
         self.enums = GeminiEnums
+        self.rate_limiter = rate_limiter or LLMRateLimiter(name="gemini")
 
         self.client = genai.Client(api_key=self.api_key)
 
@@ -37,8 +50,8 @@ class GeminiProvider(LLMInterface):
         self.embedding_model_id = embedding_model_id
         self.embedding_size = embedding_size
 
-    async def process_text(self, text: str):
-        return text[:self.default_max_input_characters].strip()
+    async def process_text(self, text: str, max_characters: int = None):
+        return text[:max_characters or self.default_max_input_characters].strip()
 
     async def _chat_completion(self, user_prompt: str, system_prompt: str, model_id: str,
                                temperature: float = None, max_output_tokens: int = None
@@ -55,10 +68,14 @@ class GeminiProvider(LLMInterface):
                 max_output_tokens=max_output_tokens or self.default_max_output_tokens,
             )
 
+            message = await self.process_text(user_prompt)
             chat = self.client.aio.chats.create(model=model_id)
-            response = await chat.send_message(
-                message=await self.process_text(user_prompt),
-                config=config
+            response = await self.rate_limiter.call(
+                lambda: chat.send_message(
+                    message=message,
+                    config=config
+                ),
+                tokens=(len(message) + len(system_prompt)) // 4 + config.max_output_tokens
             )
             self.logger.info(f"Chat completion response from Gemini: {response.text}")
             return response.text
@@ -67,6 +84,37 @@ class GeminiProvider(LLMInterface):
             self.logger.error(f"Error in chat completion with Gemini: {str(e)}")
             return None
 
+    async def _generate_content_stream(self, contents: str, system_prompt: str, model_id: str,
+                                       temperature: float = None, max_output_tokens: int = None
+                                       ) -> AsyncIterator[str]:
+        """Stream a single-turn completion, yields the text of each chunk"""
+        if not model_id:
+            self.logger.error("No model provided for chat completion")
+            return
+
+        try:
+            config = GenerateContentConfig(
+                system_instruction=system_prompt,
+                temperature=temperature,
+                max_output_tokens=max_output_tokens or self.default_max_output_tokens,
+            )
+
+            stream = await self.rate_limiter.call(
+                lambda: self.client.aio.models.generate_content_stream(
+                    model=model_id,
+                    contents=contents,
+                    config=config
+                ),
+                tokens=(len(contents) + len(system_prompt)) // 4 + config.max_output_tokens
+            )
+
+            async for chunk in stream:
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            self.logger.error(f"Error in streaming completion with Gemini: {str(e)}")
+            raise
+
     async def generate_text(self, user_prompt: str, system_prompt: str, temperature: float = None, max_output_tokens: int = None):
         if not self.generation_model_id:
             self.logger.error("Generation model for Gemini was not set")
@@ -80,34 +128,60 @@ class GeminiProvider(LLMInterface):
             max_output_tokens=max_output_tokens
         )
 
+    async def generate_text_stream(self, user_prompt: str, system_prompt: str, temperature: float = None,
+                                   max_output_tokens: int = None) -> AsyncIterator[str]:
+        if not self.generation_model_id:
+            self.logger.error("Generation model for Gemini was not set")
+            return
+
+        async for delta in self._generate_content_stream(
+            contents=await self.process_text(user_prompt),
+            system_prompt=system_prompt,
+            model_id=self.generation_model_id,
+            temperature=temperature or self.default_temperature,
+            max_output_tokens=max_output_tokens
+        ):
+            yield delta
+
     async def embed_text(self, text: str, document_type: str = None):
+        embeddings = await self.embed_texts([text], document_type=document_type)
+        return None if missing_embeddings(embeddings)[0] else embeddings[0]
+
+    async def embed_texts(self, texts: List[str], document_type: str = None) -> np.ndarray:
         if not self.embedding_model_id:
             self.logger.error("Embedding model for Gemini was not set")
-            return None
-
-        try:
-            task_type = self.enums.DOCUMENT.value
-            if document_type == DocumentTypeEnum.QUERY.value:
-                task_type = self.enums.QUERY.value
-
-            config = EmbedContentConfig(task_type=task_type, 
-                                        output_dimensionality=self.embedding_size)
-            
-            results = await self.client.aio.models.embed_content(
-                model=self.embedding_model_id,
-                contents=text,
-                config=config
-            )
-
-            if not results:
+            return empty_embeddings(len(texts), self.embedding_size)
+
+        task_type = self.enums.DOCUMENT.value
+        if document_type == DocumentTypeEnum.QUERY.value:
+            task_type = self.enums.QUERY.value
+
+        config = EmbedContentConfig(task_type=task_type, 
+                                    output_dimensionality=self.embedding_size)
+
+        embeddings = empty_embeddings(len(texts), self.embedding_size)
+        for i in range(0, len(texts), self.max_embedding_batch_size):
+            batch = texts[i:i + self.max_embedding_batch_size]
+            try:
+                results = await self.rate_limiter.call(
+                    lambda: self.client.aio.models.embed_content(
+                        model=self.embedding_model_id,
+                        contents=batch,
+                        config=config
+                    ),
+                    tokens=sum(len(text) for text in batch) // 4 + 1
+                )
+            except Exception as e:
+                self.logger.error(f"Error embedding texts with Gemini: {str(e)}")
+                results = None
+
+            if not results or not results.embeddings or len(results.embeddings) != len(batch):
                 self.logger.error("Error while embedding text with Gemini")
-                return None
+                continue
 
-            return results.embeddings[0].values
+            embeddings[i:i + len(batch)] = [embedding.values for embedding in results.embeddings]
 
-        except Exception as e:
-            self.logger.error(f"Error embedding text with Gemini: {str(e)}")
-            return None
+        return embeddings
 
     async def summarize_text(self, user_prompt: str, system_prompt: str = "", temperature: float = None, max_output_tokens: int = None):
         if not self.summarization_model_id:
@@ -120,10 +194,13 @@ class GeminiProvider(LLMInterface):
                 max_output_tokens=max_output_tokens
             )
 
-            summary = await self.client.aio.models.generate_content(
-                model=self.summarization_model_id,
-                contents=user_prompt,
-                config=config
+            summary = await self.rate_limiter.call(
+                lambda: self.client.aio.models.generate_content(
+                    model=self.summarization_model_id,
+                    contents=user_prompt,
+                    config=config
+                ),
+                tokens=(len(user_prompt) + len(system_prompt)) // 4 + (max_output_tokens or self.default_max_output_tokens)
             )
             print(summary)
             return summary.text
@@ -132,6 +209,21 @@ class GeminiProvider(LLMInterface):
             self.logger.error(f"Error summarizing text with Gemini: {str(e)}")
             return None
 
+    async def summarize_text_stream(self, user_prompt: str, system_prompt: str = "", temperature: float = None,
+                                    max_output_tokens: int = None) -> AsyncIterator[str]:
+        if not self.summarization_model_id:
+            self.logger.error("No model set for summarization with Gemini")
+            return
+
+        async for delta in self._generate_content_stream(
+            contents=user_prompt,
+            system_prompt=system_prompt,
+            model_id=self.summarization_model_id,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens
+        ):
+            yield delta
+
     async def construct_prompt(self, prompt: str, role: str):
         return {
             "role": role,
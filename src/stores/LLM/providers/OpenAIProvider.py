@@ -1,19 +1,35 @@
-from openai import OpenAI
+from openai import AsyncOpenAI
 from ..LLMInterface import LLMInterface
+from ..LLMRateLimiter import LLMRateLimiter
+from ..LLMEmbeddings import empty_embeddings, missing_embeddings
 from ..LLMEnums import OpenAIEnums
+from ..LLMHttpClient import create_http_client
+from typing import AsyncIterator, List
+import numpy as np
+import base64
+import httpx
 import logging
 
 
 class OpenAIProvider(LLMInterface):
+
+    # OpenAI embeddings accept at most 2048 inputs per request
+    max_embedding_batch_size = 2048
+
     def __init__(self,
                 api_key: str,
                 default_max_input_characters: int = 1000,
                 default_max_output_tokens: int = 1000, 
-                default_temperature: float = 0.5):
+                default_temperature: float = 0.5,
+                rate_limiter: LLMRateLimiter = None,
+                http_client: httpx.AsyncClient = None,
+                summary_max_input_characters: int = 24000):
         
         self.api_key = api_key
         self.default_max_output_tokens = default_max_output_tokens
         self.default_max_input_characters = default_max_input_characters
+        # summarization prompts carry a whole document section, so they get their own limit
+        self.summary_max_input_characters = summary_max_input_characters
         self.default_temperature = default_temperature
 
         self.generation_model_id = None
@@ -22,8 +38,11 @@ class OpenAIProvider(LLMInterface):
         self.embedding_size = None
 
         self.enums = OpenAIEnums
+        self.rate_limiter = rate_limiter or LLMRateLimiter(name="openai")
 
-        self.client = OpenAI(api_key=api_key)
+        # the pool is usually shared and closed by its owner; its timeouts apply to every request
+        http_client = http_client or create_http_client()
+        self.client = AsyncOpenAI(api_key=api_key, http_client=http_client, timeout=http_client.timeout)
 
         self.logger = logging.getLogger(__name__)
 
@@ -38,12 +57,12 @@ class OpenAIProvider(LLMInterface):
         self.embedding_model_id = embedding_model_id
         self.embedding_size = embedding_size
 
-    async def process_text(self, text: str):
-        return text[:self.default_max_input_characters].strip()
+    async def process_text(self, text: str, max_characters: int = None):
+        return text[:max_characters or self.default_max_input_characters].strip()
 
     async def _chat_completion(self, user_prompt: str, system_prompt: str, model_id: str,
                                temperature: float = None, max_output_tokens:int = None,
-                               ):
+                               max_input_characters: int = None):
         """Common method for chat completion used by both generate_text and summarize_text"""
         if self.client is None:
             self.logger.error("OpenAI client is not initialized.")
@@ -61,14 +80,19 @@ class OpenAIProvider(LLMInterface):
                 ),
                 await self.construct_prompt(
                     prompt=user_prompt,
-                    role=self.enums.USER.value
+                    role=self.enums.USER.value,
+                    max_characters=max_input_characters
                 )
             ]
-            response = self.client.chat.completions.create(
-                model=model_id,
-                messages=messages,
-                temperature=temperature or self.default_temperature,
-                max_tokens=max_output_tokens or self.default_max_output_tokens,
+            max_tokens = max_output_tokens or self.default_max_output_tokens
+            response = await self.rate_limiter.call(
+                lambda: self.client.chat.completions.create(
+                    model=model_id,
+                    messages=messages,
+                    temperature=temperature or self.default_temperature,
+                    max_tokens=max_tokens,
+                ),
+                tokens=sum(len(message["content"]) for message in messages) // 4 + max_tokens
             )
 
             if not response or not response.choices or len(response.choices) == 0 or not response.choices[0].message:
@@ -80,6 +104,54 @@ class OpenAIProvider(LLMInterface):
             self.logger.error(f"Error in chat completion with OpenAI: {str(e)}")
             return None
 
+    async def _chat_completion_stream(self, user_prompt: str, system_prompt: str, model_id: str,
+                                      temperature: float = None, max_output_tokens: int = None,
+                                      max_input_characters: int = None) -> AsyncIterator[str]:
+        """Streaming counterpart of _chat_completion, yields the content deltas"""
+        if self.client is None:
+            self.logger.error("OpenAI client is not initialized.")
+            return
+
+        if not model_id:
+            self.logger.error("No model provided for chat completion")
+            return
+
+        try:
+            messages = [
+                await self.construct_prompt(
+                    prompt=system_prompt,
+                    role=self.enums.SYSTEM.value
+                ),
+                await self.construct_prompt(
+                    prompt=user_prompt,
+                    role=self.enums.USER.value,
+                    max_characters=max_input_characters
+                )
+            ]
+            max_tokens = max_output_tokens or self.default_max_output_tokens
+            # the request is sent on creation, so throttling is retried by the limiter
+            stream = await self.rate_limiter.call(
+                lambda: self.client.chat.completions.create(
+                    model=model_id,
+                    messages=messages,
+                    temperature=temperature or self.default_temperature,
+                    max_tokens=max_tokens,
+                    stream=True,
+                ),
+                tokens=sum(len(message["content"]) for message in messages) // 4 + max_tokens
+            )
+
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                # return the connection to the pool when the client stops reading early
+                await stream.close()
+        except Exception as e:
+            self.logger.error(f"Error in streaming chat completion with OpenAI: {str(e)}")
+            raise
+
     async def generate_text(self, user_prompt: str, system_prompt: str, temperature: float = None, max_output_tokens: int = None):
         if self.generation_model_id is None:
             self.logger.error("Generation model ID is not set.")
@@ -93,26 +165,64 @@ class OpenAIProvider(LLMInterface):
             max_output_tokens=max_output_tokens
         )
 
+    async def generate_text_stream(self, user_prompt: str, system_prompt: str, temperature: float = None,
+                                   max_output_tokens: int = None) -> AsyncIterator[str]:
+        if self.generation_model_id is None:
+            self.logger.error("Generation model ID is not set.")
+            return
+
+        async for delta in self._chat_completion_stream(
+            user_prompt=user_prompt,
+            system_prompt=system_prompt,
+            model_id=self.generation_model_id,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens
+        ):
+            yield delta
+
     async def embed_text(self, text: str, document_type: str = None):
+        embeddings = await self.embed_texts([text], document_type=document_type)
+        return None if missing_embeddings(embeddings)[0] else embeddings[0]
+
+    async def embed_texts(self, texts: List[str], document_type: str = None) -> np.ndarray:
         if self.embedding_model_id is None:
             self.logger.error("Embedding model ID is not set.")
-            return None
+            return empty_embeddings(len(texts), self.embedding_size)
 
         if self.client is None:
             self.logger.error("OpenAI client is not initialized.")
-            return None
-        
-        response = self.client.embeddings.create(
-            input=text,
-            model=self.embedding_model_id,
-            dimensions=self.embedding_size
-            )
-        
-        if not response or not response.data or len(response.data) == 0 or not response.data[0].embedding:
-            self.logger.error("Error while embedding text with OpenAI")
-            return None
+            return empty_embeddings(len(texts), self.embedding_size)
+
+        embeddings = empty_embeddings(len(texts), self.embedding_size)
+        for i in range(0, len(texts), self.max_embedding_batch_size):
+            batch = texts[i:i + self.max_embedding_batch_size]
+            try:
+                response = await self.rate_limiter.call(
+                    lambda: self.client.embeddings.create(
+                        input=batch,
+                        model=self.embedding_model_id,
+                        dimensions=self.embedding_size,
+                        # raw float32 bytes, decoded straight into the matrix
+                        encoding_format="base64"
+                        ),
+                    tokens=sum(len(text) for text in batch) // 4 + 1
+                )
+            except Exception as e:
+                self.logger.error(f"Error embedding texts with OpenAI: {str(e)}")
+                response = None
+
+            if not response or not response.data or len(response.data) != len(batch):
+                self.logger.error("Error while embedding text with OpenAI")
+                continue
+
+            for item in response.data:
+                # OpenAI-compatible servers may ignore encoding_format and return floats
+                if isinstance(item.embedding, str):
+                    embeddings[i + item.index] = np.frombuffer(base64.b64decode(item.embedding), dtype="<f4")
+                else:
+                    embeddings[i + item.index] = item.embedding
         
-        return response.data[0].embedding
+        return embeddings
     
     async def summarize_text(self, user_prompt: str, system_prompt: str, temperature: float = None, max_output_tokens: int = None):
 
@@ -121,15 +231,32 @@ class OpenAIProvider(LLMInterface):
             return None
 
         return await self._chat_completion(
-            prompt=user_prompt,
+            user_prompt=user_prompt,
             system_prompt=system_prompt,
             model_id=self.summarization_model_id,
             temperature=temperature,
-            max_output_tokens=max_output_tokens
+            max_output_tokens=max_output_tokens,
+            max_input_characters=self.summary_max_input_characters
         )
 
-    async def construct_prompt(self, prompt: str, role: str):
+    async def summarize_text_stream(self, user_prompt: str, system_prompt: str, temperature: float = None,
+                                    max_output_tokens: int = None) -> AsyncIterator[str]:
+        if self.summarization_model_id is None:
+            self.logger.error("Summary model ID is not set.")
+            return
+
+        async for delta in self._chat_completion_stream(
+            user_prompt=user_prompt,
+            system_prompt=system_prompt,
+            model_id=self.summarization_model_id,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+            max_input_characters=self.summary_max_input_characters
+        ):
+            yield delta
+
+    async def construct_prompt(self, prompt: str, role: str, max_characters: int = None):
         return {
             "role": role,
-            "content": await self.process_text(prompt)
+            "content": await self.process_text(prompt, max_characters)
         }
\ No newline at end of file
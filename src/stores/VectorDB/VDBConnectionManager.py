@@ -0,0 +1,160 @@
+from typing import Any, Awaitable, Callable, Dict
+import asyncio
+import time
+
+import logging
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(ConnectionError):
+    """Raised without contacting the vector DB while the circuit is open."""
+
+class VDBConnectionManager:
+    """
+    Tracks the liveness of a vector DB client without probing before every call.
+    Successful calls count as proof of life, and a background task probes only after
+    `probe_interval` seconds without one. Connection errors trigger a reconnect; after
+    `failure_threshold` consecutive failures the circuit opens and calls fail fast with
+    CircuitOpenError. After `reset_timeout` seconds a trial call or probe is let through
+    and its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, connect: Callable[[], Awaitable[Any]], probe: Callable[[Any], Awaitable[Any]],
+                 close: Callable[[Any], Awaitable[Any]], probe_interval: float = 15.0,
+                 failure_threshold: int = 3, reset_timeout: float = 30.0, name: str = "vdb"):
+        self.name = name
+        self._connect = connect
+        self._probe = probe
+        self._close = close
+
+        self.probe_interval = probe_interval
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.client = None
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.last_success_at = 0.0
+
+        self.reconnect_count = 0
+        self.rejected_count = 0
+
+        self._lock = None
+        self._probe_task = None
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        # created lazily so the manager can be built outside the event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    @property
+    def healthy(self) -> bool:
+        return self.client is not None and self.state == self.CLOSED
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "seconds_since_success": round(time.monotonic() - self.last_success_at, 1) if self.last_success_at else None,
+            "reconnect_count": self.reconnect_count,
+            "rejected_count": self.rejected_count,
+        }
+
+    async def start(self):
+        """Connect, raising if the vector DB is unreachable, and start the background probe."""
+        await self.reconnect()
+        if self._probe_task is None:
+            self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def stop(self):
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            await asyncio.gather(self._probe_task, return_exceptions=True)
+            self._probe_task = None
+
+        if self.client is not None:
+            client, self.client = self.client, None
+            await self._close(client)
+
+    async def reconnect(self):
+        async with self.lock:
+            if self.client is not None:
+                client, self.client = self.client, None
+                try:
+                    await self._close(client)
+                except Exception as e:
+                    logger.warning(f"[{self.name}] error closing stale client: {e}")
+
+            self.client = await self._connect()
+            self.reconnect_count += 1
+            self.record_success()
+
+    def before_call(self):
+        """Fail fast while the circuit is open; let a trial call through once the reset timeout passed."""
+        if self.state != self.OPEN:
+            return
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            self.rejected_count += 1
+            raise CircuitOpenError(f"[{self.name}] circuit open after {self.consecutive_failures} consecutive failures")
+        self.state = self.HALF_OPEN
+        logger.info(f"[{self.name}] circuit half-open, trying the vector DB again")
+
+    def record_success(self):
+        self.last_success_at = time.monotonic()
+        self.consecutive_failures = 0
+        if self.state != self.CLOSED:
+            logger.info(f"[{self.name}] circuit closed, vector DB reachable")
+            self.state = self.CLOSED
+
+    async def record_failure(self, error: Exception):
+        """Count a connection failure, then reconnect or open the circuit."""
+        self.consecutive_failures += 1
+
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"[{self.name}] circuit open for {self.reset_timeout}s after "
+                               f"{self.consecutive_failures} consecutive failures: {error}")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            return
+
+        # a single reconnect serves every call that failed on the same broken client
+        if self.lock.locked():
+            return
+        try:
+            await self.reconnect()
+        except Exception as e:
+            logger.warning(f"[{self.name}] reconnect failed: {e}")
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    async def _probe_loop(self):
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            now = time.monotonic()
+
+            if self.state == self.CLOSED and now - self.last_success_at < self.probe_interval:
+                continue
+            if self.state == self.OPEN and now - self.opened_at < self.reset_timeout:
+                continue
+
+            try:
+                if self.state == self.CLOSED and self.client is not None:
+                    await self._probe(self.client)
+                    self.record_success()
+                else:
+                    await self.reconnect()
+            except Exception as e:
+                logger.warning(f"[{self.name}] liveness probe failed: {e}")
+                if self.state == self.OPEN:
+                    self.opened_at = time.monotonic()
+                else:
+                    await self.record_failure(e)
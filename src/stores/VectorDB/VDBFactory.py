@@ -1,4 +1,4 @@
-from .providers import QdrantProvider
+from .providers import QdrantProvider, InProcessProvider
 from .VDBEnums import VectorDBType
 from helpers.config import get_settings
 
@@ -13,9 +13,33 @@ class VDBFactory:
                 host= settings.VECTOR_DB_HOST,
                 port= settings.VECTOR_DB_PORT,
                 grpc_port= settings.VECTOR_DB_GRPC_PORT,
+                prefer_grpc= settings.VECTOR_DB_PREFER_GRPC,
+                probe_interval= settings.VECTOR_DB_PROBE_INTERVAL_SECONDS,
+                failure_threshold= settings.VECTOR_DB_FAILURE_THRESHOLD,
+                reset_timeout= settings.VECTOR_DB_CIRCUIT_RESET_SECONDS,
+                upsert_concurrency= settings.VECTOR_DB_UPSERT_CONCURRENCY,
+                upsert_max_batch_bytes= settings.VECTOR_DB_UPSERT_BATCH_KB * 1024,
+                upsert_wait= settings.VECTOR_DB_UPSERT_WAIT,
                 distance_method= settings.VECTOR_DB_DISTANCE_METHOD,
+                collection_profile={
+                    "hnsw_m": settings.VECTOR_DB_HNSW_M,
+                    "hnsw_ef_construct": settings.VECTOR_DB_HNSW_EF_CONSTRUCT,
+                    "hnsw_ef": settings.VECTOR_DB_HNSW_EF,
+                    "vectors_on_disk": settings.VECTOR_DB_VECTORS_ON_DISK,
+                    "payload_on_disk": settings.VECTOR_DB_PAYLOAD_ON_DISK,
+                    "segment_number": settings.VECTOR_DB_SEGMENT_NUMBER,
+                    "indexing_threshold_kb": settings.VECTOR_DB_INDEXING_THRESHOLD_KB,
+                    "memmap_threshold_kb": settings.VECTOR_DB_MEMMAP_THRESHOLD_KB,
+                    "max_segment_size_kb": settings.VECTOR_DB_MAX_SEGMENT_SIZE_KB,
+                },
             )
             return qdrant_provider
+        elif provider == VectorDBType.FAISS.value:
+            from controllers.BaseController import BaseController
+            return InProcessProvider(
+                path= BaseController().get_vdb_path(VectorDBType.FAISS.value),
+                distance_method= settings.VECTOR_DB_DISTANCE_METHOD,
+            )
         else:
             raise ValueError(f"Unsupported provider: {provider}")
         
\ No newline at end of file
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional
+import numpy as np
 
 class VDBInterface(ABC):
 
@@ -18,6 +19,11 @@ class VDBInterface(ABC):
         """Check if the VDB is healthy and responsive."""
         pass
 
+    @abstractmethod
+    def connection_stats(self) -> Dict[str, Any]:
+        """Get connection state and counters for monitoring."""
+        pass
+
 
     @abstractmethod
     def create_collection(self, collection_name: str, embedding_size: int):
@@ -46,16 +52,27 @@ class VDBInterface(ABC):
         pass
 
     @abstractmethod
-    def insert_many(self, collection_name: str, vectors: List[List[float]], 
+    def insert_many(self, collection_name: str, vectors: np.ndarray, 
                     texts: List[str], record_ids: List[str] = None, 
-                    metadatas: List[Dict[str, Any]] = None, batch_size: int = 50):
-        """Insert multiple documents into the VDB."""
+                    metadatas: List[Dict[str, Any]] = None, batch_size: int = 50,
+                    wait: Optional[bool] = None):
+        """
+        Insert multiple documents into the VDB. `vectors` is a float32 matrix, one row per text.
+        `wait=False` lets batches be acknowledged before they are applied; the call still
+        returns only once every document is searchable.
+        """
+        pass
+
+    @abstractmethod
+    def search(self, collection_name: str, query_vector: np.ndarray, 
+               top_k: int = 5, filter_conditions: Dict[str, Any] = None,
+               hnsw_ef: int = None, exact: bool = False):
+        """Search for similar documents in the VDB. `hnsw_ef` and `exact` tune approximate search per request."""
         pass
 
     @abstractmethod
-    def search(self, collection_name: str, query_vector: List[float], 
-               top_k: int = 5, filter_conditions: Dict[str, Any] = None):
-        """Search for similar documents in the VDB."""
+    def update_collection_profile(self, collection_name: str) -> Dict[str, Any]:
+        """Apply the configured performance profile to an existing collection and return it."""
         pass
 
     @abstractmethod
@@ -66,4 +83,19 @@ class VDBInterface(ABC):
     @abstractmethod
     def delete_asset_chunks(self, collection_name: str, asset_id: str):
         """Delete all chunks associated with an asset from a collection."""
+        pass
+
+    @abstractmethod
+    def get_asset_record_ids(self, collection_name: str, asset_id: str) -> List[str]:
+        """Get the ids of all chunks stored for an asset."""
+        pass
+
+    @abstractmethod
+    def delete_records(self, collection_name: str, record_ids: List[str]):
+        """Delete chunks by id."""
+        pass
+
+    @abstractmethod
+    def set_asset_payload(self, collection_name: str, asset_id: str, payload: Dict[str, Any]):
+        """Overwrite payload fields on every chunk of an asset."""
         pass
\ No newline at end of file
@@ -1 +1,2 @@
-from .VDBFactory import VDBFactory
\ No newline at end of file
+from .VDBFactory import VDBFactory
+from .VDBConnectionManager import VDBConnectionManager, CircuitOpenError
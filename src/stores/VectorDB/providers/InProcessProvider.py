@@ -0,0 +1,488 @@
+from ..VDBInterface import VDBInterface
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional
+import numpy as np
+import asyncio
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+import logging
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ScoredRecord:
+    """Search hit with the same fields the controllers read from Qdrant's ScoredPoint."""
+    id: str
+    score: float
+    payload: Dict[str, Any]
+
+@dataclass
+class CollectionInfo:
+    vectors_count: int
+    indexed_vectors_count: int
+    points_count: int
+    payload_schema: Dict[str, Any] = field(default_factory=dict)
+
+class LocalCollection:
+    """
+    One collection on disk: a float32 vector file, memory-mapped for search, and a sqlite
+    sidecar holding ids and payloads. A point's `row` is its position in the vector file.
+
+    Vectors are only ever appended. Deleting or overwriting a point drops its sqlite row and
+    leaves a dead row in the file until enough of them pile up to compact. Compaction writes
+    the next vector file generation and switches to it in the same sqlite transaction that
+    renumbers the rows, so a crash never leaves rows pointing into the wrong file.
+
+    Row numbers and the alive mask live in this object, so only one process may open a
+    collection at a time; a second opener gets a RuntimeError.
+    """
+
+    # rows scored per matrix product, bounds the temporary memory of a search
+    SEARCH_BLOCK_ROWS = 65536
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.lock_file = self._lock_collection(path)
+
+        self.conn = sqlite3.connect(os.path.join(path, "payloads.db"), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS points (
+                row INTEGER PRIMARY KEY,
+                id TEXT NOT NULL UNIQUE,
+                asset_id TEXT,
+                payload TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS points_asset_id ON points (asset_id)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.conn.commit()
+
+        meta = dict(self.conn.execute("SELECT key, value FROM meta").fetchall())
+        self.dim = int(meta.get("dim", 0))
+        self.generation = int(meta.get("generation", 0))
+
+        self.vectors: Optional[np.ndarray] = None
+        self.alive: Optional[np.ndarray] = None
+        if self.dim:
+            self._load()
+
+    @staticmethod
+    def _lock_collection(path: str):
+        """Hold an exclusive lock on the collection for the lifetime of this object."""
+        lock_file = open(os.path.join(path, "collection.lock"), "w")
+        if fcntl is None:
+            return lock_file
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise RuntimeError(f"Collection at {path} is already open in another process, "
+                               f"stop it before opening the collection here")
+        return lock_file
+
+    @classmethod
+    def create(cls, path: str, dim: int) -> "LocalCollection":
+        os.makedirs(path, exist_ok=True)
+        collection = cls(path)
+        with collection.conn:
+            collection.conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                        [("dim", str(dim)), ("generation", "0")])
+        collection.dim = dim
+        collection._load()
+        return collection
+
+    @property
+    def vectors_path(self) -> str:
+        return os.path.join(self.path, f"vectors.{self.generation}.f32")
+
+    def _load(self):
+        """Map the vector file and rebuild the alive mask from the sidecar."""
+        if not os.path.exists(self.vectors_path):
+            open(self.vectors_path, "wb").close()
+        # files of other generations are left over from a compaction interrupted by a crash
+        for name in os.listdir(self.path):
+            if name.startswith("vectors.") and name != os.path.basename(self.vectors_path):
+                os.remove(os.path.join(self.path, name))
+        # rows past the last sqlite row were written by an insert that never committed
+        rows = os.path.getsize(self.vectors_path) // (self.dim * 4)
+        self._map(rows)
+
+        self.alive = np.zeros(rows, dtype=bool)
+        live_rows = np.fromiter((row for (row,) in self.conn.execute("SELECT row FROM points")), dtype=np.int64)
+        self.alive[live_rows[live_rows < rows]] = True
+
+    def _map(self, rows: int):
+        self.vectors = (np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+                        if rows else np.empty((0, self.dim), dtype=np.float32))
+
+    @property
+    def count(self) -> int:
+        return int(self.alive.sum())
+
+    def insert(self, vectors: np.ndarray, record_ids: List[str], payloads: List[Dict[str, Any]]):
+        row_bytes = self.dim * 4
+        # serialized before anything is written, so a payload that fails here leaves the file untouched
+        records = [(record_id, payload.get("asset_id"), json.dumps(payload, ensure_ascii=False))
+                   for record_id, payload in zip(record_ids, payloads)]
+
+        with self.lock:
+            with open(self.vectors_path, "ab") as f:
+                # rows are numbered from the file itself, which may hold rows a failed insert left behind;
+                # a torn trailing row was never committed and is cut off
+                size = os.fstat(f.fileno()).st_size
+                start = size // row_bytes
+                if size != start * row_bytes:
+                    f.truncate(start * row_bytes)
+                f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+                replaced = []
+                try:
+                    with self.conn:
+                        for record_id in record_ids:
+                            row = self.conn.execute("SELECT row FROM points WHERE id = ?", (record_id,)).fetchone()
+                            if row:
+                                replaced.append(row[0])
+                        self.conn.executemany("DELETE FROM points WHERE id = ?", [(record_id,) for record_id in record_ids])
+                        self.conn.executemany(
+                            "INSERT INTO points (row, id, asset_id, payload) VALUES (?, ?, ?, ?)",
+                            [(start + i, *record) for i, record in enumerate(records)]
+                        )
+                except BaseException:
+                    # drop the vectors again so the file matches the committed rows
+                    f.truncate(start * row_bytes)
+                    raise
+
+            self._map(start + len(record_ids))
+            self.alive = np.concatenate([self.alive, np.zeros(start - len(self.alive), dtype=bool),
+                                         np.ones(len(record_ids), dtype=bool)])
+            self.alive[replaced] = False
+
+    def delete(self, where: str, params: tuple) -> int:
+        with self.lock:
+            with self.conn:
+                rows = [row for (row,) in self.conn.execute(f"SELECT row FROM points WHERE {where}", params)]
+                self.conn.execute(f"DELETE FROM points WHERE {where}", params)
+            self.alive[rows] = False
+
+            dead = len(self.alive) - self.count
+            if dead > max(1000, self.count):
+                self._compact()
+            return len(rows)
+
+    def _compact(self):
+        """Rewrite the live rows into the next vector file generation."""
+        live_rows = np.flatnonzero(self.alive)
+        next_generation = self.generation + 1
+        next_path = os.path.join(self.path, f"vectors.{next_generation}.f32")
+
+        with open(next_path, "wb") as f:
+            for i in range(0, len(live_rows), self.SEARCH_BLOCK_ROWS):
+                f.write(np.ascontiguousarray(self.vectors[live_rows[i:i + self.SEARCH_BLOCK_ROWS]]).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+        old_path = self.vectors_path
+        with self.conn:
+            # live rows keep their order, so each new row number is at most the old one
+            # and renumbering in ascending order never collides
+            self.conn.executemany("UPDATE points SET row = ? WHERE row = ?",
+                                  [(new_row, int(old_row)) for new_row, old_row in enumerate(live_rows)])
+            self.conn.execute("UPDATE meta SET value = ? WHERE key = 'generation'", (str(next_generation),))
+
+        self.generation = next_generation
+        self.vectors = None
+        os.remove(old_path)
+        self._load()
+        logger.info(f"Compacted '{os.path.basename(self.path)}' to {len(live_rows)} rows")
+
+    def select(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def search(self, query: np.ndarray, top_k: int, where: str = None, params: tuple = ()) -> List[tuple]:
+        """
+        Top (id, score, payload) hits by dot product, over all live rows or the rows matching `where`.
+        Scoring runs outside the lock; if a compaction renumbered rows meanwhile, the search is repeated.
+        """
+        while True:
+            with self.lock:
+                vectors, alive, generation = self.vectors, self.alive, self.generation
+                rows = None
+                if where:
+                    rows = np.fromiter((row for (row,) in self.conn.execute(
+                        f"SELECT row FROM points WHERE {where}", params)), dtype=np.int64)
+
+            hits = self._top_rows(vectors, alive, query, top_k, rows)
+            if not hits:
+                return []
+
+            with self.lock:
+                if generation != self.generation:
+                    continue
+                placeholders = ",".join("?" * len(hits))
+                payloads = {
+                    row: (record_id, payload)
+                    for row, record_id, payload in self.conn.execute(
+                        f"SELECT row, id, payload FROM points WHERE row IN ({placeholders})", [row for row, _ in hits]
+                    )
+                }
+            # a hit deleted after scoring has no payload left
+            return [(payloads[row][0], score, json.loads(payloads[row][1])) for row, score in hits if row in payloads]
+
+    def _top_rows(self, vectors: np.ndarray, alive: np.ndarray, query: np.ndarray, top_k: int,
+                  rows: Optional[np.ndarray]) -> List[tuple]:
+        if rows is None:
+            scores = np.empty(vectors.shape[0], dtype=np.float32)
+            for i in range(0, vectors.shape[0], self.SEARCH_BLOCK_ROWS):
+                scores[i:i + self.SEARCH_BLOCK_ROWS] = vectors[i:i + self.SEARCH_BLOCK_ROWS] @ query
+            scores[~alive] = -np.inf
+            candidates = np.arange(vectors.shape[0])
+        else:
+            candidates = rows[rows < vectors.shape[0]]
+            scores = vectors[candidates] @ query if len(candidates) else np.empty(0, dtype=np.float32)
+
+        top_k = min(top_k, int(np.isfinite(scores).sum()))
+        if top_k <= 0:
+            return []
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(candidates[i]), float(scores[i])) for i in top]
+
+    def close(self):
+        with self.lock:
+            self.vectors = None
+            self.conn.close()
+            # closing the file releases the inter-process lock
+            self.lock_file.close()
+
+class InProcessProvider(VDBInterface):
+    """
+    Vector DB running inside the app process, for single-node deployments without Qdrant.
+    Each collection is a memory-mapped float32 matrix searched by brute force with NumPy,
+    which is exact, plus a sqlite payload sidecar, stored under `path`.
+    """
+
+    def __init__(self, path: str, distance_method: str = "cosine"):
+        self.path = path
+        self.collections: Dict[str, LocalCollection] = {}
+        self.connected = False
+
+        if distance_method not in ("cosine", "dot"):
+            logger.warning(f"Unknown distance method '{distance_method}', using cosine")
+            distance_method = "cosine"
+        # cosine vectors are normalized once on insert, so both metrics search by dot product
+        self.normalize = distance_method == "cosine"
+
+    async def connect(self):
+        os.makedirs(self.path, exist_ok=True)
+        for name in sorted(os.listdir(self.path)):
+            if os.path.exists(os.path.join(self.path, name, "payloads.db")):
+                self.collections[name] = await asyncio.to_thread(LocalCollection, os.path.join(self.path, name))
+        self.connected = True
+        logger.info(f"Opened in-process vector DB at {self.path} with {len(self.collections)} collections")
+
+    async def disconnect(self):
+        for collection in self.collections.values():
+            collection.close()
+        self.collections = {}
+        self.connected = False
+        logger.info("Closed in-process vector DB")
+
+    async def health_check(self) -> bool:
+        return self.connected
+
+    def connection_stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "collections": {name: collection.count for name, collection in self.collections.items()},
+        }
+
+    def _get(self, collection_name: str) -> LocalCollection:
+        collection = self.collections.get(collection_name)
+        if collection is None:
+            raise ValueError(f"Collection '{collection_name}' does not exist")
+        return collection
+
+    def _prepare(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.normalize:
+            norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1, norms)
+        return vectors
+
+    async def create_collection(self, collection_name: str, embedding_size: int):
+        try:
+            if collection_name in self.collections:
+                logger.info(f"Collection '{collection_name}' already exists")
+                return
+            self.collections[collection_name] = await asyncio.to_thread(
+                LocalCollection.create, os.path.join(self.path, collection_name), embedding_size
+            )
+            logger.info(f"Collection '{collection_name}' created with {embedding_size} dimensions")
+        except Exception as e:
+            logger.error(f"Error creating collection '{collection_name}': {e}")
+            raise
+
+    async def update_collection_profile(self, collection_name: str) -> Dict[str, Any]:
+        """Search is always exact here, so there is no index to tune."""
+        self._get(collection_name)
+        return {}
+
+    async def is_collection_exist(self, collection_name: str) -> bool:
+        return collection_name in self.collections
+
+    async def get_all_collections(self) -> List:
+        return list(self.collections)
+
+    async def get_collection_info(self, collection_name: str):
+        collection = self.collections.get(collection_name)
+        if collection is None:
+            logger.warning(f"Collection '{collection_name}' does not exist")
+            return None
+        count = collection.count
+        return CollectionInfo(vectors_count=count, indexed_vectors_count=count, points_count=count)
+
+    async def insert_one(self, collection_name: str, vector: np.ndarray,
+                   text: str, metadata: Dict[str, Any] = None, record_id: str = None):
+        record_ids = await self.insert_many(collection_name, np.asarray(vector)[None, :], [text],
+                                            [record_id] if record_id else None, [metadata])
+        return record_ids[0]
+
+    async def insert_many(self, collection_name: str, vectors: np.ndarray,
+                    texts: List[str], record_ids: List[str] = None,
+                    metadatas: List[Dict[str, Any]] = None, batch_size: int = 100,
+                    wait: Optional[bool] = None):
+        """Append the vectors to the collection file; writes are synchronous, so `wait` has no effect."""
+        collection = self._get(collection_name)
+
+        if record_ids is None:
+            record_ids = [str(uuid.uuid4()) for _ in range(len(texts))]
+
+        if metadatas is None:
+            metadatas = [{}] * len(texts)
+
+        if not texts:
+            return []
+
+        payloads = [{"text": text, **(metadata or {})} for text, metadata in zip(texts, metadatas)]
+        try:
+            await asyncio.to_thread(collection.insert, self._prepare(vectors), record_ids, payloads)
+        except Exception as e:
+            logger.error(f"Error batch inserting into '{collection_name}': {e}")
+            raise
+
+        logger.info(f"Successfully inserted {len(texts)} documents into '{collection_name}'")
+        return record_ids
+
+    @staticmethod
+    def _filter_sql(filter_conditions: Dict[str, Any]) -> tuple:
+        """
+        Translate a filter in Qdrant's JSON form ({"must": [{"key": ..., "match": {"value": ...}}]},
+        also "should", "must_not" and {"match": {"any": [...]}}) into a WHERE clause.
+        """
+        def condition(cond: Dict[str, Any]) -> tuple:
+            path = "$." + json.dumps(cond["key"])
+            match = cond["match"]
+            if "any" in match:
+                return (f"json_extract(payload, ?) IN ({','.join('?' * len(match['any']))})",
+                        [path, *match["any"]])
+            return "json_extract(payload, ?) = ?", [path, match["value"]]
+
+        clauses, params = [], []
+        for key, joiner, negate in (("must", " AND ", False), ("should", " OR ", False), ("must_not", " OR ", True)):
+            conditions = [condition(cond) for cond in filter_conditions.get(key) or []]
+            if not conditions:
+                continue
+            clause = "(" + joiner.join(sql for sql, _ in conditions) + ")"
+            clauses.append(f"NOT {clause}" if negate else clause)
+            params.extend(param for _, cond_params in conditions for param in cond_params)
+
+        return " AND ".join(clauses) or "1", tuple(params)
+
+    def _search(self, collection: LocalCollection, query: np.ndarray, top_k: int,
+                filter_conditions: Dict[str, Any] = None) -> List[ScoredRecord]:
+        where, params = self._filter_sql(filter_conditions) if filter_conditions else (None, ())
+        return [ScoredRecord(id=record_id, score=score, payload=payload)
+                for record_id, score, payload in collection.search(query, top_k, where, params)]
+
+    async def search(self, collection_name: str, query_vector: np.ndarray,
+               top_k: int = 5, filter_conditions: Dict[str, Any] = None,
+               hnsw_ef: int = None, exact: bool = False):
+        """Exact search over every live vector; `hnsw_ef` and `exact` are accepted for interface parity."""
+        collection = self._get(collection_name)
+        try:
+            results = await asyncio.to_thread(self._search, collection, self._prepare(query_vector),
+                                              top_k, filter_conditions)
+            logger.debug(f"Search completed in '{collection_name}', found {len(results)} results")
+            return results
+        except Exception as e:
+            logger.error(f"Error searching in '{collection_name}': {e}")
+            raise
+
+    async def delete_collection(self, collection_name: str):
+        collection = self.collections.pop(collection_name, None)
+        if collection is None:
+            msg = f"Collection '{collection_name}' does not exist"
+            logger.warning(msg)
+            return {"success": False, "message": msg}
+
+        try:
+            collection.close()
+            await asyncio.to_thread(shutil.rmtree, collection.path)
+            msg = f"Collection '{collection_name}' deleted"
+            logger.info(msg)
+            return {"success": True, "message": msg}
+        except Exception as e:
+            msg = f"Error deleting collection '{collection_name}': {e}"
+            return {"success": False, "message": msg}
+
+    async def delete_asset_chunks(self, collection_name: str, asset_id: str) -> Dict[str, Any]:
+        collection = self.collections.get(collection_name)
+        if collection is None:
+            msg = f"Collection '{collection_name}' does not exist"
+            logger.warning(msg)
+            return {"success": False, "message": msg}
+
+        try:
+            deleted = await asyncio.to_thread(collection.delete, "asset_id = ?", (asset_id,))
+            msg = f"Deleted {deleted} points from '{collection_name}' with asset_id: {asset_id}"
+            logger.info(msg)
+            return {"success": True, "message": msg}
+        except Exception as e:
+            msg = f"Error deleting points from '{collection_name}' with asset_id={asset_id}: {e}"
+            logger.error(msg)
+            return {"success": False, "message": msg}
+
+    async def get_asset_record_ids(self, collection_name: str, asset_id: str) -> List[str]:
+        collection = self._get(collection_name)
+        rows = await asyncio.to_thread(collection.select, "SELECT id FROM points WHERE asset_id = ?", (asset_id,))
+        return [record_id for (record_id,) in rows]
+
+    async def delete_records(self, collection_name: str, record_ids: List[str], batch_size: int = 1000):
+        collection = self._get(collection_name)
+        for i in range(0, len(record_ids), batch_size):
+            batch = record_ids[i:i + batch_size]
+            await asyncio.to_thread(collection.delete, f"id IN ({','.join('?' * len(batch))})", tuple(batch))
+        logger.info(f"Deleted {len(record_ids)} points from '{collection_name}'")
+
+    async def set_asset_payload(self, collection_name: str, asset_id: str, payload: Dict[str, Any]):
+        collection = self._get(collection_name)
+
+        def update():
+            with collection.lock, collection.conn:
+                collection.conn.execute("UPDATE points SET payload = json_patch(payload, ?) WHERE asset_id = ?",
+                                        (json.dumps(payload, ensure_ascii=False), asset_id))
+        await asyncio.to_thread(update)
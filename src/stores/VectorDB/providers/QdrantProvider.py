@@ -1,9 +1,15 @@
 from qdrant_client import AsyncQdrantClient
 from qdrant_client.http import models
-from qdrant_client.http.exceptions import ResponseHandlingException
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
 from ..VDBInterface import VDBInterface
+from ..VDBConnectionManager import VDBConnectionManager, CircuitOpenError
 import logging
 from typing import List, Dict, Any, Optional
+import numpy as np
+import asyncio
+import grpc
+import json
+import time
 import uuid
 from contextlib import asynccontextmanager
 
@@ -11,11 +17,36 @@ logger = logging.getLogger(__name__)
 
 class QdrantProvider(VDBInterface):
     def __init__(self, host: str = "localhost", port: int = 6333, 
-                 grpc_port: int = 6334, distance_method: str = "cosine"):
+                 grpc_port: int = 6334, distance_method: str = "cosine",
+                 collection_profile: Dict[str, Any] = None, prefer_grpc: bool = False,
+                 probe_interval: float = 15.0, failure_threshold: int = 3, reset_timeout: float = 30.0,
+                 upsert_concurrency: int = 4, upsert_max_batch_bytes: int = 4 * 1024 * 1024,
+                 upsert_wait: bool = True):
         self.host = host
         self.port = port
         self.grpc_port = grpc_port
-        self.client = None
+        self.prefer_grpc = prefer_grpc
+
+        # batches of one insert_many call sent at once, and the request size each is capped at
+        self.upsert_concurrency = max(1, upsert_concurrency)
+        self.upsert_max_batch_bytes = upsert_max_batch_bytes
+        self.upsert_wait = upsert_wait
+
+        self.connection = VDBConnectionManager(
+            connect=self._create_client,
+            probe=lambda client: client.get_collections(),
+            close=lambda client: client.close(),
+            probe_interval=probe_interval,
+            failure_threshold=failure_threshold,
+            reset_timeout=reset_timeout,
+            name="qdrant"
+        )
+
+        # collections known to exist; dropped on delete and when Qdrant reports a missing collection
+        self._known_collections = set()
+
+        # HNSW, storage and optimizer settings of collections; 0 or None keeps the Qdrant default
+        self.collection_profile = collection_profile or {}
         
         # Set distance metric
         if distance_method == "cosine":
@@ -26,60 +57,107 @@ class QdrantProvider(VDBInterface):
             self.distance_metric = models.Distance.COSINE
             logger.warning(f"Unknown distance method '{distance_method}', using cosine")
 
-    async def connect(self):
-        """Connect to Qdrant."""
-        try:
-            self.client = AsyncQdrantClient(
-                host=self.host,
-                port=self.port,
-                prefer_grpc=False,  # Use HTTP instead of gRPC
-            )
+    @property
+    def client(self) -> Optional[AsyncQdrantClient]:
+        return self.connection.client
 
-            # Test connection
-            await self.client.get_collections()
-            logger.info(f"Connected to Qdrant at {self.host}:{self.port}")
+    async def _create_client(self) -> AsyncQdrantClient:
+        # gRPC sends vectors as packed floats instead of JSON text
+        client = AsyncQdrantClient(
+            host=self.host,
+            port=self.port,
+            grpc_port=self.grpc_port,
+            prefer_grpc=self.prefer_grpc,
+        )
 
+        try:
+            # Test connection
+            await client.get_collections()
         except Exception as e:
-            logger.error(f"Failed to connect to Qdrant at {self.host}:{self.port} -> {e}")
+            await client.close()
+            logger.error(f"Failed to connect to Qdrant at {self._address} -> {e}")
             raise ConnectionError(f"Health check failed: {e}") from e
 
-    async def disconnect(self):
-        if self.client:
-            try:
-                await self.client.close()
-                logger.info("Disconnected from Qdrant")
-            except Exception as e:
-                logger.error(f"Error disconnecting from Qdrant: {e}")
-            finally:
-                self.client = None
+        logger.info(f"Connected to Qdrant at {self._address} over {'gRPC' if self.prefer_grpc else 'HTTP'}")
+        return client
 
-    async def health_check(self) -> bool:
-        """Check if Qdrant is reachable and healthy."""
+    async def connect(self):
+        """Connect to Qdrant and start the background liveness probe."""
+        await self.connection.start()
+
+    @property
+    def _address(self) -> str:
+        return f"{self.host}:{self.grpc_port if self.prefer_grpc else self.port}"
+
+    async def disconnect(self):
         try:
-            if not self.client:
-                logger.warning("Qdrant client not initialized")
-                return False
-            await self.client.get_collections()
-            return True
+            await self.connection.stop()
+            logger.info("Disconnected from Qdrant")
         except Exception as e:
-            logger.error(f"Qdrant health check failed: {e}")
+            logger.error(f"Error disconnecting from Qdrant: {e}")
+
+    async def health_check(self) -> bool:
+        """Whether Qdrant is reachable, as last seen by requests and the background probe."""
+        if not self.connection.healthy:
+            logger.warning(f"Qdrant not healthy: {self.connection.stats()}")
+        return self.connection.healthy
+
+    def connection_stats(self) -> Dict[str, Any]:
+        return {"address": self._address, **self.connection.stats()}
+
+    @staticmethod
+    def _is_connection_error(error: Exception) -> bool:
+        if isinstance(error, CircuitOpenError):
             return False
+        if isinstance(error, grpc.aio.AioRpcError):
+            return error.code() in (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED)
+        # qdrant-client wraps HTTP transport errors in ResponseHandlingException
+        return isinstance(error, (ResponseHandlingException, ConnectionError, TimeoutError, OSError))
+
+    @staticmethod
+    def _is_missing_collection(error: Exception) -> bool:
+        if isinstance(error, grpc.aio.AioRpcError):
+            return error.code() == grpc.StatusCode.NOT_FOUND
+        return isinstance(error, UnexpectedResponse) and error.status_code == 404
 
     @asynccontextmanager
     async def _ensure_connection(self):
-        """to ensure connection is active."""
-        if not self.client or not await self.health_check():
-            await self.connect()
+        """
+        Run client calls under the connection manager: fail fast while the circuit is open,
+        and report the outcome so liveness is tracked without extra round trips.
+        """
+        self.connection.before_call()
         try:
             yield
-        except ResponseHandlingException as e:
-            logger.error(f"Qdrant response error: {e}")
-            if e.__cause__ and isinstance(e.__cause__, (ConnectionError, TimeoutError)):
-                await self.connect()
+        except Exception as e:
+            if self._is_connection_error(e):
+                logger.error(f"Qdrant connection error: {e}")
+                await self.connection.record_failure(e)
+            elif self._is_missing_collection(e):
+                self._known_collections.clear()
             raise
+        else:
+            self.connection.record_success()
+
+    def _profile(self, name: str, default=None):
+        return self.collection_profile.get(name) or default
+
+    def _hnsw_config(self) -> models.HnswConfigDiff:
+        return models.HnswConfigDiff(
+            m=self._profile("hnsw_m"),
+            ef_construct=self._profile("hnsw_ef_construct"),
+        )
+
+    def _optimizers_config(self) -> models.OptimizersConfigDiff:
+        return models.OptimizersConfigDiff(
+            default_segment_number=self._profile("segment_number"),
+            indexing_threshold=self._profile("indexing_threshold_kb"),
+            memmap_threshold=self._profile("memmap_threshold_kb"),
+            max_segment_size=self._profile("max_segment_size_kb"),
+        )
 
     async def create_collection(self, collection_name: str, embedding_size: int):
-        """Create a collection with optimized settings for production."""
+        """Create a collection with the configured collection profile."""
         try:        
             async with self._ensure_connection():
                 await self.client.create_collection(
@@ -87,21 +165,57 @@ class QdrantProvider(VDBInterface):
                     vectors_config=models.VectorParams(
                         size=embedding_size,
                         distance=self.distance_metric,
-                        on_disk=True  # Store vectors on disk
-                    ))
+                        on_disk=self.collection_profile.get("vectors_on_disk", True)
+                    ),
+                    hnsw_config=self._hnsw_config(),
+                    optimizers_config=self._optimizers_config(),
+                    on_disk_payload=self.collection_profile.get("payload_on_disk", False)
+                )
+            self._known_collections.add(collection_name)
 
-            logger.info(f"Collection '{collection_name}' created with optimized settings")
+            logger.info(f"Collection '{collection_name}' created with profile {self.collection_profile}")
         except Exception as e:
             logger.error(f"Error creating collection '{collection_name}': {e}")
             raise
+
+    async def update_collection_profile(self, collection_name: str) -> Dict[str, Any]:
+        """
+        Apply the configured collection profile to an existing collection.
+        Qdrant rebuilds indexes and moves data between memory and disk in the background.
+        """
+        if not await self.is_collection_exist(collection_name):
+            raise ValueError(f"Collection '{collection_name}' does not exist")
+
+        async with self._ensure_connection():
+            await self.client.update_collection(
+                collection_name=collection_name,
+                vectors_config={
+                    "": models.VectorParamsDiff(on_disk=self.collection_profile.get("vectors_on_disk", True))
+                },
+                hnsw_config=self._hnsw_config(),
+                optimizers_config=self._optimizers_config(),
+                collection_params=models.CollectionParamsDiff(
+                    on_disk_payload=self.collection_profile.get("payload_on_disk", False)
+                )
+            )
+
+        logger.info(f"Collection '{collection_name}' updated with profile {self.collection_profile}")
+        return self.collection_profile
     
     async def is_collection_exist(self, collection_name: str) -> bool:
+        if collection_name in self._known_collections:
+            return True
         try:
-            return await self.client.collection_exists(collection_name)
+            async with self._ensure_connection():
+                exists = await self.client.collection_exists(collection_name)
         except Exception as e:
             logger.error(f"Error checking if collection exists '{collection_name}': {e}")
             raise
 
+        if exists:
+            self._known_collections.add(collection_name)
+        return exists
+
     async def get_all_collections(self) -> List:
         """Get all collections with the prefix."""
         async with self._ensure_connection():
@@ -110,12 +224,12 @@ class QdrantProvider(VDBInterface):
 
     async def get_collection_info(self, collection_name: str):
         """Get collection information."""
+        if not await self.is_collection_exist(collection_name):
+            logger.warning(f"Collection '{collection_name}' does not exist")
+            return None
+
         async with self._ensure_connection():
-            if await self.client.collection_exists(collection_name):
-                return await self.client.get_collection(collection_name)
-            else:
-                logger.warning(f"Collection '{collection_name}' does not exist")
-                return None
+            return await self.client.get_collection(collection_name)
 
     async def insert_one(self, collection_name: str, vector: List[float], 
                    text: str, metadata: Dict[str, Any] = None, record_id: str = None):
@@ -128,120 +242,179 @@ class QdrantProvider(VDBInterface):
         if metadata:
             payload.update(metadata)
 
+        if not await self.is_collection_exist(collection_name):
+            raise ValueError(f"Collection '{collection_name}' does not exist")
+
+        try:
+            async with self._ensure_connection():
+                await self.client.upsert(
+                    collection_name=collection_name,
+                    points=[models.PointStruct(
+                        id=record_id,
+                        vector=vector,
+                        payload=payload
+                    )]
+                )
+            logger.debug(f"Inserted document '{record_id}' into '{collection_name}'")
+            return record_id
+
+        except Exception as e:
+            logger.error(f"Error inserting into '{collection_name}': {e}")
+            raise
+
+    def _vector_bytes(self, dim: int) -> int:
+        # gRPC packs float32s, JSON spends about 20 characters on each float
+        return dim * (4 if self.prefer_grpc else 20)
+
+    def _plan_batches(self, vectors: np.ndarray, payloads: List[Dict[str, Any]], batch_size: int) -> List[tuple]:
+        """Split rows into (start, end, bytes) batches of at most `batch_size` rows and about `upsert_max_batch_bytes`."""
+        vector_bytes = self._vector_bytes(vectors.shape[1]) if vectors.ndim == 2 else 0
+        batches = []
+        start, batch_bytes = 0, 0
+        for i, payload in enumerate(payloads):
+            point_bytes = vector_bytes + len(json.dumps(payload, ensure_ascii=False).encode("utf-8")) + 64
+            if i > start and (i - start >= batch_size or batch_bytes + point_bytes > self.upsert_max_batch_bytes):
+                batches.append((start, i, batch_bytes))
+                start, batch_bytes = i, 0
+            batch_bytes += point_bytes
+        if start < len(payloads):
+            batches.append((start, len(payloads), batch_bytes))
+        return batches
+
+    async def _upsert_batch(self, collection_name: str, vectors: np.ndarray, record_ids: List[str],
+                            payloads: List[Dict[str, Any]], batch: tuple, batch_num: int, wait: bool):
+        start, end, batch_bytes = batch
+        started = time.perf_counter()
+
+        # column-oriented batch: no per-point objects, one C-level conversion of the rows
         async with self._ensure_connection():
-            if await self.client.collection_exists(collection_name):
-                try:
-                    await self.client.upsert(
-                        collection_name=collection_name,
-                        points=[models.PointStruct(
-                            id=record_id,
-                            vector=vector,
-                            payload=payload
-                        )]
-                    )
-                    logger.debug(f"Inserted document '{record_id}' into '{collection_name}'")
-                    return record_id
-                    
-                except Exception as e:
-                    logger.error(f"Error inserting into '{collection_name}': {e}")
-                    raise
-            else:
-                raise ValueError(f"Collection '{collection_name}' does not exist")
-
-    async def insert_many(self, collection_name: str, vectors: List[List[float]], 
-                    texts: List[str], metadatas: List[Dict[str, Any]] = None, batch_size: int = 100):
-        """Insert multiple vectors efficiently with batching."""
+            await self.client.upsert(
+                collection_name=collection_name,
+                points=models.Batch(
+                    ids=record_ids[start:end],
+                    vectors=vectors[start:end].tolist(),
+                    payloads=payloads[start:end]
+                ),
+                wait=wait
+            )
+
+        seconds = time.perf_counter() - started
+        logger.info(f"Inserted batch {batch_num}: {end - start} documents ({batch_bytes / 1024:.0f} KB) into "
+                    f"'{collection_name}' in {seconds * 1000:.0f}ms ({(end - start) / seconds:,.0f} points/s)")
+
+    async def insert_many(self, collection_name: str, vectors: np.ndarray,
+                    texts: List[str], record_ids: List[str] = None,
+                    metadatas: List[Dict[str, Any]] = None, batch_size: int = 100,
+                    wait: Optional[bool] = None):
+        """
+        Insert multiple vectors efficiently with batching.
+        `vectors` is a (len(texts), embedding_size) float32 matrix; only the rows of the
+        batch being sent are converted for the request.
+
+        Batches hold at most `batch_size` points and about `upsert_max_batch_bytes` of request
+        body, and up to `upsert_concurrency` of them are in flight at once. With `wait=False`
+        Qdrant acknowledges each batch once it is logged; the last batch is then sent with
+        wait=True after all others were acknowledged, and since updates are applied in order
+        the call returns only when every point is searchable.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        wait = self.upsert_wait if wait is None else wait
 
         if not await self.is_collection_exist(collection_name):
             raise ValueError(f"Collection '{collection_name}' does not exist")
 
-        record_ids = [str(uuid.uuid4()) for _ in range(len(texts))]
+        if record_ids is None:
+            record_ids = [str(uuid.uuid4()) for _ in range(len(texts))]
             
         if metadatas is None:
             metadatas = [{}] * len(texts)
 
-        total_inserted = 0
+        if not texts:
+            return []
 
-        async with self._ensure_connection():
-            try:
-                # Process in batches for better performance
-                for i in range(0, len(texts), batch_size):
-                    batch_end = min(i + batch_size, len(texts))
-                    batch_points = []
-                    
-                    for j in range(i, batch_end):
-                        payload = {"text": texts[j]}
-                        if metadatas[j]:
-                            payload.update(metadatas[j])
-                            
-                        point = models.PointStruct(
-                            id=record_ids[j],
-                            vector=vectors[j],
-                            payload=payload
-                        )
-                        batch_points.append(point)
-
-                    await self.client.upsert(
-                        collection_name=collection_name,
-                        points=batch_points,
-                    )
-                    
-                    batch_size_actual = len(batch_points)
-                    total_inserted += batch_size_actual
-
-                    logger.info(f"Inserted batch {i//batch_size + 1}: {batch_size_actual} documents into '{collection_name}'")
-
-                logger.info(f"Successfully inserted {total_inserted} documents into '{collection_name}'")
-                return record_ids[:total_inserted]
-
-            except Exception as e:
-                logger.error(f"Error batch inserting into '{collection_name}': {e}")
-                raise
-
-    async def search(self, collection_name: str, query_vector: List[float], 
-               top_k: int = 5, filter_conditions: Dict[str, Any] = None):
-        """Search for similar vectors with optional filtering."""
+        payloads = [{"text": text, **(metadata or {})} for text, metadata in zip(texts, metadatas)]
+        batches = self._plan_batches(vectors, payloads, batch_size)
+        semaphore = asyncio.Semaphore(self.upsert_concurrency)
+
+        async def send(batch_num: int, batch: tuple, batch_wait: bool):
+            async with semaphore:
+                await self._upsert_batch(collection_name, vectors, record_ids, payloads, batch, batch_num, batch_wait)
+
+        started = time.perf_counter()
+        # without wait the final batch is held back as the consistency barrier
+        pipelined = batches if wait else batches[:-1]
+        tasks = [asyncio.create_task(send(n, batch, wait)) for n, batch in enumerate(pipelined, start=1)]
+        try:
+            await asyncio.gather(*tasks)
+            if not wait:
+                await send(len(batches), batches[-1], True)
+
+        except Exception as e:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.error(f"Error batch inserting into '{collection_name}': {e}")
+            raise
+
+        seconds = time.perf_counter() - started
+        total_bytes = sum(batch[2] for batch in batches)
+        logger.info(f"Successfully inserted {len(texts)} documents into '{collection_name}' in {len(batches)} batches, "
+                    f"{seconds:.2f}s ({len(texts) / seconds:,.0f} points/s, {total_bytes / 1024 / 1024 / seconds:.1f} MB/s)")
+        return record_ids[:len(texts)]
+
+    async def search(self, collection_name: str, query_vector: np.ndarray, 
+               top_k: int = 5, filter_conditions: Dict[str, Any] = None,
+               hnsw_ef: int = None, exact: bool = False):
+        """
+        Search for similar vectors with optional filtering.
+        `hnsw_ef` overrides the profile's search beam width; `exact` skips the index for a full scan.
+        """
         
-        async with self._ensure_connection():
-            if await self.client.collection_exists(collection_name):
-                try:
-                    search_filter = None
-                    if filter_conditions:
-                        search_filter = models.Filter(**filter_conditions)
-
-                    results = await self.client.search(
-                        collection_name=collection_name,
-                        query_vector=query_vector,
-                        limit=top_k,
-                        query_filter=search_filter,
-                        with_payload=True,
-                        with_vectors=False  # Don't return vectors to save bandwidth
-                    )
-
-                    logger.debug(f"Search completed in '{collection_name}', found {len(results)} results")
-                    return results
-
-                except Exception as e:
-                    logger.error(f"Error searching in '{collection_name}': {e}")
-                    raise
-            else:
-                logger.warning(f"Collection '{collection_name}' does not exist")
-                raise ValueError(f"Collection '{collection_name}' does not exist")
+        if not await self.is_collection_exist(collection_name):
+            logger.warning(f"Collection '{collection_name}' does not exist")
+            raise ValueError(f"Collection '{collection_name}' does not exist")
+
+        try:
+            search_filter = None
+            if filter_conditions:
+                search_filter = models.Filter(**filter_conditions)
+
+            async with self._ensure_connection():
+                results = await self.client.search(
+                    collection_name=collection_name,
+                    query_vector=query_vector,
+                    limit=top_k,
+                    query_filter=search_filter,
+                    search_params=models.SearchParams(
+                        hnsw_ef=hnsw_ef or self._profile("hnsw_ef"),
+                        exact=exact
+                    ),
+                    with_payload=True,
+                    with_vectors=False  # Don't return vectors to save bandwidth
+                )
+
+            logger.debug(f"Search completed in '{collection_name}', found {len(results)} results")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error searching in '{collection_name}': {e}")
+            raise
 
     async def delete_collection(self, collection_name: str):
         """Delete a collection."""
         try:
+            if not await self.is_collection_exist(collection_name):
+                msg = f"Collection '{collection_name}' does not exist"
+                logger.warning(msg)
+                return {"success": False, "message": msg}
+
             async with self._ensure_connection():
-                if await self.client.collection_exists(collection_name):
-                    await self.client.delete_collection(collection_name)
-
-                    msg= f"Collection '{collection_name}' deleted"
-                    logger.info(msg)
-                    return {"success": True, "message": msg}
-                else:
-                    msg = f"Collection '{collection_name}' does not exist"
-                    logger.warning(msg)
-                    return {"success": False, "message": msg}
+                await self.client.delete_collection(collection_name)
+            self._known_collections.discard(collection_name)
+
+            msg= f"Collection '{collection_name}' deleted"
+            logger.info(msg)
+            return {"success": True, "message": msg}
                 
         except Exception as e:
             msg = f"Error deleting collection '{collection_name}': {e}"
@@ -250,31 +423,70 @@ class QdrantProvider(VDBInterface):
     async def delete_asset_chunks(self, collection_name: str, asset_id: str) -> Dict[str, Any]:
         """Delete all chunks (points) belonging to a specific asset from a collection."""
         try:
-            async with self._ensure_connection():
-                if not await self.client.collection_exists(collection_name):
-                    msg = f"Collection '{collection_name}' does not exist"
-                    logger.warning(msg)
-                    return {"success": False, "message": msg}
+            if not await self.is_collection_exist(collection_name):
+                msg = f"Collection '{collection_name}' does not exist"
+                logger.warning(msg)
+                return {"success": False, "message": msg}
 
+            async with self._ensure_connection():
                 await self.client.delete(
                     collection_name=collection_name,
-                    points_selector=models.FilterSelector(
-                        filter=models.Filter(
-                            must=[
-                                models.FieldCondition(
-                                    key="asset_id",
-                                    match=models.MatchValue(value=asset_id)
-                                )
-                            ]
-                        )
-                    )
+                    points_selector=models.FilterSelector(filter=self._asset_filter(asset_id))
                 )
 
-                msg = f"Deleted points from '{collection_name}' with asset_id: {asset_id}"
-                logger.info(msg)
-                return {"success": True, "message": msg}
+            msg = f"Deleted points from '{collection_name}' with asset_id: {asset_id}"
+            logger.info(msg)
+            return {"success": True, "message": msg}
 
         except Exception as e:
             msg = f"Error deleting points from '{collection_name}' with asset_id={asset_id}: {e}"
             logger.error(msg)
-            return {"success": False, "message": msg}
\ No newline at end of file
+            return {"success": False, "message": msg}
+
+    def _asset_filter(self, asset_id: str) -> models.Filter:
+        return models.Filter(
+            must=[
+                models.FieldCondition(
+                    key="asset_id",
+                    match=models.MatchValue(value=asset_id)
+                )
+            ]
+        )
+
+    async def get_asset_record_ids(self, collection_name: str, asset_id: str) -> List[str]:
+        """Get the ids of all points belonging to an asset."""
+        record_ids = []
+        async with self._ensure_connection():
+            offset = None
+            while True:
+                points, offset = await self.client.scroll(
+                    collection_name=collection_name,
+                    scroll_filter=self._asset_filter(asset_id),
+                    limit=1000,
+                    offset=offset,
+                    with_payload=False,
+                    with_vectors=False
+                )
+                record_ids.extend(str(point.id) for point in points)
+                if offset is None:
+                    break
+        return record_ids
+
+    async def delete_records(self, collection_name: str, record_ids: List[str], batch_size: int = 1000):
+        """Delete points by id."""
+        async with self._ensure_connection():
+            for i in range(0, len(record_ids), batch_size):
+                await self.client.delete(
+                    collection_name=collection_name,
+                    points_selector=models.PointIdsList(points=record_ids[i:i + batch_size])
+                )
+        logger.info(f"Deleted {len(record_ids)} points from '{collection_name}'")
+
+    async def set_asset_payload(self, collection_name: str, asset_id: str, payload: Dict[str, Any]):
+        """Overwrite payload fields on every point of an asset."""
+        async with self._ensure_connection():
+            await self.client.set_payload(
+                collection_name=collection_name,
+                payload=payload,
+                points=models.FilterSelector(filter=self._asset_filter(asset_id))
+            )
@@ -1 +1,2 @@
-from .QdrantProvider import QdrantProvider
\ No newline at end of file
+from .QdrantProvider import QdrantProvider
+from .InProcessProvider import InProcessProvider